@@ -1,15 +1,24 @@
 """Alert service for SMS (Twilio) and Email (Resend)."""
+import asyncio
+import functools
+import importlib.util
 import logging
-from dataclasses import dataclass
+import os
+import string
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
 
-from pydantic import BaseModel
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Optional SMS dependency, checked once at import
+_TWILIO_AVAILABLE = importlib.util.find_spec("twilio") is not None
+
 
 class AlertChannel(str, Enum):
     """Alert delivery channels."""
@@ -25,7 +34,7 @@ class AlertPriority(str, Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+@dataclass(slots=True)
 class AlertConfig:
     """Alert configuration for a user."""
     user_id: str
@@ -37,16 +46,18 @@ class AlertConfig:
     email: str | None = None
 
 
-class AlertMessage(BaseModel):
+@dataclass(slots=True, frozen=True)
+class AlertMessage:
     """Alert message model."""
     channel: AlertChannel
     priority: AlertPriority
     title: str
     body: str
-    metadata: dict[str, Any] = {}
+    metadata: dict[str, Any] = field(default_factory=dict)
 
 
-class SpendingAlert(BaseModel):
+@dataclass(slots=True, frozen=True)
+class SpendingAlert:
     """Spending alert data."""
     user_id: str
     category: str
@@ -58,9 +69,20 @@ class SpendingAlert(BaseModel):
     forecast_trend: str | None = None
 
 
-def format_currency(amount: Decimal, currency: str = "INR") -> str:
-    """Format currency for display."""
-    return f"₹{float(amount):,.2f}"
+def format_currency(amount: Decimal | float, currency: str = "INR") -> str:
+    """Format currency for display, using integer paise arithmetic."""
+    if isinstance(amount, Decimal):
+        paise = int((amount * 100).to_integral_value())
+    else:
+        paise = round(amount * 100)
+
+    sign = "-" if paise < 0 else ""
+    rupees, paise = divmod(abs(paise), 100)
+    return f"₹{sign}{rupees:,}.{paise:02d}"
+
+
+# Shared read-only result for the common no-alert case
+_NO_ALERT: Mapping[str, Any] = MappingProxyType({"should_alert": False})
 
 
 def check_spending_alert(
@@ -68,16 +90,18 @@ def check_spending_alert(
     budget_limit: Decimal,
     budget_pct: float = 110.0,
     threshold: Decimal = Decimal("5000"),
-) -> dict[str, Any]:
+) -> Mapping[str, Any]:
     """
     Check if spending triggers an alert.
 
     Returns:
-        Dict with alert status and details
+        Dict with alert status and details (read-only when no alert)
     """
-    pct_used = (float(spending) / float(budget_limit) * 100) if float(budget_limit) > 0 else 0
+    spent = float(spending)
+    budget = float(budget_limit)
+    pct_used = spent / budget * 100.0 if budget > 0.0 else 0.0
     over_budget = pct_used >= budget_pct
-    over_threshold = float(spending) >= float(threshold)
+    over_threshold = spent >= float(threshold)
 
     # Determine priority
     if pct_used >= 150:
@@ -89,7 +113,7 @@ def check_spending_alert(
     elif over_threshold:
         priority = AlertPriority.LOW
     else:
-        return {"should_alert": False}
+        return _NO_ALERT
 
     return {
         "should_alert": True,
@@ -100,6 +124,88 @@ def check_spending_alert(
     }
 
 
+# Email templates - only the per-alert values are substituted
+_EMAIL_HTML_TEMPLATE = string.Template("""
+        <html>
+        <body style="font-family: Arial, sans-serif;">
+            <h2 style="color: #d32f2f;">💰 Spending Alert</h2>
+            <p><strong>Category:</strong> $category</p>
+            <p><strong>Current Spending:</strong> $spent</p>
+            <p><strong>Budget Limit:</strong> $budget</p>
+            <p><strong>Budget Used:</strong> $pct%</p>
+            <p><strong>Status:</strong> $status_html</p>
+            $forecast_html
+            <hr>
+            <p style="color: #666; font-size: 12px;">
+                Manage your alerts at your dashboard.
+            </p>
+        </body>
+        </html>
+        """)
+
+_EMAIL_TEXT_TEMPLATE = string.Template("""
+        Spending Alert
+
+        Category: $category
+        Current Spending: $spent
+        Budget Limit: $budget
+        Budget Used: $pct%
+        Status: $status
+        """)
+
+_OVER_BUDGET_HTML = '<span style="color: red;">Over Budget</span>'
+_FORECAST_UP_HTML = "<p><strong>⚠️ Forecast suggests spending may increase</strong></p>"
+
+
+# Priority codes used by check_spending_alert_bulk, indexing _PRIORITY_NAMES
+_PRIORITY_NAMES = np.array([
+    AlertPriority.LOW.value,
+    AlertPriority.MEDIUM.value,
+    AlertPriority.HIGH.value,
+    AlertPriority.CRITICAL.value,
+])
+
+
+def check_spending_alert_bulk(
+    spending: np.ndarray,
+    budget_limit: np.ndarray,
+    budget_pct: float | np.ndarray = 110.0,
+    threshold: float | np.ndarray = 5000.0,
+) -> dict[str, np.ndarray]:
+    """
+    Vectorized check_spending_alert over many (spending, budget) pairs.
+
+    `budget_pct` and `threshold` may be scalars or per-row arrays.
+
+    Returns:
+        Dict of arrays for the rows that should alert only: "index" (row
+        position in the inputs), "priority", "pct_used", "over_budget"
+        and "over_threshold"
+    """
+    spent = np.asarray(spending, dtype=np.float64)
+    budget = np.asarray(budget_limit, dtype=np.float64)
+
+    safe_budget = np.where(budget > 0.0, budget, 1.0)
+    pct_used = np.where(budget > 0.0, spent / safe_budget * 100.0, 0.0)
+    over_budget = pct_used >= budget_pct
+    over_threshold = spent >= np.asarray(threshold, dtype=np.float64)
+
+    priority = np.select(
+        [pct_used >= 150, pct_used >= 125, over_budget, over_threshold],
+        [3, 2, 1, 0],
+        default=-1,
+    )
+
+    index = np.flatnonzero(priority >= 0)
+    return {
+        "index": index,
+        "priority": _PRIORITY_NAMES[priority[index]],
+        "pct_used": np.round(pct_used[index], 1),
+        "over_budget": over_budget[index],
+        "over_threshold": over_threshold[index],
+    }
+
+
 class TwilioClient:
     """Twilio SMS client wrapper."""
 
@@ -108,14 +214,17 @@ class TwilioClient:
         account_sid: str,
         auth_token: str,
         from_number: str,
+        max_concurrent: int = 5,
     ):
-        try:
+        # Twilio caps concurrent API requests per account
+        self._send_limit = asyncio.Semaphore(max_concurrent)
+        if _TWILIO_AVAILABLE:
             from twilio.rest import Client
 
             self.client = Client(account_sid, auth_token)
             self.from_number = from_number
             self._enabled = True
-        except ImportError:
+        else:
             logger.warning("Twilio not installed, SMS disabled")
             self._enabled = False
 
@@ -129,11 +238,14 @@ class TwilioClient:
             return {"success": False, "error": "Twilio not configured"}
 
         try:
-            message = self.client.messages.create(
-                body=body,
-                from_=self.from_number,
-                to=to,
-            )
+            # The Twilio SDK is blocking; keep it off the event loop
+            async with self._send_limit:
+                message = await asyncio.to_thread(
+                    self.client.messages.create,
+                    body=body,
+                    from_=self.from_number,
+                    to=to,
+                )
             return {
                 "success": True,
                 "message_sid": message.sid,
@@ -151,12 +263,14 @@ class ResendClient:
         try:
             import resend
 
+            self._resend = resend
             self._enabled = bool(api_key)
             self.api_key = api_key
             if api_key:
                 resend.api_key = api_key
         except ImportError:
             logger.warning("Resend not installed, email disabled")
+            self._resend = None
             self._enabled = False
 
     async def send_email(
@@ -171,8 +285,6 @@ class ResendClient:
             return {"success": False, "error": "Resend not configured"}
 
         try:
-            import resend
-
             params = {
                 "from": "Finance AI <alerts@yourdomain.com>",
                 "to": [to],
@@ -182,7 +294,8 @@ class ResendClient:
             if text_body:
                 params["text"] = text_body
 
-            response = resend.Emails.send(params)
+            # The Resend SDK is blocking; keep it off the event loop
+            response = await asyncio.to_thread(self._resend.Emails.send, params)
             return {
                 "success": True,
                 "id": response.get("id"),
@@ -215,39 +328,29 @@ class AlertService:
             f"{'⚠️ Forecast trending up' if alert.forecast_trend == 'increasing' else ''}"
         )
 
-    def build_email_content(self, alert: SpendingAlert) -> tuple[str, str]:
-        """Build email subject and body."""
+    def build_email_content(self, alert: SpendingAlert) -> tuple[str, str, str]:
+        """Build email subject, HTML body and text body."""
         subject = f"Finance AI Alert: {alert.category} spending at {alert.budget_pct_used:.0f}%"
 
-        html = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif;">
-            <h2 style="color: #d32f2f;">💰 Spending Alert</h2>
-            <p><strong>Category:</strong> {alert.category}</p>
-            <p><strong>Current Spending:</strong> {format_currency(alert.current_spending)}</p>
-            <p><strong>Budget Limit:</strong> {format_currency(alert.budget_limit)}</p>
-            <p><strong>Budget Used:</strong> {alert.budget_pct_used:.1f}%</p>
-            <p><strong>Status:</strong> {
-                '<span style="color: red;">Over Budget</span>' if alert.is_over_budget else 'Normal'
-            }</p>
-            {'<p><strong>⚠️ Forecast suggests spending may increase</strong></p>' if alert.forecast_trend == 'increasing' else ''}
-            <hr>
-            <p style="color: #666; font-size: 12px;">
-                Manage your alerts at your dashboard.
-            </p>
-        </body>
-        </html>
-        """
-
-        text = f"""
-        Spending Alert
+        values = {
+            "category": alert.category,
+            "spent": format_currency(alert.current_spending),
+            "budget": format_currency(alert.budget_limit),
+            "pct": f"{alert.budget_pct_used:.1f}",
+        }
+
+        html = _EMAIL_HTML_TEMPLATE.substitute(
+            values,
+            status_html=_OVER_BUDGET_HTML if alert.is_over_budget else "Normal",
+            forecast_html=(
+                _FORECAST_UP_HTML if alert.forecast_trend == "increasing" else ""
+            ),
+        )
 
-        Category: {alert.category}
-        Current Spending: {format_currency(alert.current_spending)}
-        Budget Limit: {format_currency(alert.budget_limit)}
-        Budget Used: {alert.budget_pct_used:.1f}%
-        Status: {'Over Budget' if alert.is_over_budget else 'Normal'}
-        """
+        text = _EMAIL_TEXT_TEMPLATE.substitute(
+            values,
+            status="Over Budget" if alert.is_over_budget else "Normal",
+        )
 
         return subject, html, text
 
@@ -259,38 +362,48 @@ class AlertService:
         """
         Send spending alert via configured channels.
 
+        Channels are sent concurrently.
+
         Returns:
             List of send results
         """
-        results = []
+        channels = []
+        sends = []
 
         # SMS alert
         if config.sms_enabled and config.phone and self.twilio:
             message = self.build_sms_message(alert)
-            result = await self.twilio.send_sms(config.phone, message)
-            result["channel"] = AlertChannel.SMS.value
-            results.append(result)
+            channels.append(AlertChannel.SMS)
+            sends.append(self.twilio.send_sms(config.phone, message))
 
         # Email alert
         if config.email_enabled and config.email and self.resend:
             subject, html, text = self.build_email_content(alert)
-            result = await self.resend.send_email(
+            channels.append(AlertChannel.EMAIL)
+            sends.append(self.resend.send_email(
                 to=config.email,
                 subject=subject,
                 html_body=html,
                 text_body=text,
-            )
-            result["channel"] = AlertChannel.EMAIL.value
+            ))
+
+        results = []
+        for channel, result in zip(
+            channels, await asyncio.gather(*sends, return_exceptions=True)
+        ):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to send {channel.value} alert: {result}")
+                result = {"success": False, "error": str(result)}
+            result["channel"] = channel.value
             results.append(result)
 
         return results
 
 
 # Factory function for creating alert service
+@functools.lru_cache(maxsize=1)
 def create_alert_service() -> AlertService:
-    """Create alert service from environment variables."""
-    import os
-
+    """Create the process-wide alert service from environment variables."""
     twilio = None
     if os.getenv("TWILIO_ACCOUNT_SID") and os.getenv("TWILIO_AUTH_TOKEN"):
         twilio = TwilioClient(
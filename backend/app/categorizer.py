@@ -1,21 +1,62 @@
 """LLM-based transaction categorization."""
-import json
+import asyncio
+import functools
+import hashlib
 import logging
 import os
+import random
+import re
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from decimal import Decimal
-from typing import Any
+from typing import Any, Literal
 
+import httpx
+import litellm
+import openai
+import orjson
 from openai import AsyncOpenAI
-from pydantic import BaseModel
 
-from .models import Category, TransactionCreate
+from .models import CATEGORY_SET, Category, TransactionCreate
 
 logger = logging.getLogger(__name__)
 
 # Ollama OpenAI-compatible endpoint
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1")
 OLLAMA_API_KEY = "ollama-api-key"
+DEFAULT_MODEL = "qwen2.5-coder:3b"
+
+LLMBackend = Literal["ollama", "openai", "litellm"]
+
+# Retry transient LLM failures (timeouts, 429, 5xx) with exponential backoff
+LLM_MAX_ATTEMPTS = 3
+LLM_RETRY_BASE_DELAY = 0.2
+LLM_RETRY_JITTER = 0.1
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether an LLM call error is worth retrying."""
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in _RETRYABLE_STATUS
+    return False
+
+# Shared keep-alive connection pool for all Categorizer clients
+MAX_LLM_CONNECTIONS = 32
+_HTTP_CLIENT = httpx.AsyncClient(
+    timeout=httpx.Timeout(60.0, connect=5.0),
+    limits=httpx.Limits(
+        max_connections=MAX_LLM_CONNECTIONS,
+        max_keepalive_connections=MAX_LLM_CONNECTIONS,
+    ),
+)
 
 # Categorization prompt template - optimized for Ollama qwen2.5-coder
 CATEGORIZE_PROMPT = """You are a financial transaction classifier. Classify this transaction into ONE category.
@@ -42,75 +83,329 @@ Rules:
 
 JSON:"""
 
+# Per-transaction lines of CATEGORIZE_PROMPT; everything else is static
+_PROMPT_TX_LINES = 'Transaction: "{description}"\nAmount: ₹{amount}\n'
+
+# Transactions packed into one prompt by categorize_batch
+BATCH_SIZE = 20
+
+# Batch prompt - the category rubric is sent once per chunk
+CATEGORIZE_BATCH_PROMPT = """You are a financial transaction classifier. Classify EACH transaction into ONE category.
+
+Categories: {categories}
+
+Transactions:
+{transactions}
+
+Output a JSON array only, one object per transaction, using its "i" index:
+[{{"i": 0, "category": "CategoryName", "confidence": 0.95}}]
+
+Rules:
+- "Subscriptions" = Netflix, Spotify, SaaS
+- "Dining" = restaurants, cafes, food delivery
+- "Groceries" = supermarkets, food for home
+- "Transport" = rides, fuel, public transit
+- "Utilities" = electricity, water, internet, phone
+- "Shopping" = goods, clothing, electronics
+- "Entertainment" = movies, games, events
+- "Health" = pharmacy, doctor, fitness
+- "Income" = salary, refunds, deposits
+- "Savings" = transfers to savings/investments
+
+JSON:"""
+
+
+# Well-known merchants/keywords that need no LLM round-trip
+KEYWORD_MAP = {
+    "netflix": "Subscriptions",
+    "spotify": "Subscriptions",
+    "hotstar": "Subscriptions",
+    "prime video": "Subscriptions",
+    "youtube premium": "Subscriptions",
+    "swiggy": "Dining",
+    "zomato": "Dining",
+    "starbucks": "Dining",
+    "bigbasket": "Groceries",
+    "blinkit": "Groceries",
+    "zepto": "Groceries",
+    "dmart": "Groceries",
+    "uber": "Transport",
+    "rapido": "Transport",
+    "irctc": "Transport",
+    "petrol": "Transport",
+    "electricity": "Utilities",
+    "broadband": "Utilities",
+    "airtel": "Utilities",
+    "jio": "Utilities",
+    "amazon": "Shopping",
+    "flipkart": "Shopping",
+    "myntra": "Shopping",
+    "bookmyshow": "Entertainment",
+    "pharmacy": "Health",
+    "medplus": "Health",
+    "salary": "Income",
+}
+
+KEYWORD_PATTERN = re.compile(
+    r"\b(?:" + "|".join(map(re.escape, KEYWORD_MAP)) + r")\b", re.IGNORECASE
+)
+
+# Confidence reported for keyword matches
+KEYWORD_CONFIDENCE = 0.99
+
+
+# Categorized descriptions remembered across categorize_batch calls
+RESULT_CACHE_SIZE = 4096
+
+_NON_WORD_RE = re.compile(r"\W+")
+
+
+def normalize_description(description: str) -> str:
+    """Normalize a description so repeated merchants share one key."""
+    return _NON_WORD_RE.sub("", description.lower())
+
+
+# On-disk cache surviving restarts; set CATEGORY_CACHE_PATH="" to disable
+CATEGORY_CACHE_PATH = os.getenv("CATEGORY_CACHE_PATH", "cat_cache.db")
+
+
+class CategoryCache:
+    """SQLite cache of normalized description hash -> (category, confidence)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(description_key: str) -> bytes:
+        return hashlib.blake2b(description_key.encode(), digest_size=16).digest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key BLOB PRIMARY KEY, cat TEXT NOT NULL, conf REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, description_keys: list[str]) -> dict[str, tuple[str, float]]:
+        """Look up cached results; missing keys are left out."""
+        if not description_keys:
+            return {}
+
+        by_hash = {self._key(k): k for k in description_keys}
+        placeholders = ",".join("?" * len(by_hash))
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT key, cat, conf FROM cache WHERE key IN ({placeholders})",
+                list(by_hash),
+            ).fetchall()
+        return {by_hash[key]: (cat, conf) for key, cat, conf in rows}
+
+    def put_many(self, results: dict[str, tuple[str, float]]) -> None:
+        """Store results keyed by normalized description."""
+        if not results:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, cat, conf) VALUES (?, ?, ?)",
+                [(self._key(k), cat, conf) for k, (cat, conf) in results.items()],
+            )
+            conn.commit()
+
+
+# Optional ```/```json fences around the payload, plus surrounding whitespace
+_FENCE_RE = re.compile(r"\A\s*(?:```(?:json)?)?\s*(.*?)\s*(?:```)?\s*\Z", re.S)
+
+
+def _strip_code_fences(content: str) -> str:
+    """Strip markdown code block wrappers from an LLM response."""
+    return _FENCE_RE.match(content).group(1)
+
 
 class Categorizer:
-    """LLM-powered transaction categorizer."""
+    """LLM-powered transaction categorizer.
 
-    def __init__(self, model: str = "qwen2.5-coder:3b"):
+    `backend` selects how the LLM is called: "ollama" (default, Ollama's
+    OpenAI-compatible API), "openai" (OpenAI API, OPENAI_API_KEY) or
+    "litellm" (litellm.acompletion with a LiteLLM model string).
+    """
+
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        cache_path: str | None = CATEGORY_CACHE_PATH,
+        backend: LLMBackend = "ollama",
+    ):
         self.model = model
+        self.backend = backend
         self.categories = Category.all()
+        self._categories_set = CATEGORY_SET
+        self._categories_str = ", ".join(self.categories)
+
+        # Static parts of the prompt (categories + rubric), built once
+        head, tail = CATEGORIZE_PROMPT.split(_PROMPT_TX_LINES)
+        self._prompt_prefix = head.format(categories=self._categories_str)
+        self._prompt_suffix = tail.format()
+
+        # LRU of normalized description -> (category, confidence)
+        self._result_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._disk_cache = CategoryCache(cache_path) if cache_path else None
+
+        self.client: AsyncOpenAI | None = None
+        if backend == "ollama":
+            # Use OpenAI SDK with Ollama's OpenAI-compatible API
+            self.client = AsyncOpenAI(
+                base_url=OLLAMA_BASE_URL,
+                api_key=OLLAMA_API_KEY,
+                http_client=_HTTP_CLIENT,
+                max_retries=0,
+            )
+        elif backend == "openai":
+            self.client = AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                http_client=_HTTP_CLIENT,
+                max_retries=0,
+            )
+
+        self._call = {
+            "ollama": self._call_openai,
+            "openai": self._call_openai,
+            "litellm": self._call_litellm,
+        }[backend]
 
-        # Use OpenAI SDK with Ollama's OpenAI-compatible API
-        self.client = AsyncOpenAI(
-            base_url=OLLAMA_BASE_URL,
-            api_key=OLLAMA_API_KEY,
+        logger.info(
+            f"Initialized categorizer with model: {self.model} ({self.backend})"
         )
 
-        logger.info(f"Initialized categorizer with model: {self.model}")
+    async def _call_openai(self, prompt: str, max_tokens: int) -> str | None:
+        """Call an OpenAI-compatible chat completions endpoint."""
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.1,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content
+
+    async def _call_litellm(self, prompt: str, max_tokens: int) -> str | None:
+        """Call the model through LiteLLM."""
+        response = await litellm.acompletion(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.1,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content
+
+    async def _call_llm(self, prompt: str, max_tokens: int) -> str | None:
+        """
+        Send a prompt to the configured backend and return the reply text.
+
+        Transient errors are retried with exponential backoff and jitter;
+        anything else, or the last failed attempt, is raised.
+        """
+        for attempt in range(LLM_MAX_ATTEMPTS):
+            try:
+                return await self._call(prompt, max_tokens)
+            except Exception as e:
+                if attempt == LLM_MAX_ATTEMPTS - 1 or not _is_transient(e):
+                    raise
+                delay = (
+                    LLM_RETRY_BASE_DELAY * 2 ** attempt
+                    + random.random() * LLM_RETRY_JITTER
+                )
+                logger.warning(
+                    f"LLM call failed ({e}), retrying in {delay:.2f}s "
+                    f"(attempt {attempt + 1}/{LLM_MAX_ATTEMPTS})"
+                )
+                await asyncio.sleep(delay)
 
     def _build_prompt(self, description: str, amount: Decimal) -> str:
         """Build categorization prompt."""
-        return CATEGORIZE_PROMPT.format(
-            categories=", ".join(self.categories),
-            description=description,
-            amount=amount,
+        return (
+            f'{self._prompt_prefix}Transaction: "{description}"\n'
+            f"Amount: ₹{amount}\n{self._prompt_suffix}"
         )
 
+    def _match_keyword(
+        self, transaction: TransactionCreate, start: float
+    ) -> dict[str, Any] | None:
+        """Categorize from KEYWORD_MAP, or return None if nothing matches."""
+        match = KEYWORD_PATTERN.search(transaction.description)
+        if match is None:
+            return None
+
+        return {
+            "description": transaction.description,
+            "category": KEYWORD_MAP[match.group(0).lower()],
+            "confidence": KEYWORD_CONFIDENCE,
+            "processing_time_ms": int((time.perf_counter() - start) * 1000),
+        }
+
     async def categorize(
         self, transaction: TransactionCreate
     ) -> dict[str, Any]:
         """
         Categorize a single transaction.
 
+        Known merchants are resolved from KEYWORD_MAP, and previously seen
+        descriptions from the on-disk cache, without calling the LLM.
+
         Returns:
             Dict with category, confidence, and processing time
         """
         start = time.perf_counter()
 
+        keyword_result = self._match_keyword(transaction, start)
+        if keyword_result is not None:
+            return keyword_result
+
+        key = normalize_description(transaction.description)
+        if self._disk_cache is not None:
+            cached = await asyncio.to_thread(self._disk_cache.get_many, [key])
+            if key in cached:
+                category, confidence = cached[key]
+                return {
+                    "description": transaction.description,
+                    "category": category,
+                    "confidence": confidence,
+                    "processing_time_ms": int(
+                        (time.perf_counter() - start) * 1000
+                    ),
+                }
+
         prompt = self._build_prompt(
             transaction.description, transaction.amount
         )
 
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=100,
-            )
-
-            content = response.choices[0].message.content or "{}"
+            content = await self._call_llm(prompt, max_tokens=100) or "{}"
 
             # Clean markdown code block wrappers if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
+            content = _strip_code_fences(content)
 
             # Parse JSON response
-            result = json.loads(content)
+            result = orjson.loads(content)
 
             # Validate category
             category = result.get("category", "Other")
-            if category not in self.categories:
+            if category not in self._categories_set:
                 category = "Other"
 
             confidence = float(result.get("confidence", 0.5))
 
+            if self._disk_cache is not None:
+                await asyncio.to_thread(
+                    self._disk_cache.put_many, {key: (category, confidence)}
+                )
+
             return {
                 "description": transaction.description,
                 "category": category,
@@ -120,7 +415,7 @@ class Categorizer:
                 ),
             }
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             return {
                 "description": transaction.description,
                 "category": "Other",
@@ -137,43 +432,230 @@ class Categorizer:
                 "processing_time_ms": int((time.perf_counter() - start) * 1000),
             }
 
+    def _build_batch_prompt(self, transactions: list[TransactionCreate]) -> str:
+        """Build a single prompt categorizing a chunk of transactions."""
+        items = [
+            {"i": i, "desc": tx.description, "amount": str(tx.amount)}
+            for i, tx in enumerate(transactions)
+        ]
+        return CATEGORIZE_BATCH_PROMPT.format(
+            categories=self._categories_str,
+            transactions=orjson.dumps(items).decode(),
+        )
+
+    async def _categorize_chunk(
+        self, transactions: list[TransactionCreate]
+    ) -> list[dict[str, Any]]:
+        """
+        Categorize a chunk of transactions with one LLM call.
+
+        Falls back to per-transaction calls if the batched response
+        cannot be parsed, or for any index the model left out.
+        """
+        start = time.perf_counter()
+
+        prompt = self._build_batch_prompt(transactions)
+
+        try:
+            content = await self._call_llm(
+                prompt, max_tokens=40 * len(transactions) + 50
+            ) or "[]"
+            parsed = orjson.loads(_strip_code_fences(content))
+            if not isinstance(parsed, list):
+                raise ValueError("Expected a JSON array")
+
+        except ValueError as e:  # includes orjson.JSONDecodeError
+            logger.warning(f"Batch categorization fell back to per-item mode: {e}")
+            return list(
+                await asyncio.gather(*(self.categorize(tx) for tx in transactions))
+            )
+
+        by_index: dict[int, dict[str, Any]] = {}
+        for item in parsed:
+            if isinstance(item, dict) and isinstance(item.get("i"), int):
+                by_index[item["i"]] = item
+
+        # Spread the shared round-trip over the chunk
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
+        per_item_ms = elapsed_ms // len(transactions)
+
+        results: list[dict[str, Any] | None] = []
+        missing: list[int] = []
+        for i, tx in enumerate(transactions):
+            item = by_index.get(i)
+            if item is None:
+                results.append(None)
+                missing.append(i)
+                continue
+
+            category = item.get("category", "Other")
+            if category not in self._categories_set:
+                category = "Other"
+
+            try:
+                confidence = float(item.get("confidence", 0.5))
+            except (TypeError, ValueError):
+                confidence = 0.5
+
+            results.append({
+                "description": tx.description,
+                "category": category,
+                "confidence": confidence,
+                "processing_time_ms": per_item_ms,
+            })
+
+        if missing:
+            retried = await asyncio.gather(
+                *(self.categorize(transactions[i]) for i in missing)
+            )
+            for i, result in zip(missing, retried):
+                results[i] = result
+
+        return results
+
+    def _cache_get(self, key: str) -> tuple[str, float] | None:
+        """Look up a cached result by normalized description."""
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            self._result_cache.move_to_end(key)
+        return cached
+
+    def _cache_put(self, key: str, category: str, confidence: float) -> None:
+        """Cache a result by normalized description, evicting the oldest."""
+        self._result_cache[key] = (category, confidence)
+        self._result_cache.move_to_end(key)
+        if len(self._result_cache) > RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+
     async def categorize_batch(
-        self, transactions: list[TransactionCreate], max_concurrent: int = 10
+        self,
+        transactions: list[TransactionCreate],
+        max_concurrent: int = 10,
+        batch_size: int = BATCH_SIZE,
     ) -> list[dict[str, Any]]:
         """
         Categorize multiple transactions concurrently.
 
-        Uses semaphore to limit concurrent API calls.
+        Transactions matching KEYWORD_MAP or a previously categorized
+        description (in memory or on disk) are resolved up front. The rest are grouped by
+        normalized description so each unique description is sent once,
+        packed up to `batch_size` per LLM call, and processed by a pool of
+        `max_concurrent` workers. Both must be at least 1 (ValueError
+        otherwise).
         """
-        import asyncio
-
-        semaphore = asyncio.Semaphore(max_concurrent)
+        if max_concurrent < 1:
+            raise ValueError(f"max_concurrent must be at least 1, got {max_concurrent}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
 
-        async def categorize_with_limit(tx: TransactionCreate) -> dict[str, Any]:
-            async with semaphore:
-                return await self.categorize(tx)
+        start = time.perf_counter()
 
-        tasks = [categorize_with_limit(tx) for tx in transactions]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        processed: list[dict[str, Any] | None] = []
+        groups: dict[str, list[int]] = {}
+        for i, tx in enumerate(transactions):
+            result = self._match_keyword(tx, start)
+            if result is None:
+                key = normalize_description(tx.description)
+                cached = self._cache_get(key)
+                if cached is not None:
+                    result = {
+                        "description": tx.description,
+                        "category": cached[0],
+                        "confidence": cached[1],
+                        "processing_time_ms": 0,
+                    }
+                else:
+                    groups.setdefault(key, []).append(i)
+            processed.append(result)
+
+        if groups and self._disk_cache is not None:
+            on_disk = await asyncio.to_thread(
+                self._disk_cache.get_many, list(groups)
+            )
+            for key, (category, confidence) in on_disk.items():
+                self._cache_put(key, category, confidence)
+                for i in groups.pop(key):
+                    processed[i] = {
+                        "description": transactions[i].description,
+                        "category": category,
+                        "confidence": confidence,
+                        "processing_time_ms": 0,
+                    }
+
+        pending = list(groups.items())
+
+        chunks = [
+            pending[i:i + batch_size]
+            for i in range(0, len(pending), batch_size)
+        ]
+
+        # Fixed pool of workers draining a queue of chunk indexes
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for chunk_index in range(len(chunks)):
+            queue.put_nowait(chunk_index)
+
+        results: list[list[dict[str, Any]] | Exception | None] = [None] * len(chunks)
+
+        async def worker() -> None:
+            while True:
+                try:
+                    chunk_index = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[chunk_index] = await self._categorize_chunk(
+                        [transactions[indexes[0]] for _, indexes in chunks[chunk_index]]
+                    )
+                except Exception as e:
+                    results[chunk_index] = e
+
+        await asyncio.gather(
+            *(worker() for _ in range(min(max_concurrent, len(chunks))))
+        )
 
-        # Handle exceptions
-        processed = []
-        for i, result in enumerate(results):
+        # Fan results back out to every transaction in each group
+        fresh: dict[str, tuple[str, float]] = {}
+        for chunk, result in zip(chunks, results):
             if isinstance(result, Exception):
-                processed.append({
-                    "description": transactions[i].description,
-                    "category": "Other",
-                    "confidence": 0.0,
-                    "error": str(result),
-                    "processing_time_ms": 0,
-                })
-            else:
-                processed.append(result)
+                for _, indexes in chunk:
+                    for i in indexes:
+                        processed[i] = {
+                            "description": transactions[i].description,
+                            "category": "Other",
+                            "confidence": 0.0,
+                            "error": str(result),
+                            "processing_time_ms": 0,
+                        }
+                continue
+
+            for (key, indexes), item in zip(chunk, result):
+                if "error" not in item:
+                    self._cache_put(key, item["category"], item["confidence"])
+                    fresh[key] = (item["category"], item["confidence"])
+                processed[indexes[0]] = item
+                for i in indexes[1:]:
+                    processed[i] = {
+                        **item,
+                        "description": transactions[i].description,
+                        "processing_time_ms": 0,
+                    }
+
+        if fresh and self._disk_cache is not None:
+            await asyncio.to_thread(self._disk_cache.put_many, fresh)
 
         return processed
 
 
-class CategorizeBatchResult(BaseModel):
+@functools.lru_cache(maxsize=4)
+def _get_categorizer(
+    model: str = DEFAULT_MODEL, backend: LLMBackend = "ollama"
+) -> Categorizer:
+    """Get the process-wide Categorizer for a model and backend."""
+    return Categorizer(model, backend=backend)
+
+
+@dataclass(slots=True, frozen=True)
+class CategorizeBatchResult:
     """Batch categorization result."""
     results: list[dict[str, Any]]
     total: int
@@ -183,11 +665,15 @@ class CategorizeBatchResult(BaseModel):
 
 async def categorize_batch(
     transactions: list[dict],
+    categorizer: Categorizer | None = None,
 ) -> CategorizeBatchResult:
     """
     LangGraph tool function for batch categorization.
+
+    Uses the process-wide default Categorizer unless one is passed in.
     """
-    categorizer = Categorizer()
+    if categorizer is None:
+        categorizer = _get_categorizer()
 
     # Convert dicts to TransactionCreate
     tx_objects = [
@@ -1,9 +1,25 @@
 """Supabase client wrapper."""
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 import os
-from supabase import Client, AsyncClient, create_client, ClientOptions
+import httpx
+from supabase import (
+    AsyncClient,
+    AsyncClientOptions,
+    Client,
+    acreate_client,
+    create_client,
+)
+
+# Connection pool for the shared async clients (HTTP/2 multiplexes requests)
+SUPABASE_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+SUPABASE_HTTP_TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+
+# Shared async clients, keyed by (url, key)
+_async_clients: dict[tuple[str, str], AsyncClient] = {}
+_async_clients_lock = asyncio.Lock()
 
 
 def get_supabase_client() -> Client:
@@ -18,26 +34,44 @@ def get_supabase_client() -> Client:
 
 
 async def get_async_supabase_client() -> AsyncClient:
-    """Get async Supabase client."""
+    """
+    Get the shared async Supabase client.
+
+    The client is created on first use and reused by later calls, so
+    requests share its HTTP connections.
+    """
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
 
     if not url or not key:
         raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY required")
 
-    options = ClientOptions(
-        schema="public",
-        auto_refresh_token=True,
-    )
+    client = _async_clients.get((url, key))
+    if client is not None:
+        return client
 
-    return await create_client(url, key, options)
+    async with _async_clients_lock:
+        # Another request may have created it while we waited
+        if (url, key) not in _async_clients:
+            options = AsyncClientOptions(
+                schema="public",
+                auto_refresh_token=True,
+                httpx_client=httpx.AsyncClient(
+                    http2=True,
+                    limits=SUPABASE_HTTP_LIMITS,
+                    timeout=SUPABASE_HTTP_TIMEOUT,
+                ),
+            )
+            _async_clients[(url, key)] = await acreate_client(url, key, options)
+        return _async_clients[(url, key)]
 
 
 @asynccontextmanager
 async def get_supabase() -> AsyncGenerator[AsyncClient, None]:
-    """Context manager for async Supabase client."""
+    """Context manager for the shared async Supabase client."""
     client = await get_async_supabase_client()
     try:
         yield client
     finally:
+        # Shared client stays open for reuse
         pass
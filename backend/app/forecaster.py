@@ -1,18 +1,27 @@
 """Prophet-based forecasting with LLM sanity check."""
 import asyncio
-import json
+import functools
+import hashlib
 import logging
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Any
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any
 
 from openai import AsyncOpenAI
+import numpy as np
+import orjson
 import pandas as pd
-from prophet import Prophet
 
+from .forecaster_fast import fast_forecast_frame
 from .models import TransactionBase
 
+if TYPE_CHECKING:
+    from prophet import Prophet as ProphetModel
+
 logger = logging.getLogger(__name__)
 
 # Ollama OpenAI-compatible endpoint
@@ -33,6 +42,110 @@ Respond with JSON:
 JSON response:"""
 
 
+# Use the closed-form linear + weekly forecaster instead of Prophet
+# (development and tests; no Stan fit)
+FORECAST_FAST = os.getenv("FORECAST_FAST", "").lower() in ("1", "true", "yes")
+
+# Forecasts within this many std devs of the daily mean skip the LLM check
+PLAUSIBLE_STD_DEVIATIONS = 2
+
+# Only fit yearly seasonality with at least 1.5 years of history
+YEARLY_SEASONALITY_MIN_DAYS = 540
+
+# Prophet output columns returned alongside 'ds' in forecast_df
+FORECAST_DF_COLUMNS = ("yhat", "yhat_lower", "yhat_upper", "trend")
+
+# Last fitted parameters per (user, category, yearly), used to warm-start
+# Stan; only a user's own history ever seeds their next fit
+WARM_START_CACHE_SIZE = 1024
+_warm_start: OrderedDict[tuple, dict[str, Any]] = OrderedDict()
+_warm_start_lock = threading.Lock()
+
+# Fitted forecasts, keyed by input data hash + category + horizon
+FORECAST_CACHE_SIZE = 128
+_forecast_cache: OrderedDict[tuple, dict[str, Any]] = OrderedDict()
+# Fits may run on executor threads
+_forecast_cache_lock = threading.Lock()
+
+# Fitted models, keyed by input data hash + category (any horizon reuses one)
+FITTED_MODEL_CACHE_SIZE = 32
+_model_cache: OrderedDict[tuple, "ProphetModel"] = OrderedDict()
+
+
+# Prophet model class, imported on first use by _prophet_class()
+Prophet: Any = None
+
+
+def _prophet_class() -> type["ProphetModel"]:
+    """
+    Import Prophet on first use.
+
+    Importing prophet (Stan backend, plotting hooks) takes most of a second,
+    so workers that never forecast don't pay for it at startup.
+    """
+    global Prophet
+    if Prophet is None:
+        from prophet import Prophet as prophet_cls
+
+        Prophet = prophet_cls
+    return Prophet
+
+
+def forecast_cache_key(
+    df: pd.DataFrame,
+    periods: int,
+    category: str | None = None,
+    uncertainty_samples: int = 1000,
+) -> tuple:
+    """Build a cache key from the Prophet input frame and forecast options."""
+    return (category, _frame_digest(df), periods, uncertainty_samples)
+
+
+def _frame_digest(df: pd.DataFrame) -> bytes:
+    """Hash the 'ds' and 'y' columns of a Prophet input frame."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(df["ds"].values.tobytes())
+    digest.update(df["y"].values.tobytes())
+    return digest.digest()
+
+
+def _warm_start_params(model: "ProphetModel") -> dict[str, Any]:
+    """Extract a fitted model's MAP parameters in Stan's init format."""
+    params = {name: model.params[name][0][0] for name in ("k", "m", "sigma_obs")}
+    params.update({name: model.params[name][0] for name in ("delta", "beta")})
+    return params
+
+
+def _fit_init(model: "ProphetModel", df: pd.DataFrame, key: tuple) -> dict[str, Any] | None:
+    """Previous parameters for key, if their shapes fit this model and data."""
+    with _warm_start_lock:
+        init = _warm_start.get(key)
+        if init is not None:
+            _warm_start.move_to_end(key)
+    if init is None:
+        return None
+
+    # Mirror Prophet's changepoint count so delta has the right length
+    hist_size = int(np.floor(len(df) * model.changepoint_range))
+    n_changepoints = min(model.n_changepoints, hist_size - 1)
+    if n_changepoints < 1 or len(init["delta"]) != n_changepoints:
+        return None
+    return init
+
+
+_get_amount = attrgetter("amount")
+
+
+def _float_amounts(txs: list[TransactionBase]) -> np.ndarray:
+    """
+    Transaction amounts as float64, converted once.
+
+    Everything downstream (Prophet, summary statistics) works in floats,
+    so Decimal arithmetic stops here.
+    """
+    return np.fromiter(map(float, map(_get_amount, txs)), dtype=np.float64, count=len(txs))
+
+
 def prepare_prophet_data(
     transactions: list[TransactionBase], category: str | None = None
 ) -> pd.DataFrame:
@@ -46,73 +159,94 @@ def prepare_prophet_data(
     Returns:
         DataFrame with 'ds' (date) and 'y' (amount) columns
     """
-    # Filter by category if specified
-    if category:
-        txs = [t for t in transactions if t.category == category]
-    else:
-        txs = transactions
-
-    # Exclude income transactions
-    txs = [t for t in txs if not t.is_income]
+    # Filter by category (if specified) and exclude income in one pass
+    txs = [
+        t for t in transactions
+        if not t.is_income and (not category or t.category == category)
+    ]
 
     if not txs:
         raise ValueError("No transactions found for forecasting")
 
-    # Aggregate by date
-    df = pd.DataFrame([
-        {
-            "ds": tx.date.date() if hasattr(tx.date, 'date') else tx.date,
-            "y": float(tx.amount),
-        }
-        for tx in txs
-    ])
-
-    if df.empty:
-        raise ValueError("No valid data after filtering")
-
-    # Group by date and sum
-    df = df.groupby("ds")["y"].sum().reset_index()
+    # Build columns as NumPy arrays and construct the frame in one call
+    n = len(txs)
+    dates = np.fromiter(
+        (d.date() if isinstance(d, datetime) else d for d in (t.date for t in txs)),
+        dtype="datetime64[D]",
+        count=n,
+    )
+    amounts = _float_amounts(txs)
 
-    # Fill missing dates with 0
-    date_range = pd.date_range(df["ds"].min(), df["ds"].max(), freq="D")
-    df = df.set_index("ds").reindex(date_range, fill_value=0).reset_index()
-    df.columns = ["ds", "y"]
+    # Sum per day over the full date range (missing dates get 0) in one
+    # bincount, instead of a pandas groupby + asfreq
+    days = dates.astype(np.int64)
+    start = days.min()
+    totals = np.bincount(days - start, weights=amounts)
+    ds = np.arange(start, start + len(totals)).astype("datetime64[D]")
 
-    return df
+    return pd.DataFrame({"ds": ds, "y": totals})
 
 
-def forecast_with_prophet(
+def _fitted_model(
     df: pd.DataFrame,
-    periods: int = 30,
-    category: str | None = None,
-) -> dict[str, Any]:
+    category: str | None,
+    uncertainty_samples: int,
+    digest: bytes,
+    user_id: str | None = None,
+) -> "ProphetModel":
     """
-    Generate forecast using Prophet.
+    Fit Prophet on df (whose _frame_digest is digest), reusing a cached fit.
 
-    Args:
-        df: DataFrame with 'ds' (dates) and 'y' (amounts)
-        periods: Days to forecast ahead
-        category: Category name for reference
-
-    Returns:
-        Forecast results with predictions and confidence intervals
+    Fits for a known user_id warm-start from that user's previous fit for
+    the category; anonymous fits always start cold.
     """
-    model = Prophet(
+    key = (category, digest, uncertainty_samples)
+    with _forecast_cache_lock:
+        model = _model_cache.get(key)
+        if model is not None:
+            _model_cache.move_to_end(key)
+            return model
+
+    # Yearly Fourier terms are unstable (and wasted work) on short histories
+    span_days = (df["ds"].max() - df["ds"].min()).days
+
+    model = _prophet_class()(
         daily_seasonality=False,
         weekly_seasonality=True,
-        yearly_seasonality=True,
+        yearly_seasonality=span_days >= YEARLY_SEASONALITY_MIN_DAYS,
         changepoint_prior_scale=0.05,
+        uncertainty_samples=uncertainty_samples,
     )
 
-    # Fit model
-    model.fit(df)
+    # Fit model (Newton converges more reliably than the default L-BFGS here).
+    # Prophet models can't be refit, so reuse the user's last fit parameters
+    # as the optimizer's starting point instead.
+    warm_key = (user_id, category, model.yearly_seasonality)
+    init = _fit_init(model, df, warm_key) if user_id is not None else None
+    if init is not None:
+        model.fit(df, algorithm="Newton", init=init)
+    else:
+        model.fit(df, algorithm="Newton")
 
-    # Create future dataframe
-    future = model.make_future_dataframe(periods=periods)
+    if user_id is not None:
+        with _warm_start_lock:
+            _warm_start[warm_key] = _warm_start_params(model)
+            _warm_start.move_to_end(warm_key)
+            if len(_warm_start) > WARM_START_CACHE_SIZE:
+                _warm_start.popitem(last=False)
+
+    with _forecast_cache_lock:
+        _model_cache[key] = model
+        if len(_model_cache) > FITTED_MODEL_CACHE_SIZE:
+            _model_cache.popitem(last=False)
+
+    return model
 
-    # Predict
-    forecast = model.predict(future)
 
+def _forecast_result(
+    forecast: pd.DataFrame, category: str | None, uncertainty_samples: int
+) -> dict[str, Any]:
+    """Build the forecast result from Prophet-shaped predictions."""
     # Get last prediction
     last_row = forecast.iloc[-1]
 
@@ -120,15 +254,84 @@ def forecast_with_prophet(
         "category": category,
         "forecast_date": last_row["ds"].isoformat(),
         "predicted_amount": round(float(last_row["yhat"]), 2),
-        "confidence_lower": round(float(last_row["yhat_lower"]), 2),
-        "confidence_upper": round(float(last_row["yhat_upper"]), 2),
+        "confidence_lower": (
+            round(float(last_row["yhat_lower"]), 2) if uncertainty_samples else None
+        ),
+        "confidence_upper": (
+            round(float(last_row["yhat_upper"]), 2) if uncertainty_samples else None
+        ),
         "trend": round(float(last_row["trend"]), 2),
         "weekly_seasonality": round(float(last_row["weekly"]), 2),
-        "yearly_seasonality": round(float(last_row["yearly"]), 2),
-        "forecast_df": forecast.tail(periods + 7).to_dict(orient="records"),
+        # No yearly component when the history is too short to fit one
+        "yearly_seasonality": round(float(last_row.get("yearly", 0.0)), 2),
+        # Columnar: one list per column instead of a dict per row
+        "forecast_df": {
+            "ds": forecast["ds"].dt.strftime("%Y-%m-%d").tolist(),
+            **{
+                col: forecast[col].round(2).tolist()
+                for col in FORECAST_DF_COLUMNS
+                if col in forecast
+            },
+        },
     }
 
 
+def forecast_with_prophet(
+    df: pd.DataFrame,
+    periods: int = 30,
+    category: str | None = None,
+    uncertainty_samples: int = 1000,
+    user_id: str | None = None,
+) -> dict[str, Any]:
+    """
+    Generate forecast using Prophet (or the closed-form fast path when
+    FORECAST_FAST is set).
+
+    Args:
+        df: DataFrame with 'ds' (dates) and 'y' (amounts)
+        periods: Days to forecast ahead
+        category: Category name for reference
+        uncertainty_samples: Posterior samples for the confidence interval
+            (0 skips sampling; confidence bounds are then None)
+        user_id: Owner of the data; lets the fit warm-start from their
+            previous one (None always fits cold)
+
+    Returns:
+        Forecast results with predictions and confidence intervals
+    """
+    if FORECAST_FAST:
+        return _forecast_result(
+            fast_forecast_frame(df, periods), category, uncertainty_samples
+        )
+
+    key = forecast_cache_key(df, periods, category, uncertainty_samples)
+    with _forecast_cache_lock:
+        cached = _forecast_cache.get(key)
+        if cached is not None:
+            _forecast_cache.move_to_end(key)
+    if cached is not None:
+        # Callers annotate the result, so hand out a copy
+        return dict(cached)
+
+    # A new horizon on already-fitted data only needs a predict
+    model = _fitted_model(
+        df, category, uncertainty_samples, digest=key[1], user_id=user_id
+    )
+
+    # Predict only the future dates; history rows aren't returned
+    future = model.make_future_dataframe(periods=periods, include_history=False)
+    forecast = model.predict(future)
+
+    result = _forecast_result(forecast, category, uncertainty_samples)
+
+    with _forecast_cache_lock:
+        _forecast_cache[key] = result
+        if len(_forecast_cache) > FORECAST_CACHE_SIZE:
+            _forecast_cache.popitem(last=False)
+
+    return dict(result)
+
+
 async def sanity_check_forecast(
     forecast: dict[str, Any],
     history_summary: dict[str, Any],
@@ -143,8 +346,21 @@ async def sanity_check_forecast(
     Returns:
         LLM assessment with is_plausible flag
     """
+    # Forecasts inside the historical band don't need the LLM
+    std_daily = history_summary.get("std_daily")
+    if std_daily is not None and (
+        abs(forecast["predicted_amount"] - history_summary["avg_daily"])
+        <= PLAUSIBLE_STD_DEVIATIONS * std_daily
+    ):
+        forecast["llm_sanity_check"] = {
+            "is_plausible": True,
+            "reason": f"Within {PLAUSIBLE_STD_DEVIATIONS}σ of historical daily spending",
+        }
+        return forecast
+
     prompt = SANITY_CHECK_PROMPT.format(
-        history_summary=json.dumps(history_summary),
+        # default=str keeps Decimal/datetime values from breaking the dump
+        history_summary=orjson.dumps(history_summary, default=str).decode(),
         forecast_amount=forecast["predicted_amount"],
         category=forecast.get("category", "All"),
         date=forecast["forecast_date"],
@@ -162,10 +378,12 @@ async def sanity_check_forecast(
             messages=[{"role": "user", "content": prompt}],
             temperature=0.0,
             max_tokens=200,
+            # Constrain the model to emit a JSON object
+            response_format={"type": "json_object"},
         )
 
         content = response.choices[0].message.content or "{}"
-        result = json.loads(content)
+        result = orjson.loads(content)
 
         # Apply adjustment if suggested
         if result.get("suggested_adjustment"):
@@ -199,28 +417,53 @@ def calculate_history_summary(
     if not txs:
         return {"count": 0, "total": 0, "avg_daily": 0, "avg_monthly": 0}
 
-    amounts = [float(t.amount) for t in txs]
-    dates = [t.date for t in txs]
-
-    if len(dates) < 2:
-        return {"count": len(amounts), "total": sum(amounts), "avg_daily": 0, "avg_monthly": 0}
+    if len(txs) < 2:
+        total = float(txs[0].amount)
+        return {"count": 1, "total": total, "avg_daily": 0, "avg_monthly": 0}
 
+    # One conversion to float64, then vectorized reductions
+    amounts = _float_amounts(txs)
+    total = float(amounts.sum())
+    # Pull the dates out once; min/max then run as C loops over the list
+    dates = [t.date for t in txs]
     date_range = (max(dates) - min(dates)).days or 1
 
+    # Spread of daily totals (days without spending count as 0)
+    days = np.fromiter(
+        (d.toordinal() for d in dates), dtype=np.int64, count=len(dates)
+    )
+    daily_totals = np.bincount(days - days.min(), weights=amounts)
+
     return {
         "count": len(amounts),
-        "total": round(sum(amounts), 2),
-        "avg_daily": round(sum(amounts) / date_range, 2),
-        "avg_monthly": round(sum(amounts) / (date_range / 30), 2),
-        "max_single": max(amounts) if amounts else 0,
-        "min_single": min(amounts) if amounts else 0,
+        "total": round(total, 2),
+        "avg_daily": round(total / date_range, 2),
+        "avg_monthly": round(total / (date_range / 30), 2),
+        "max_single": float(amounts.max()),
+        "min_single": float(amounts.min()),
+        "std_daily": round(float(daily_totals.std()), 2),
     }
 
 
+def _to_transactions(transactions: list[dict]) -> list[TransactionBase]:
+    """Convert transaction dicts to TransactionBase objects."""
+    return [
+        TransactionBase(
+            date=t["date"],
+            description=t["description"],
+            amount=Decimal(str(t["amount"])),
+            category=t.get("category"),
+            is_income=t.get("is_income", False),
+        )
+        for t in transactions
+    ]
+
+
 async def generate_forecast(
     transactions: list[dict],
     months_ahead: int = 1,
     category: str | None = None,
+    user_id: str | None = None,
 ) -> dict[str, Any]:
     """
     Main forecast function for LangGraph integration.
@@ -229,21 +472,13 @@ async def generate_forecast(
         transactions: List of transaction dicts
         months_ahead: Number of months to forecast
         category: Optional category filter
+        user_id: Owner of the transactions (enables warm-started fits)
 
     Returns:
         Complete forecast with LLM sanity check
     """
     # Convert to TransactionBase objects
-    txs = [
-        TransactionBase(
-            date=t["date"],
-            description=t["description"],
-            amount=Decimal(str(t["amount"])),
-            category=t.get("category"),
-            is_income=t.get("is_income", False),
-        )
-        for t in transactions
-    ]
+    txs = _to_transactions(transactions)
 
     # Prepare data for Prophet
     df = prepare_prophet_data(txs, category)
@@ -252,7 +487,9 @@ async def generate_forecast(
     periods = months_ahead * 30
 
     # Generate forecast
-    forecast = forecast_with_prophet(df, periods=periods, category=category)
+    forecast = forecast_with_prophet(
+        df, periods=periods, category=category, user_id=user_id
+    )
 
     # Get history summary for sanity check
     history_summary = calculate_history_summary(txs, category)
@@ -266,3 +503,60 @@ async def generate_forecast(
     forecast["category_filter"] = category
 
     return forecast
+
+
+async def generate_forecasts_multi(
+    transactions: list[dict],
+    months_ahead: int = 1,
+    categories: list[str | None] | None = None,
+    user_id: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Forecast several categories concurrently.
+
+    Prophet fits run on the default executor (Stan releases the GIL),
+    then all LLM sanity checks are submitted together.
+
+    Args:
+        transactions: List of transaction dicts
+        months_ahead: Number of months to forecast
+        categories: Categories to forecast (None entry = all spending)
+        user_id: Owner of the transactions (enables warm-started fits)
+
+    Returns:
+        One forecast per category with data, in request order
+    """
+    txs = _to_transactions(transactions)
+    periods = months_ahead * 30
+
+    # Skip categories with nothing to forecast
+    frames: list[tuple[str | None, pd.DataFrame]] = []
+    for category in categories or [None]:
+        try:
+            frames.append((category, prepare_prophet_data(txs, category)))
+        except ValueError:
+            logger.info(f"No transactions to forecast for category {category!r}")
+
+    loop = asyncio.get_running_loop()
+    forecasts = await asyncio.gather(*[
+        loop.run_in_executor(
+            None,
+            functools.partial(
+                forecast_with_prophet, df, periods, category, user_id=user_id
+            ),
+        )
+        for category, df in frames
+    ])
+
+    summaries = [calculate_history_summary(txs, category) for category, _ in frames]
+    forecasts = await asyncio.gather(*[
+        sanity_check_forecast(f, h) for f, h in zip(forecasts, summaries)
+    ])
+
+    generated_at = datetime.utcnow().isoformat()
+    for forecast, (category, _) in zip(forecasts, frames):
+        forecast["generated_at"] = generated_at
+        forecast["input_transactions"] = len(transactions)
+        forecast["category_filter"] = category
+
+    return list(forecasts)
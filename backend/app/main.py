@@ -1,6 +1,9 @@
 """Personal Finance AI - FastAPI Backend."""
+import asyncio
+import io
 import logging
 import os
+from collections import defaultdict
 from contextlib import asynccontextmanager
 from datetime import datetime
 from decimal import Decimal
@@ -15,13 +18,21 @@ from fastapi.responses import JSONResponse
 from supabase import AsyncClient
 
 from . import models
-from .alerter import create_alert_service, SpendingAlert, AlertConfig
+from .alerter import (
+    create_alert_service,
+    check_spending_alert,
+    SpendingAlert,
+    AlertConfig,
+)
 from .categorizer import categorize_batch
 from .client import get_async_supabase_client
-from .forecaster import generate_forecast
-from .parser import CSVParser
+from .forecaster import generate_forecast, generate_forecasts_multi
+from .parser import DEFAULT_PARSER
 from .mock_supabase import get_mock_client
 
+# Rows per insert request when saving transactions
+INSERT_CHUNK_SIZE = 500
+
 # Configure logging
 structlog.configure(
     wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
@@ -43,6 +54,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Shutting down Personal Finance AI API")
 
 
+# Every route declares a return type, so responses are serialized straight
+# to JSON bytes by Pydantic's Rust core. Setting a default_response_class
+# (e.g. ORJSONResponse) would opt out of that fast path.
 app = FastAPI(
     title="Personal Finance AI",
     description="AI-powered personal finance tracking with categorization and forecasting",
@@ -63,7 +77,6 @@ app.add_middleware(
 # Dependencies
 async def get_supabase() -> AsyncClient:
     """Get Supabase client (or mock for testing)."""
-    import os
     try:
         return await get_async_supabase_client()
     except ValueError:
@@ -93,13 +106,12 @@ async def upload_csv(
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Must be a CSV file")
 
-    content = await file.read()
-    csv_text = content.decode("utf-8")
+    # Stream-decode the upload instead of reading it into memory
+    csv_stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
 
     # Parse CSV
-    parser = CSVParser()
     try:
-        transactions = parser.parse(csv_text, str(user_id))
+        transactions = DEFAULT_PARSER.parse(csv_stream, str(user_id))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -170,9 +182,14 @@ async def save_transactions(
         for t in transactions
     ]
 
-    result = await supabase.table("transactions").insert(data).execute()
+    # Chunk large uploads to stay under REST payload limits; insert concurrently
+    results = await asyncio.gather(*[
+        supabase.table("transactions").insert(data[i:i + INSERT_CHUNK_SIZE]).execute()
+        for i in range(0, len(data), INSERT_CHUNK_SIZE)
+    ])
 
-    return {"inserted": len(result.data), "ids": [r["id"] for r in result.data]}
+    ids = [r["id"] for result in results for r in result.data]
+    return {"inserted": len(ids), "ids": ids}
 
 
 # Get Transactions
@@ -197,7 +214,7 @@ async def get_transactions(
     if category:
         query = query.eq("category", category)
 
-    result = query.order("date", desc=True).limit(limit).execute()
+    result = await query.order("date", desc=True).limit(limit).execute()
 
     return result.data
 
@@ -209,14 +226,18 @@ async def get_dashboard(
     supabase: AsyncClient = Depends(get_supabase),
 ) -> models.DashboardSummary:
     """Get dashboard summary with spending breakdown."""
-    # Get all transactions
-    result = await supabase.table("transactions").select("*").eq(
-        "user_id", str(user_id)
-    ).execute()
+    # Totals are aggregated in Postgres (see dashboard_summary in schema.sql);
+    # fetch them and the recent transactions in parallel
+    result, recent = await asyncio.gather(
+        supabase.rpc("dashboard_summary", {"user_id": str(user_id)}).execute(),
+        supabase.table("transactions").select("*").eq(
+            "user_id", str(user_id)
+        ).order("date", desc=True).limit(10).execute(),
+    )
 
-    transactions = result.data
+    summary = result.data[0] if result.data else {}
 
-    if not transactions:
+    if not summary.get("tx_count"):
         return models.DashboardSummary(
             total_income=Decimal("0"),
             total_expense=Decimal("0"),
@@ -227,24 +248,9 @@ async def get_dashboard(
             recent_transactions=[],
         )
 
-    # Calculate totals
-    income = Decimal("0")
-    expense = Decimal("0")
-    category_totals: dict[str, Decimal] = {}
-
-    for tx in transactions:
-        amount = Decimal(str(tx["amount"]))
-        if tx.get("is_income", False):
-            income += amount
-        else:
-            expense += amount
-            cat = tx.get("category", "Other")
-            category_totals[cat] = category_totals.get(cat, Decimal("0")) + amount
-
-    # Get recent transactions
-    recent = await supabase.table("transactions").select("*").eq(
-        "user_id", str(user_id)
-    ).order("date", desc=True).limit(10).execute()
+    income = Decimal(str(summary["total_income"]))
+    expense = Decimal(str(summary["total_expense"]))
+    category_totals = summary.get("category_totals") or {}
 
     return models.DashboardSummary(
         total_income=income,
@@ -268,7 +274,7 @@ async def get_budgets(
     query = supabase.table("budgets").select("*").eq("user_id", str(user_id))
     if month:
         query = query.eq("month", f"{month:02d}")
-    result = query.execute()
+    result = await query.execute()
     return result.data
 
 
@@ -312,11 +318,34 @@ async def create_forecast(
             detail="Need at least 5 transactions for forecasting",
         )
 
+    # Several categories: fit and sanity-check them concurrently
+    if request.categories:
+        forecasts = await generate_forecasts_multi(
+            transactions=transactions,
+            months_ahead=request.months_ahead,
+            categories=request.categories,
+            user_id=str(request.user_id),
+        )
+        if forecasts:
+            await supabase.table("forecasts").insert([
+                {
+                    "user_id": str(request.user_id),
+                    "category": f["category"],
+                    "forecast_date": f["forecast_date"],
+                    "predicted_amount": f["predicted_amount"],
+                    "confidence_lower": f.get("confidence_lower"),
+                    "confidence_upper": f.get("confidence_upper"),
+                }
+                for f in forecasts
+            ]).execute()
+        return {"forecasts": forecasts}
+
     # Generate forecast
     forecast = await generate_forecast(
         transactions=transactions,
         months_ahead=request.months_ahead,
         category=request.category,
+        user_id=str(request.user_id),
     )
 
     # Save forecast
@@ -342,42 +371,53 @@ async def check_alerts(
     """
     Check spending and send alerts if needed.
     """
-    # Get user settings
-    user_result = await supabase.table("users").select("*").eq(
-        "id", str(user_id)
-    ).single().execute()
+    # Get user settings, budgets and spending concurrently
+    user_result, budget_result, tx_result = await asyncio.gather(
+        supabase.table("users").select("*").eq(
+            "id", str(user_id)
+        ).single().execute(),
+        supabase.table("budgets").select("*").eq(
+            "user_id", str(user_id)
+        ).execute(),
+        supabase.table("transactions").select("*").eq(
+            "user_id", str(user_id)
+        ).execute(),
+    )
 
     user = user_result.data
 
-    # Get budgets
-    budget_result = await supabase.table("budgets").select("*").eq(
-        "user_id", str(user_id)
-    ).execute()
-
-    # Get current month spending
-    tx_result = await supabase.table("transactions").select("*").eq(
-        "user_id", str(user_id)
-    ).execute()
-
     alert_service = create_alert_service()
-    alerts_sent = []
+    pending = []
+
+    budget_pct = user.get("budget_pct", 110.0)
+    threshold = Decimal(str(user.get("alert_threshold", 5000)))
+    config = AlertConfig(
+        user_id=str(user_id),
+        budget_pct=budget_pct,
+        alert_threshold=threshold,
+        sms_enabled=user.get("sms_enabled", False),
+        email_enabled=user.get("email_enabled", True),
+        phone=user.get("phone"),
+        email=user.get("email"),
+    )
+
+    # Sum spending per category in one pass, in integer paise
+    paise_by_cat: dict[str, int] = defaultdict(int)
+    for tx in tx_result.data:
+        if not tx.get("is_income"):
+            paise_by_cat[tx.get("category")] += models.to_paise(tx["amount"])
 
     for budget in budget_result.data:
         category = budget["category"]
-        limit = Decimal(budget["monthly_limit"])
-
-        # Calculate current spending for category
-        spending = Decimal("0")
-        for tx in tx_result.data:
-            if tx.get("category") == category and not tx.get("is_income"):
-                spending += Decimal(str(tx["amount"]))
+        limit = Decimal(str(budget["monthly_limit"]))
+        spending = models.from_paise(paise_by_cat.get(category, 0))
 
         # Check alert
-        alert_check = alert_service.check_spending_alert(
+        alert_check = check_spending_alert(
             spending=spending,
             budget_limit=limit,
-            budget_pct=user.get("budget_pct", 110.0),
-            threshold=Decimal(str(user.get("alert_threshold", 5000))),
+            budget_pct=budget_pct,
+            threshold=threshold,
         )
 
         if alert_check.get("should_alert"):
@@ -391,18 +431,15 @@ async def check_alerts(
                 is_over_threshold=alert_check["over_threshold"],
             )
 
-            config = AlertConfig(
-                user_id=str(user_id),
-                budget_pct=user.get("budget_pct", 110.0),
-                alert_threshold=Decimal(str(user.get("alert_threshold", 5000))),
-                sms_enabled=user.get("sms_enabled", False),
-                email_enabled=user.get("email_enabled", True),
-                phone=user.get("phone"),
-                email=user.get("email"),
-            )
+            pending.append(alert_service.send_spending_alert(config, alert))
 
-            results = await alert_service.send_spending_alert(config, alert)
-            alerts_sent.extend(results)
+    # Dispatch all budgets' alerts concurrently
+    alerts_sent = []
+    for results in await asyncio.gather(*pending, return_exceptions=True):
+        if isinstance(results, Exception):
+            logger.error("Alert dispatch failed", error=str(results))
+            continue
+        alerts_sent.extend(results)
 
     return {"alerts_sent": len(alerts_sent), "results": alerts_sent}
 
@@ -453,4 +490,5 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
+        loop="uvloop",
     )
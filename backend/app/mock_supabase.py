@@ -1,9 +1,14 @@
 """Mock Supabase client for testing without real credentials."""
+import bisect
+import os
+from collections import defaultdict
 from typing import Any
 from datetime import datetime
 
 import structlog
 
+from .models import from_paise, to_paise
+
 logger = structlog.get_logger()
 
 
@@ -20,21 +25,126 @@ class MockAsyncClient:
             "uploads": [],
             "users": [],
         }
+        self._indices = MockIndex(self._data)
         logger.warning("Using MOCK Supabase client - data not persisted!")
 
     def table(self, name):
         """Return mock table interface."""
-        return MockTable(name, self._data)
+        return MockTable(name, self._data, self._indices)
+
+    def rpc(self, fn: str, params: dict | None = None):
+        """Call a mock Postgres function (mirrors supabase/schema.sql)."""
+        if fn != "dashboard_summary":
+            raise ValueError(f"Unknown mock RPC function: {fn}")
+        return MockRpc(self._dashboard_summary(str((params or {})["user_id"])))
+
+    def _dashboard_summary(self, user_id: str) -> dict:
+        """Aggregate a user's transactions in one pass (integer paise)."""
+        count = 0
+        income = 0
+        expense = 0
+        category_totals: dict[str, int] = defaultdict(int)
+
+        for tx in self._data.get("transactions", []):
+            if tx.get("user_id") != user_id:
+                continue
+            count += 1
+            amount = to_paise(tx["amount"])
+            if tx.get("is_income", False):
+                income += amount
+            else:
+                expense += amount
+                category_totals[tx.get("category") or "Other"] += amount
+
+        return {
+            "tx_count": count,
+            "total_income": from_paise(income),
+            "total_expense": from_paise(expense),
+            "category_totals": {
+                cat: from_paise(paise) for cat, paise in category_totals.items()
+            },
+        }
+
+
+class MockIndex:
+    """Hash indices on common filter columns plus a sorted date index."""
+
+    COLUMNS = ("id", "user_id", "category")
+    RANGE_COLUMN = "date"
+
+    def __init__(self, data_store: dict):
+        self._data = data_store
+        # table -> column -> value -> row positions
+        self._maps: dict[str, dict[str, dict[Any, list[int]]]] = {}
+        # table -> sorted (date, row position)
+        self._dates: dict[str, list[tuple[Any, int]]] = {}
+        self._indexed: dict[str, int] = {}
+
+    def _refresh(self, table_name: str) -> list[dict]:
+        """Index rows appended since the last call; return the table rows."""
+        rows = self._data.get(table_name, [])
+        done = self._indexed.get(table_name, 0)
+        if done > len(rows):
+            self.invalidate(table_name)
+            done = 0
+
+        maps = self._maps.setdefault(table_name, {c: {} for c in self.COLUMNS})
+        dates = self._dates.setdefault(table_name, [])
+        for pos in range(done, len(rows)):
+            row = rows[pos]
+            for col in self.COLUMNS:
+                maps[col].setdefault(row.get(col), []).append(pos)
+            value = row.get(self.RANGE_COLUMN)
+            if value is not None:
+                bisect.insort(dates, (value, pos))
+        self._indexed[table_name] = len(rows)
+
+        return rows
+
+    def lookup(self, table_name: str, column: str, value: Any) -> list[dict] | None:
+        """Rows where column == value, or None if the column isn't indexed."""
+        if column not in self.COLUMNS:
+            return None
+
+        rows = self._refresh(table_name)
+        return [rows[pos] for pos in self._maps[table_name][column].get(value, ())]
+
+    def range(
+        self, table_name: str, column: str, low: Any = None, high: Any = None
+    ) -> list[dict] | None:
+        """Rows with low <= column <= high, or None if the column isn't indexed."""
+        if column != self.RANGE_COLUMN:
+            return None
+
+        rows = self._refresh(table_name)
+        dates = self._dates[table_name]
+        start = 0 if low is None else bisect.bisect_left(dates, (low,))
+        end = len(dates) if high is None else bisect.bisect_right(dates, (high, len(rows)))
+
+        # Keep insertion order, like a scan would
+        return [rows[pos] for pos in sorted(pos for _, pos in dates[start:end])]
+
+    def invalidate(self, table_name: str) -> None:
+        """Drop a table's indices (rebuilt on next lookup)."""
+        self._maps.pop(table_name, None)
+        self._dates.pop(table_name, None)
+        self._indexed.pop(table_name, None)
 
 
 class MockTable:
     """Mock table interface."""
 
-    def __init__(self, table_name: str, data_store: dict):
+    def __init__(
+        self, table_name: str, data_store: dict, indices: MockIndex | None = None
+    ):
         self._table_name = table_name
         self._data = data_store
+        self._indices = indices
         self._items = []
-        self._filters = {}
+        self._unfiltered = False
+        # Pending filters, applied together when the query runs
+        self._eq_filters: list[tuple[str, Any]] = []
+        self._range_filters: dict[str, tuple[Any, Any]] = {}
         self._order_col = None
         self._order_desc = False
         self._limit_n = None
@@ -43,23 +153,73 @@ class MockTable:
     def select(self, columns: str = "*"):
         """Select columns."""
         self._items = self._data.get(self._table_name, [])
+        self._unfiltered = True
         return self
 
     def eq(self, column: str, value: Any):
         """Filter by column value."""
-        self._items = [i for i in self._items if i.get(column) == value]
+        self._eq_filters.append((column, value))
         return self
 
     def gte(self, column: str, value: Any):
         """Filter greater than or equal."""
-        self._items = [i for i in self._items if i.get(column, 0) >= value]
+        low, high = self._range_filters.get(column, (None, None))
+        self._range_filters[column] = (value, high)
         return self
 
     def lte(self, column: str, value: Any):
         """Filter less than or equal."""
-        self._items = [i for i in self._items if i.get(column, 0) <= value]
+        low, high = self._range_filters.get(column, (None, None))
+        self._range_filters[column] = (low, value)
         return self
 
+    def between(self, column: str, low: Any, high: Any):
+        """Filter low <= column <= high (mock-only convenience)."""
+        self._range_filters[column] = (low, high)
+        return self
+
+    def _apply_filters(self) -> None:
+        """Apply pending filters, starting from the most selective index."""
+        if not self._eq_filters and not self._range_filters:
+            return
+
+        eq_filters = list(self._eq_filters)
+        range_filters = dict(self._range_filters)
+        self._eq_filters.clear()
+        self._range_filters.clear()
+
+        # On a full table, seed from the smallest indexed candidate set
+        if self._unfiltered and self._indices is not None:
+            candidates = []
+            for n, (column, value) in enumerate(eq_filters):
+                rows = self._indices.lookup(self._table_name, column, value)
+                if rows is not None:
+                    candidates.append((len(rows), "eq", n, rows))
+            for column, (low, high) in range_filters.items():
+                rows = self._indices.range(self._table_name, column, low, high)
+                if rows is not None:
+                    candidates.append((len(rows), "range", column, rows))
+
+            if candidates:
+                _, kind, key, self._items = min(candidates, key=lambda c: c[0])
+                # That predicate is already satisfied
+                if kind == "eq":
+                    del eq_filters[key]
+                else:
+                    del range_filters[key]
+        self._unfiltered = False
+
+        # Remaining predicates in a single pass
+        self._items = [
+            i for i in self._items
+            if all(i.get(column) == value for column, value in eq_filters)
+            and all(
+                (low is None or i.get(column, 0) >= low)
+                and (high is None or i.get(column, 0) <= high)
+                for column, (low, high) in range_filters.items()
+            )
+        ]
+
     def order(self, column: str, desc: bool = False):
         """Order by column."""
         self._order_col = column
@@ -73,7 +233,9 @@ class MockTable:
 
     def single(self):
         """Get single result."""
+        self._apply_filters()
         self._items = self._items[0] if self._items else None
+        self._unfiltered = False
         return self
 
     def insert(self, data: dict | list):
@@ -87,8 +249,12 @@ class MockTable:
 
     def update(self, data: dict):
         """Update data."""
+        self._apply_filters()
         for item in self._items:
             item.update(data)
+        # Indexed values may have changed
+        if self._indices is not None:
+            self._indices.invalidate(self._table_name)
         return self
 
     def execute(self):
@@ -112,6 +278,8 @@ class MockTable:
             return MockResult(results)
 
         # For select operations
+        self._apply_filters()
+
         # Apply ordering
         if self._order_col:
             self._items = sorted(
@@ -132,6 +300,17 @@ class MockTable:
         return _execute().__await__()
 
 
+class MockRpc:
+    """Mock RPC call (result is computed eagerly)."""
+
+    def __init__(self, data: Any):
+        self._data = data
+
+    def execute(self):
+        """Execute the call."""
+        return MockResult(self._data)
+
+
 class MockResult:
     """Mock query result."""
 
@@ -182,8 +361,6 @@ def get_mock_client() -> MockAsyncClient:
 
 async def get_async_supabase_client():
     """Get async Supabase client (or mock if not configured)."""
-    import os
-
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
 
@@ -1,13 +1,41 @@
 """Pydantic models for Personal Finance AI."""
 from datetime import datetime, date
 from decimal import Decimal
+from collections.abc import Iterable
 from enum import Enum
+from functools import cache
 from typing import Annotated, Any
 from uuid import UUID
 
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    TypeAdapter,
+    field_validator,
+    model_validator,
+)
+from typing_extensions import TypedDict  # pydantic needs it on Python < 3.12
 import re
 
+# Indian mobile numbers, optionally prefixed with +91; spaces, dashes and
+# parentheses may appear anywhere
+_PHONE_RE = re.compile(
+    r"[\s\-()]*(?:\+[\s\-()]*9[\s\-()]*1[\s\-()]*)?"
+    r"([6-9](?:[\s\-()]*\d){9})[\s\-()]*"
+)
+_NON_DIGIT_RE = re.compile(r"\D")
+
+
+def to_paise(amount: Any) -> int:
+    """Convert an amount (str, number or Decimal) to integer paise."""
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def from_paise(paise: int) -> Decimal:
+    """Convert integer paise back to a 2-decimal-place Decimal."""
+    return Decimal(paise).scaleb(-2)
+
 
 class TransactionBase(BaseModel):
     """Base transaction model."""
@@ -22,6 +50,28 @@ class TransactionCreate(TransactionBase):
     """Transaction creation model."""
     source: str = "csv"
 
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> list["TransactionCreate"]:
+        """
+        Build from a batch of parser rows.
+
+        Validating the whole batch in one pydantic-core call is faster than
+        model_construct() per row.
+        """
+        return _TRANSACTION_LIST.validate_python([
+            {
+                "date": row.date,
+                "description": row.description,
+                "amount": row.amount,
+                "is_income": row.is_income,
+                "source": row.source,
+            }
+            for row in rows
+        ])
+
+
+_TRANSACTION_LIST = TypeAdapter(list[TransactionCreate])
+
 
 class Transaction(TransactionCreate):
     """Complete transaction model."""
@@ -54,8 +104,13 @@ class Category(str, Enum):
     OTHER = "Other"
 
     @classmethod
-    def all(cls) -> list[str]:
-        return [c.value for c in cls]
+    @cache
+    def all(cls) -> tuple[str, ...]:
+        return tuple(c.value for c in cls)
+
+
+# For O(1) membership checks on category names
+CATEGORY_SET = frozenset(Category.all())
 
 
 class CategorizeResult(BaseModel):
@@ -117,6 +172,7 @@ class ForecastRequest(BaseModel):
     user_id: UUID
     months_ahead: int = Field(default=1, ge=1, le=12)
     category: str | None = None
+    categories: list[str] | None = None
 
 
 class AlertType(str, Enum):
@@ -157,10 +213,10 @@ class AlertSettings(BaseModel):
         if v is None:
             return v
         # Indian phone number format
-        cleaned = re.sub(r"[\s\-()]", "", v)
-        if re.match(r"^(\+91)?[6-9]\d{9}$", cleaned):
-            return f"+91{cleaned[-10:]}" if len(cleaned) == 10 else cleaned
-        raise ValueError("Invalid Indian phone number")
+        match = _PHONE_RE.fullmatch(v)
+        if match is None:
+            raise ValueError("Invalid Indian phone number")
+        return f"+91{_NON_DIGIT_RE.sub('', match.group(1))}"
 
 
 class CSVUploadResponse(BaseModel):
@@ -171,14 +227,32 @@ class CSVUploadResponse(BaseModel):
     upload_id: int
 
 
+class MonthlyTrend(TypedDict):
+    """Income and expense totals for one month."""
+    month: str  # YYYY-MM
+    income: Decimal
+    expense: Decimal
+
+
+class BudgetStatus(TypedDict):
+    """Spending against one category budget."""
+    category: str
+    monthly_limit: Decimal
+    spent: Decimal
+    pct_used: float
+    over_budget: bool
+
+
 class DashboardSummary(BaseModel):
     """Dashboard summary."""
+    model_config = ConfigDict(extra="forbid")
+
     total_income: Decimal
     total_expense: Decimal
     net_savings: Decimal
     category_breakdown: dict[str, Decimal]
-    monthly_trend: list[dict[str, Any]]
-    budget_status: list[dict[str, Any]]
+    monthly_trend: list[MonthlyTrend]
+    budget_status: list[BudgetStatus]
     recent_transactions: list[Transaction]
 
 
@@ -1,24 +1,211 @@
 """CSV Parser for transaction imports."""
+import csv
+import itertools
 import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from io import StringIO
-from typing import Any
+from typing import Any, ClassVar, TextIO
 
+import numpy as np
 import pandas as pd
 from pydantic import ValidationError
 
 from .models import TransactionCreate
 
 
+# Rows parsed per vectorized batch when streaming
+PARSE_CHUNK_ROWS = 50_000
+
+# Date formats tried in order (day-first before month-first for dashes)
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%d-%m-%Y",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%Y/%m/%d",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%d %b %Y",
+    "%d %B %Y",
+)
+
+# Compiled once; used per amount
+_AMOUNT_CLEAN_RE = re.compile(r"[₹$€£,\s]")
+
+_RUPEE = Decimal("1")
+_PAISA = Decimal("0.01")
+
+
+def _whole_or_paisa(amount: Decimal) -> bool:
+    """
+    Whether amount's exponent is 0 or -2, as almost every statement amount is.
+
+    same_quantum() compares exponents in C; as_tuple() builds a Python
+    named tuple of digits, so it's kept for the uncommon exponents.
+    """
+    return amount.same_quantum(_PAISA) or amount.same_quantum(_RUPEE)
+
+
+@lru_cache(maxsize=8)
+def _candidate_formats(
+    has_dash: bool, has_slash: bool, has_alpha: bool
+) -> tuple[str, ...]:
+    """
+    DATE_FORMATS (in order) that could match a string with these traits.
+
+    strptime only accepts a '-' or '/' that the format has as a literal,
+    and letters only for month names, so the other formats can't match.
+    """
+    return tuple(
+        fmt for fmt in DATE_FORMATS
+        if ("-" in fmt) == has_dash
+        and ("/" in fmt) == has_slash
+        and ("%b" in fmt or "%B" in fmt) == has_alpha
+    )
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_str(date_str: str) -> datetime:
+    """
+    Parse a date string, trying DATE_FORMATS in order, then pandas.
+
+    Cached because statements repeat the same few dates across many rows.
+    Formats whose separators can't match the string are skipped without
+    calling strptime.
+    """
+    formats = _candidate_formats(
+        "-" in date_str, "/" in date_str, any(c.isalpha() for c in date_str)
+    )
+    for fmt in formats:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+
+    return pd.to_datetime(date_str).to_pydatetime()
+
+
+@lru_cache(maxsize=8192)
+def _clean_desc(desc: str) -> str:
+    """
+    Strip, collapse whitespace and truncate a description.
+
+    Cached because statements repeat the same merchants across many rows.
+    """
+    # split() drops leading/trailing whitespace and collapses runs, without
+    # a regex; truncate if too long
+    return " ".join(desc.split())[:500]
+
+
+@lru_cache(maxsize=1024)
+def _header_fields(
+    header: str, patterns: tuple[tuple[str, re.Pattern[str]], ...]
+) -> tuple[str, ...]:
+    """
+    Fields whose pattern matches a lowercased header, in pattern order.
+
+    Cached because imports keep arriving with the same bank headers, so
+    after the first file each header is a dict lookup instead of regexes.
+    """
+    return tuple(field for field, pattern in patterns if pattern.search(header))
+
+
+def _read_csv(csv_content: str) -> pd.DataFrame:
+    """
+    Read CSV content into a DataFrame.
+
+    Uses the multithreaded pyarrow engine when pyarrow is installed,
+    falling back to the C engine otherwise.
+    """
+    try:
+        return pd.read_csv(
+            StringIO(csv_content), engine="pyarrow", dtype_backend="pyarrow"
+        )
+    except (ImportError, ValueError):
+        return pd.read_csv(
+            StringIO(csv_content),
+            engine="c",
+            low_memory=False,
+            cache_dates=True,
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class TxRow:
+    """
+    A parsed CSV row.
+
+    Rows are checked against TransactionCreate's constraints while parsing,
+    so bad rows are reported per row and promoting a batch with
+    TransactionCreate.from_rows() can't fail.
+    """
+    date: datetime
+    description: str
+    amount: Decimal
+    is_income: bool = False
+    source: str = "csv"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Same shape as TransactionCreate.model_dump()."""
+        return {
+            "date": self.date,
+            "description": self.description,
+            "amount": self.amount,
+            "category": None,
+            "is_income": self.is_income,
+            "source": self.source,
+        }
+
+
+def _to_amount(value: int | float | np.number | str) -> Decimal:
+    """
+    Convert a number or cleaned numeric string to an absolute Decimal.
+
+    Strings are converted exactly, without a float round-trip. Floats
+    (including NumPy scalars) go through their shortest str() form.
+    """
+    try:
+        amount = Decimal(value if isinstance(value, (int, str)) else str(value))
+        amount = amount.copy_abs()
+        if amount.is_finite() and not _whole_or_paisa(amount):
+            exponent = amount.as_tuple().exponent
+            if exponent > 0:
+                # Plain integer instead of scientific notation ("1e3")
+                amount = amount.quantize(_RUPEE)
+            elif exponent < -2:
+                # Zeros past the paisa aren't extra precision ("100.500")
+                rounded = amount.quantize(_PAISA)
+                if rounded == amount:
+                    amount = rounded
+    except InvalidOperation as e:
+        raise ValueError(f"Cannot parse amount: {value}") from e
+    return amount
+
+
+def _make_row(date_val: datetime, description: str, amount: Decimal) -> TxRow:
+    """Build a row, enforcing the TransactionCreate field constraints."""
+    if not description:
+        raise ValueError("Description is empty")
+    if not amount.is_finite():
+        raise ValueError(f"Amount is not a finite number: {amount}")
+    if not _whole_or_paisa(amount) and amount.as_tuple().exponent < -2:
+        raise ValueError(f"Amount has more than 2 decimal places: {amount}")
+    return TxRow(date=date_val, description=description, amount=amount)
+
+
 class CSVParser:
     """Flexible CSV parser with column mapping detection."""
 
-    # Common column name patterns (case-insensitive, flexible)
-    COLUMN_PATTERNS = {
-        "date": r"(date|txn.*date|transaction.*date|posted.*date|time|datetime|timestamp)",
-        "description": r"(description|desc|payee|merchant|narrative|details|particulars|transaction.*type|memo)",
-        "amount": r"(amount|value|sum|txn.*amount|debit|credit|paid|received)",
+    # Common column name patterns (case-insensitive, flexible), compiled
+    # once at class definition and shared by all instances
+    COLUMN_PATTERNS: ClassVar[dict[str, re.Pattern[str]]] = {
+        "date": re.compile(r"(date|txn.*date|transaction.*date|posted.*date|time|datetime|timestamp)"),
+        "description": re.compile(r"(description|desc|payee|merchant|narrative|details|particulars|transaction.*type|memo)"),
+        "amount": re.compile(r"(amount|value|sum|txn.*amount|debit|credit|paid|received)"),
     }
 
     def __init__(self):
@@ -26,34 +213,44 @@ class CSVParser:
 
     def detect_columns(self, df: pd.DataFrame) -> dict[str, str]:
         """Auto-detect column mappings."""
-        column_map = {}
-        df_cols = {c.lower(): c for c in df.columns}
+        return self._detect_from_names(df.columns)
 
-        for field, pattern in self.COLUMN_PATTERNS.items():
-            for col_lower, col_original in df_cols.items():
-                if re.search(pattern, col_lower):
+    def _detect_from_names(self, columns: Iterable[str]) -> dict[str, str]:
+        """Auto-detect column mappings from header names."""
+        column_map = {}
+        df_cols = {c.lower(): c for c in columns}
+        patterns = tuple(self.COLUMN_PATTERNS.items())
+
+        # One pass over the header; a column is claimed by the first
+        # unclaimed field it matches, and the scan stops once every field
+        # is found
+        for col_lower, col_original in df_cols.items():
+            for field in _header_fields(col_lower, patterns):
+                if field not in column_map:
                     column_map[field] = col_original
                     break
+            if len(column_map) == len(self.COLUMN_PATTERNS):
+                break
 
         return column_map
 
     def parse_amount(self, value: Any) -> Decimal:
         """Parse amount, handling various formats."""
-        if isinstance(value, (int, float)):
-            return Decimal(str(abs(float(value))))
+        if isinstance(value, (int, float, np.number)):
+            return _to_amount(value)
 
-        # Handle string amounts
-        cleaned = str(value).strip()
-
-        # Remove currency symbols and separators
-        cleaned = re.sub(r"[₹$€£,\s]", "", cleaned)
+        # Remove currency symbols, separators and whitespace; plain numeric
+        # strings (the common case) skip the substitution
+        cleaned = str(value)
+        if _AMOUNT_CLEAN_RE.search(cleaned):
+            cleaned = _AMOUNT_CLEAN_RE.sub("", cleaned)
 
         # Handle parentheses for negative (accounting format)
         if cleaned.startswith("(") and cleaned.endswith(")"):
             cleaned = "-" + cleaned[1:-1]
 
         try:
-            return Decimal(str(abs(float(cleaned))))
+            return _to_amount(cleaned)
         except ValueError as e:
             raise ValueError(f"Cannot parse amount: {value}") from e
 
@@ -64,29 +261,8 @@ class CSVParser:
         if isinstance(value, pd.Timestamp):
             return value.to_pydatetime()
 
-        date_formats = [
-            "%Y-%m-%d",
-            "%d-%m-%Y",
-            "%m/%d/%Y",
-            "%d/%m/%Y",
-            "%Y/%m/%d",
-            "%b %d, %Y",
-            "%B %d, %Y",
-            "%d %b %Y",
-            "%d %B %Y",
-        ]
-
-        date_str = str(value).strip()
-
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-
-        # Try pandas parsing
         try:
-            return pd.to_datetime(date_str).to_pydatetime()
+            return _parse_date_str(str(value).strip())
         except ValueError as e:
             raise ValueError(f"Cannot parse date: {value}") from e
 
@@ -95,84 +271,284 @@ class CSVParser:
         if pd.isna(value):
             return "Unknown"
 
-        desc = str(value).strip()
+        return _clean_desc(str(value))
 
-        # Remove extra whitespace
-        desc = re.sub(r"\s+", " ", desc)
+    # Vectorized parsing, one pandas op per column instead of per row
 
-        # Truncate if too long
-        return desc[:500]
+    def _parse_date_column(self, values: pd.Series) -> pd.Series:
+        """
+        Parse a column of dates, trying DATE_FORMATS in order.
 
-    def parse(
-        self, csv_content: str, user_id: str | None = None
-    ) -> list[TransactionCreate]:
+        Statements repeat the same few hundred dates across many rows, so
+        only the distinct strings are parsed, each format in one vectorized
+        call on those still unparsed; anything left over goes through
+        parse_date.
         """
-        Parse CSV content to transactions.
+        if pd.api.types.is_datetime64_any_dtype(values):
+            # Already typed by the CSV reader (pyarrow engine)
+            parsed = pd.to_datetime(values, errors="coerce")
+            result = pd.Series(parsed.dt.to_pydatetime(), index=values.index, dtype=object)
+            result[parsed.isna()] = None
+            return result
+
+        # Code -1 marks missing values; it picks the trailing None below
+        codes, uniques = pd.factorize(values.astype(str).str.strip())
+        text = pd.Series(uniques, dtype=object)
+        parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+        for fmt in DATE_FORMATS:
+            pending = parsed.isna()
+            if not pending.any():
+                break
+            parsed[pending] = pd.to_datetime(
+                text[pending], format=fmt, errors="coerce"
+            )
 
-        Args:
-            csv_content: Raw CSV string
-            user_id: Optional user ID for validation
+        distinct = np.empty(len(parsed) + 1, dtype=object)
+        distinct[:-1] = parsed.dt.to_pydatetime()
+        distinct[:-1][parsed.isna().to_numpy()] = None
+        distinct[-1] = None
+        return pd.Series(distinct[codes], index=values.index, dtype=object)
 
-        Returns:
-            List of TransactionCreate objects
+    def _parse_amount_column(self, values: pd.Series) -> list[Any]:
+        """
+        Clean a column of amounts for _to_amount.
+
+        Returns numbers or cleaned numeric strings, with None where the
+        value isn't numeric and needs the scalar parse_amount.
+        """
+        if pd.api.types.is_numeric_dtype(values):
+            # Sign is dropped anyway; take it off the whole column at once
+            if not pd.api.types.is_bool_dtype(values):
+                values = values.abs()
+            valid = values.notna()
+        else:
+            # The pattern removes whitespace too, so no separate strip pass
+            values = values.astype(str).str.replace(_AMOUNT_CLEAN_RE, "", regex=True)
+            # Parentheses mark negatives (accounting format); sign is dropped anyway
+            if values.str.startswith("(").any():
+                values = values.str.replace(r"^\((.*)\)$", r"-\1", regex=True)
+            valid = pd.to_numeric(values, errors="coerce").notna()
+
+        return [v if ok else None for v, ok in zip(values.tolist(), valid.tolist())]
+
+    def _clean_description_column(self, values: pd.Series) -> pd.Series:
+        """Clean a column of descriptions (missing values become 'Unknown')."""
+        # Clean each distinct description once; code -1 marks missing values
+        codes, uniques = pd.factorize(values)
+        cleaned = np.array(
+            [_clean_desc(str(u)) for u in uniques] + ["Unknown"], dtype=object
+        )
+        return pd.Series(cleaned.take(codes), index=values.index)
+
+    def _rows_from_columns(
+        self,
+        dates: pd.Series,
+        amounts: pd.Series,
+        descriptions: pd.Series | None,
+        first_row: int,
+        errors: list[str] | None = None,
+        row_errors: dict[int, str] | None = None,
+    ) -> list[TxRow]:
         """
-        # Read CSV
-        df = pd.read_csv(StringIO(csv_content))
+        Build rows from raw column values.
 
-        # Clean column names
-        df.columns = df.columns.str.strip()
+        Values the vectorized parsers can't handle fall back to the scalar
+        parse_date/parse_amount, so results match per-row parsing. Rows
+        numbered in row_errors are rejected with that message.
+        """
+        parsed_dates = self._parse_date_column(dates).tolist()
+        parsed_amounts = self._parse_amount_column(amounts)
+        cleaned = (
+            self._clean_description_column(descriptions).tolist()
+            if descriptions is not None
+            else itertools.repeat(None)
+        )
+
+        # Plain lists in one zip, so the loop does no per-row pandas indexing
+        rows = []
+        for n, (raw_date, date_val, raw_amount, amount_val, description) in enumerate(
+            zip(dates.tolist(), parsed_dates, amounts.tolist(), parsed_amounts, cleaned),
+            start=first_row,
+        ):
+            try:
+                if row_errors and n in row_errors:
+                    raise ValueError(row_errors[n])
+                if date_val is None:
+                    date_val = self.parse_date(raw_date)
+                if amount_val is None:
+                    amount = self.parse_amount(raw_amount)
+                else:
+                    amount = _to_amount(amount_val)
+                if description is None:
+                    description = f"Transaction {n}"
+                rows.append(_make_row(date_val, description, amount))
+            except ValueError as e:
+                if errors is not None:
+                    errors.append(f"Row {n}: {e}")
+
+        return rows
+
+    def _iter_row_batches(
+        self,
+        stream: TextIO,
+        errors: list[str] | None = None,
+        chunksize: int = PARSE_CHUNK_ROWS,
+    ) -> Iterator[list[TxRow]]:
+        """Parse CSV rows from a text stream into batches of TxRow objects."""
+        reader = csv.reader(stream)
+        header = [c.strip() for c in next(reader, [])]
 
         # Detect column mapping
-        column_map = self.detect_columns(df)
+        column_map = self._detect_from_names(header)
 
         if "date" not in column_map or "amount" not in column_map:
             raise ValueError(
-                f"Could not detect required columns. Found: {list(df.columns)}"
+                f"Could not detect required columns. Found: {header}"
             )
 
+        date_idx = header.index(column_map["date"])
+        amount_idx = header.index(column_map["amount"])
         # Optional: use description or generate placeholder
-        has_description = "description" in column_map
+        desc_idx = (
+            header.index(column_map["description"])
+            if "description" in column_map
+            else None
+        )
+
+        def cell(row: list[str], i: int) -> str | None:
+            # Missing and empty cells are NA, as with pandas.read_csv
+            return (row[i] or None) if i < len(row) else None
+
+        # Blank lines are skipped, as with pandas.read_csv
+        rows = (row for row in reader if row)
+        width = len(header)
+        first_row = 1
+        while chunk := list(itertools.islice(rows, chunksize)):
+            # A row with more fields than the header is misaligned (e.g. an
+            # unquoted "1,000" amount); reject it rather than drop fields
+            row_errors = {
+                n: f"Expected {width} fields, saw {len(r)}"
+                for n, r in enumerate(chunk, start=first_row)
+                if len(r) > width
+            }
+            batch = self._rows_from_columns(
+                pd.Series([cell(r, date_idx) for r in chunk], dtype=object),
+                pd.Series([cell(r, amount_idx) for r in chunk], dtype=object),
+                (
+                    pd.Series([cell(r, desc_idx) for r in chunk], dtype=object)
+                    if desc_idx is not None
+                    else None
+                ),
+                first_row,
+                errors,
+                row_errors,
+            )
+            if batch:
+                yield batch
+            first_row += len(chunk)
+
+    def _iter_rows(
+        self, stream: TextIO, errors: list[str] | None = None
+    ) -> Iterator[TxRow]:
+        """Parse CSV rows from a text stream into TxRow objects."""
+        return itertools.chain.from_iterable(self._iter_row_batches(stream, errors))
+
+    def iter_batches(
+        self,
+        stream: TextIO,
+        errors: list[str] | None = None,
+        chunksize: int = PARSE_CHUNK_ROWS,
+    ) -> Iterator[list[TransactionCreate]]:
+        """
+        Parse CSV rows from a text stream in batches.
 
-        transactions = []
-        errors = []
+        Only one batch of raw rows is held in memory at a time, so callers
+        can persist each batch before the next is read.
 
-        for idx, row in df.iterrows():
-            try:
-                # Parse date (required)
-                date_val = self.parse_date(row[column_map["date"]])
-
-                # Parse amount (required)
-                raw_amount = row[column_map["amount"]]
-                amount = self.parse_amount(raw_amount)
-
-                # Determine if income (amount positive vs context)
-                is_income = False
-
-                # Parse description (optional)
-                description = (
-                    self.clean_description(row[column_map["description"]])
-                    if has_description
-                    else f"Transaction {idx + 1}"
-                )
-
-                tx = TransactionCreate(
-                    date=date_val,
-                    description=description,
-                    amount=amount,
-                    is_income=is_income,
-                    source="csv",
-                )
-                transactions.append(tx)
-
-            except (ValueError, KeyError) as e:
-                errors.append(f"Row {idx + 1}: {e}")
-                continue
+        Args:
+            stream: Text stream positioned at the header row
+            errors: Optional list that collects per-row error messages
+            chunksize: Number of CSV rows read per batch
+
+        Yields:
+            Non-empty lists of TransactionCreate objects
+        """
+        for batch in self._iter_row_batches(stream, errors, chunksize):
+            yield TransactionCreate.from_rows(batch)
+
+    def iter_parse(
+        self, stream: TextIO, errors: list[str] | None = None
+    ) -> Iterator[TransactionCreate]:
+        """
+        Parse CSV rows from a text stream, one transaction at a time.
+
+        Args:
+            stream: Text stream positioned at the header row
+            errors: Optional list that collects per-row error messages
+
+        Yields:
+            TransactionCreate objects for each valid row
+        """
+        for batch in self.iter_batches(stream, errors):
+            yield from batch
+
+    def parse(
+        self, csv_content: str | TextIO, user_id: str | None = None
+    ) -> list[TransactionCreate]:
+        """
+        Parse CSV content to transactions.
+
+        Args:
+            csv_content: Raw CSV string or a text stream (read incrementally)
+            user_id: Optional user ID for validation
+
+        Returns:
+            List of TransactionCreate objects
+        """
+        stream = StringIO(csv_content) if isinstance(csv_content, str) else csv_content
+
+        errors: list[str] = []
+        transactions = list(
+            itertools.chain.from_iterable(self.iter_batches(stream, errors))
+        )
 
         if not transactions:
             raise ValueError(f"No valid transactions found. Errors: {errors}")
 
         return transactions
 
+    def parse_columnar(self, csv_content: str | TextIO) -> pd.DataFrame:
+        """
+        Parse CSV content to one column per transaction field.
+
+        For consumers that work on whole columns (aggregation, forecasting),
+        skipping per-transaction model objects.
+
+        Args:
+            csv_content: Raw CSV string or a text stream (read incrementally)
+
+        Returns:
+            DataFrame with date (datetime64), description, amount (Decimal),
+            is_income and source (categorical) columns
+        """
+        stream = StringIO(csv_content) if isinstance(csv_content, str) else csv_content
+
+        errors: list[str] = []
+        rows = list(self._iter_rows(stream, errors))
+
+        if not rows:
+            raise ValueError(f"No valid transactions found. Errors: {errors}")
+
+        return pd.DataFrame({
+            "date": pd.to_datetime([r.date for r in rows]),
+            "description": [r.description for r in rows],
+            "amount": [r.amount for r in rows],
+            "is_income": np.fromiter(
+                (r.is_income for r in rows), dtype=bool, count=len(rows)
+            ),
+            "source": pd.Categorical([r.source for r in rows]),
+        })
+
     def parse_with_mapping(
         self, csv_content: str, column_mapping: dict[str, str]
     ) -> list[TransactionCreate]:
@@ -186,36 +562,31 @@ class CSVParser:
         Returns:
             List of TransactionCreate objects
         """
-        df = pd.read_csv(StringIO(csv_content))
-
         # Validate mapping
         missing = set(["date", "amount"]) - set(column_mapping.keys())
         if missing:
             raise ValueError(f"Missing required columns: {missing}")
 
-        transactions = []
+        df = _read_csv(csv_content)
 
-        for idx, row in df.iterrows():
-            try:
-                date_val = self.parse_date(row[column_mapping["date"]])
-                amount = self.parse_amount(row[column_mapping["amount"]])
-                description = self.clean_description(
-                    row.get(column_mapping.get("description"), f"Transaction {idx + 1}")
-                )
-
-                tx = TransactionCreate(
-                    date=date_val,
-                    description=description,
-                    amount=amount,
-                    is_income=False,
-                    source="csv",
-                )
-                transactions.append(tx)
-
-            except (ValueError, KeyError) as e:
-                continue
+        date_col = column_mapping["date"]
+        amount_col = column_mapping["amount"]
+        if date_col not in df.columns or amount_col not in df.columns:
+            return []
+
+        desc_col = column_mapping.get("description")
+        rows = self._rows_from_columns(
+            df[date_col],
+            df[amount_col],
+            df[desc_col] if desc_col in df.columns else None,
+            first_row=1,
+        )
+
+        return TransactionCreate.from_rows(rows)
 
-        return transactions
+
+# Shared instance; CSVParser keeps no per-parse state
+DEFAULT_PARSER = CSVParser()
 
 
 def parse_csv(csv_content: str, user_id: str | None = None) -> list[dict]:
@@ -224,6 +595,10 @@ def parse_csv(csv_content: str, user_id: str | None = None) -> list[dict]:
 
     Returns list of dict representations for serialization.
     """
-    parser = CSVParser()
-    transactions = parser.parse(csv_content, user_id)
-    return [t.model_dump() for t in transactions]
+    errors: list[str] = []
+    rows = [r.to_dict() for r in DEFAULT_PARSER._iter_rows(StringIO(csv_content), errors)]
+
+    if not rows:
+        raise ValueError(f"No valid transactions found. Errors: {errors}")
+
+    return rows
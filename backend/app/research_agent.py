@@ -11,6 +11,8 @@ Features:
 """
 import logging
 import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any
 from dataclasses import dataclass, field
@@ -18,7 +20,16 @@ from dataclasses import dataclass, field
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Total batch size above which Source.hash_batch uses a thread pool
+HASH_PARALLEL_MIN_BYTES = 1 << 20
+
+
+def _content_hash(content: bytes) -> str:
+    """Short non-cryptographic fingerprint (8 hex chars)."""
+    return hashlib.blake2b(content, digest_size=4).hexdigest()
+
+
+@dataclass(slots=True, frozen=True)
 class Source:
     """A source document with metadata for citation."""
     url: str
@@ -28,10 +39,30 @@ class Source:
     content_hash: str = field(init=False)
 
     def __post_init__(self):
-        self.content_hash = hashlib.md5(self.content.encode()).hexdigest()[:8]
+        digest = _content_hash(self.content.encode("utf-8", "ignore"))
+        object.__setattr__(self, "content_hash", digest)
+
+    @staticmethod
+    def hash_batch(contents: list[bytes]) -> list[str]:
+        """Hash raw document bytes, in parallel threads for large batches.
+
+        hashlib releases the GIL while hashing, so threads run truly in
+        parallel. Small batches are hashed inline to skip pool overhead.
+        """
+        if len(contents) < 2 or sum(map(len, contents)) < HASH_PARALLEL_MIN_BYTES:
+            return [_content_hash(b) for b in contents]
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            return list(ex.map(_content_hash, contents))
+
+    @classmethod
+    def from_many(cls, pairs: list[tuple[str, str]]) -> list["Source"]:
+        """Build sources from (url, content) pairs sharing one scrape time."""
+        scraped_at = datetime.utcnow()
+        return [cls(url, content, scraped_at=scraped_at) for url, content in pairs]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Citation:
     """A citation linking a fact to its source."""
     fact: str
@@ -1,95 +1,114 @@
 """Pytest configuration and fixtures."""
-import asyncio
+import logging
 import os
 import sys
 from datetime import datetime, timedelta
 from decimal import Decimal
+from pathlib import Path
 from typing import AsyncGenerator, Generator
 from uuid import uuid4
 
+import numpy as np
 import pytest
 import pytest_asyncio
 
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
 # Add app to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, str(BACKEND_DIR))
 
-# Set test environment
-os.environ["LITELLM_CONFIG_PATH"] = os.path.join(
-    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-    "litellm_config.yaml"
-)
-os.environ["REDIS_URL"] = "redis://localhost:6379"
+# Set test environment (without overriding an outer CI environment)
+os.environ.setdefault("LITELLM_CONFIG_PATH", str(BACKEND_DIR / "litellm_config.yaml"))
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+# Keep the on-disk categorization cache out of test runs
+os.environ["CATEGORY_CACHE_PATH"] = ""
+# One Stan thread per fit; xdist already spreads fits over the cores
+os.environ.setdefault("STAN_NUM_THREADS", "1")
 
+# Silence cmdstanpy's per-fit progress logging and prophet's notices
+for _name in ("cmdstanpy", "prophet"):
+    logging.getLogger(_name).setLevel(logging.WARNING)
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create event loop for async tests."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+# Shared timestamp for sample data, taken once per session
+_NOW_ISO = datetime.now().isoformat()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_transactions():
-    """Sample transactions for testing."""
+    """Sample transactions for testing (read-only; shared per session)."""
     return [
         {
-            "date": datetime.now().isoformat(),
+            "date": _NOW_ISO,
             "description": "Swiggy order for dinner",
             "amount": "450.00",
         },
         {
-            "date": datetime.now().isoformat(),
+            "date": _NOW_ISO,
             "description": "Uber trip to airport",
             "amount": "320.00",
         },
         {
-            "date": datetime.now().isoformat(),
+            "date": _NOW_ISO,
             "description": "BigBasket groceries",
             "amount": "2100.00",
         },
         {
-            "date": datetime.now().isoformat(),
+            "date": _NOW_ISO,
             "description": "Netflix subscription",
             "amount": "499.00",
         },
         {
-            "date": datetime.now().isoformat(),
+            "date": _NOW_ISO,
             "description": "Electricity bill",
             "amount": "2500.00",
         },
         {
-            "date": datetime.now().isoformat(),
+            "date": _NOW_ISO,
             "description": "Salary deposit",
             "amount": "75000.00",
             "is_income": True,
         },
         {
-            "date": datetime.now().isoformat(),
+            "date": _NOW_ISO,
             "description": "Amazon shopping",
             "amount": "3500.00",
         },
         {
-            "date": datetime.now().isoformat(),
+            "date": _NOW_ISO,
             "description": "Movie tickets",
             "amount": "600.00",
         },
         {
-            "date": datetime.now().isoformat(),
+            "date": _NOW_ISO,
             "description": "MedPlus pharmacy",
             "amount": "450.00",
         },
         {
-            "date": datetime.now().isoformat(),
+            "date": _NOW_ISO,
             "description": "Petrol refill",
             "amount": "1800.00",
         },
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def sample_tx_objects(sample_transactions):
+    """sample_transactions validated as TransactionCreate, built once per session."""
+    from app.models import TransactionCreate
+
+    return [
+        TransactionCreate(
+            date=t["date"],
+            description=t["description"],
+            amount=Decimal(str(t["amount"])),
+        )
+        for t in sample_transactions
+    ]
+
+
+@pytest.fixture(scope="session")
 def sample_csv_content():
-    """Sample CSV content for parser testing."""
+    """Sample CSV content for parser testing (shared per session)."""
     return """date,description,amount
 2024-01-15,Swiggy order,450.00
 2024-01-15,Uber trip,320.00
@@ -115,23 +134,33 @@ def mock_user_id():
     return uuid4()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_forecast_transactions():
-    """Sample transactions for forecasting."""
+    """Sample transactions for forecasting (read-only; shared per session)."""
     base_date = datetime.now() - timedelta(days=90)
-    transactions = []
-    for i in range(90):
-        date = (base_date + timedelta(days=i)).date()
-        # Add some randomness but with a trend
-        import random
-        transactions.append({
-            "date": date.isoformat(),
+    # Add some randomness (seeded, so forecasts are reproducible)
+    rng = np.random.default_rng(0)
+    amounts = 500 + rng.integers(-100, 201, size=90)
+    return [
+        {
+            "date": (base_date + timedelta(days=i)).date().isoformat(),
             "description": f"Grocery shopping {i}",
-            "amount": str(500 + random.randint(-100, 200)),
+            "amount": str(int(amount)),
             "category": "Groceries",
             "is_income": False,
-        })
-    return transactions
+        }
+        for i, amount in enumerate(amounts)
+    ]
+
+
+@pytest.fixture(scope="session")
+def forecast_tx_objects(sample_forecast_transactions):
+    """sample_forecast_transactions as TransactionCreate, validated as one batch per session."""
+    from pydantic import TypeAdapter
+
+    from app.models import TransactionCreate
+
+    return TypeAdapter(list[TransactionCreate]).validate_python(sample_forecast_transactions)
 
 
 @pytest.fixture
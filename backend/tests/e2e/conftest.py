@@ -0,0 +1,86 @@
+"""Fixtures shared by the end-to-end tests."""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest_asyncio
+from playwright.async_api import Browser, Playwright, async_playwright
+
+# Browsers per test process (each xdist worker runs its own pool)
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+# Relaunch a browser after it has served this many contexts
+BROWSER_POOL_RECYCLE_AFTER = int(os.getenv("BROWSER_POOL_RECYCLE_AFTER", "100"))
+# CDP WebSocket endpoint of an already running Chromium to share
+# (set by run_tests.py); when unset, the pool launches its own browsers
+CDP_ENDPOINT = os.getenv("E2E_CDP_ENDPOINT")
+
+
+class BrowserPool:
+    """Pre-launched Chromium instances, recycled after a number of contexts."""
+
+    def __init__(
+        self,
+        playwright: Playwright,
+        size: int = BROWSER_POOL_SIZE,
+        recycle_after: int = BROWSER_POOL_RECYCLE_AFTER,
+    ):
+        self._playwright = playwright
+        self._size = size
+        self._recycle_after = recycle_after
+        self._browsers: asyncio.Queue[Browser] = asyncio.Queue()
+        self._contexts_served: dict[Browser, int] = {}
+
+    async def _launch(self) -> Browser:
+        if CDP_ENDPOINT:
+            # Closing a CDP-connected browser only disconnects from it
+            browser = await self._playwright.chromium.connect_over_cdp(CDP_ENDPOINT)
+        else:
+            browser = await self._playwright.chromium.launch(headless=True)
+        self._contexts_served[browser] = 0
+        return browser
+
+    async def start(self) -> None:
+        browsers = await asyncio.gather(*(self._launch() for _ in range(self._size)))
+        for browser in browsers:
+            self._browsers.put_nowait(browser)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Browser]:
+        """Check a browser out of the pool, replacing it if it has crashed."""
+        browser = await self._browsers.get()
+        if not browser.is_connected():
+            self._contexts_served.pop(browser, None)
+            browser = await self._launch()
+        try:
+            yield browser
+        finally:
+            await self._release(browser)
+
+    async def _release(self, browser: Browser) -> None:
+        self._contexts_served[browser] += 1
+        if self._contexts_served[browser] >= self._recycle_after:
+            del self._contexts_served[browser]
+            await browser.close()
+            browser = await self._launch()
+        self._browsers.put_nowait(browser)
+
+    async def close(self) -> None:
+        await asyncio.gather(*(b.close() for b in self._contexts_served))
+        self._contexts_served.clear()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def playwright():
+    """Start Playwright once for the whole test session."""
+    async with async_playwright() as p:
+        yield p
+
+
+@pytest_asyncio.fixture(scope="session")
+async def browser_pool(playwright):
+    """Browser pool shared by all tests; each test gets its own context."""
+    pool = BrowserPool(playwright)
+    await pool.start()
+    yield pool
+    await pool.close()
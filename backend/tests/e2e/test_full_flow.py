@@ -10,6 +10,7 @@ Uses Playwright for frontend testing and FastAPI TestClient for backend.
 """
 import asyncio
 import logging
+import os
 import pytest
 import pytest_asyncio
 from datetime import datetime
@@ -19,11 +20,13 @@ from typing import AsyncGenerator
 from uuid import uuid4
 
 import httpx
-from playwright.async_api import async_playwright, Page
+from playwright.async_api import Page, expect
 
-# Configure detailed logging for debugging
+from app.main import app
+
+# Configure logging (quiet by default; set LOG_LEVEL=DEBUG/INFO when debugging)
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=os.environ.get("LOG_LEVEL", "WARNING"),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -33,83 +36,148 @@ TEST_BASE_URL = "http://localhost:8000"
 TEST_FRONTEND_URL = "http://localhost:5173"
 TEST_USER_ID = str(uuid4())
 
+# Upload payloads, encoded once for the whole module
+_SMALL_CSV = b"""date,description,amount
+2024-01-15,Swiggy order,450.00
+2024-01-15,Uber trip,320.00
+2024-01-16,BigBasket,2100.00
+2024-01-16,Netflix,499.00
+2024-01-17,Electricity bill,2500.00
+"""
+
+_BIG_CSV = b"""date,description,amount
+2024-01-15,Swiggy order,450.00
+2024-01-15,Uber trip,320.00
+2024-01-16,BigBasket,2100.00
+2024-01-16,Netflix subscription,499.00
+2024-01-17,Electricity bill,2500.00
+2024-01-18,Amazon shopping,3500.00
+2024-01-18,Movie tickets,600.00
+2024-01-19,Pharmacy,450.00
+2024-01-19,Petrol,1800.00
+2024-01-20,Salary,75000.00
+"""
+
+
+class Selectors:
+    """CSS/text selectors shared by the frontend tests."""
+
+    nav_links = "aside nav a"
+    upload_link = "a[href='/upload']"
+    tx_link = "a[href='/transactions']"
+    file_input = 'input[type="file"]'
+    drop_zone = "text=Drop your CSV file here"
+    table = "table"
+    search = 'input[placeholder*="Search"]'
+    create_budget = "text=Create Budget"
+
+
+def _skip_unless_reachable(url: str, service: str) -> None:
+    """Skip the calling fixture's tests if a service does not answer quickly."""
+    try:
+        httpx.get(url, timeout=1.0)
+    except httpx.HTTPError:
+        pytest.skip(f"{service} not reachable at {url}")
+
+
+@pytest.fixture(scope="session")
+def frontend():
+    """Probe the frontend once; its tests are skipped if it is down."""
+    _skip_unless_reachable(TEST_FRONTEND_URL, "Frontend")
+
+
+@pytest_asyncio.fixture(scope="session")
+async def api_client():
+    """In-process client for backend-only tests: calls the FastAPI app over ASGI, no server needed."""
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        headers={"X-User-ID": TEST_USER_ID},
+    ) as client:
+        yield client
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """API client shared by the whole session (one keep-alive connection pool)."""
+    # Probed once per session: a skip here is reused by every test using the client
+    _skip_unless_reachable(f"{TEST_BASE_URL}/health", "Backend")
+
+    # Limits live on the transport: a client-level limits= is ignored once transport= is set
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=0,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    )
+    async with httpx.AsyncClient(
+        base_url=TEST_BASE_URL,
+        transport=transport,
+        headers={"X-User-ID": TEST_USER_ID},
+    ) as client:
+        yield client
+
 
 class TestBackendAPI:
     """Backend API integration tests."""
 
-    @pytest_asyncio.fixture
-    async def client(self):
-        """Create async test client."""
-        async with httpx.AsyncClient(base_url=TEST_BASE_URL) as client:
-            yield client
-
     @pytest.mark.asyncio
-    async def test_health_check(self, client):
+    async def test_health_check(self, api_client):
         """Test health check endpoint."""
         logger.info("Testing health check endpoint")
-        response = await client.get("/health")
+        response = await api_client.get("/health")
 
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
         assert "timestamp" in data
-        logger.info(f"Health check passed: {data}")
+        logger.info("Health check passed: %s", data)
 
     @pytest.mark.asyncio
-    async def test_upload_csv(self, client):
+    async def test_upload_csv(self, api_client):
         """Test CSV upload endpoint."""
         logger.info("Testing CSV upload endpoint")
 
-        csv_content = """date,description,amount
-2024-01-15,Swiggy order,450.00
-2024-01-15,Uber trip,320.00
-2024-01-16,BigBasket,2100.00
-2024-01-16,Netflix,499.00
-2024-01-17,Electricity bill,2500.00
-"""
-
-        response = await client.post(
+        response = await api_client.post(
             "/api/upload/csv",
-            files={"file": ("test.csv", csv_content, "text/csv")},
-            headers={"X-User-ID": TEST_USER_ID},
+            files={"file": ("test.csv", _SMALL_CSV, "text/csv")},
         )
 
         assert response.status_code == 200
         data = response.json()
         assert data["rows_parsed"] == 5
         assert len(data["transactions"]) == 5
-        logger.info(f"CSV upload passed: {data['rows_parsed']} rows parsed")
+        logger.info("CSV upload passed: %s rows parsed", data["rows_parsed"])
 
     @pytest.mark.asyncio
-    async def test_categorize_transactions(self, client):
+    async def test_categorize_transactions(self, api_client):
         """Test transaction categorization."""
         logger.info("Testing transaction categorization")
 
+        now = datetime.now().isoformat()
         transactions = [
             {
-                "date": datetime.now().isoformat(),
+                "date": now,
                 "description": "Swiggy order for dinner",
                 "amount": "450.00",
             },
             {
-                "date": datetime.now().isoformat(),
+                "date": now,
                 "description": "Uber trip to airport",
                 "amount": "320.00",
             },
             {
-                "date": datetime.now().isoformat(),
+                "date": now,
                 "description": "Netflix subscription",
                 "amount": "499.00",
             },
         ]
 
-        response = await client.post(
+        response = await api_client.post(
             "/api/categorize",
             json={
                 "transactions": transactions,
                 "user_id": TEST_USER_ID,
             },
-            headers={"X-User-ID": TEST_USER_ID},
         )
 
         assert response.status_code == 200
@@ -124,32 +192,26 @@ class TestBackendAPI:
         # Calculate accuracy
         confidences = [r.get("confidence", 0) for r in data["results"]]
         avg_confidence = sum(confidences) / len(confidences)
-        logger.info(f"Categorization passed: avg confidence = {avg_confidence:.2%}")
+        logger.info("Categorization passed: avg confidence = %.2f%%", avg_confidence * 100)
 
     @pytest.mark.asyncio
-    async def test_get_transactions_empty(self, client):
+    async def test_get_transactions_empty(self, api_client):
         """Test getting transactions when none exist."""
         logger.info("Testing get transactions (empty state)")
 
-        response = await client.get(
-            "/api/transactions",
-            headers={"X-User-ID": TEST_USER_ID},
-        )
+        response = await api_client.get("/api/transactions")
 
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
-        logger.info(f"Get transactions passed: {len(data)} transactions")
+        logger.info("Get transactions passed: %s transactions", len(data))
 
     @pytest.mark.asyncio
-    async def test_dashboard_empty(self, client):
+    async def test_dashboard_empty(self, api_client):
         """Test dashboard with no data."""
         logger.info("Testing dashboard (empty state)")
 
-        response = await client.get(
-            "/api/dashboard",
-            headers={"X-User-ID": TEST_USER_ID},
-        )
+        response = await api_client.get("/api/dashboard")
 
         assert response.status_code == 200
         data = response.json()
@@ -157,32 +219,25 @@ class TestBackendAPI:
         assert "total_expense" in data
         assert "net_savings" in data
         assert "category_breakdown" in data
-        logger.info(f"Dashboard response: income={data['total_income']}, expense={data['total_expense']}")
+        logger.info("Dashboard response: income=%s, expense=%s", data["total_income"], data["total_expense"])
 
 
 class TestFrontendE2E:
     """Frontend E2E tests with Playwright."""
 
     @pytest_asyncio.fixture
-    async def browser(self):
-        """Launch browser for testing."""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            yield browser
-            await browser.close()
-
-    @pytest_asyncio.fixture
-    async def page(self, browser):
+    async def page(self, frontend, browser_pool):
         """Create browser page."""
-        context = await browser.new_context()
-        page = await context.new_page()
+        async with browser_pool.acquire() as browser:
+            context = await browser.new_context()
+            page = await context.new_page()
 
-        # Add console logging
-        page.on("console", lambda msg: logger.info(f"Browser console [{msg.type}]: {msg.text}"))
-        page.on("pageerror", lambda err: logger.error(f"Page error: {err}"))
+            # Add console logging
+            page.on("console", lambda msg: logger.info("Browser console [%s]: %s", msg.type, msg.text))
+            page.on("pageerror", lambda err: logger.error("Page error: %s", err))
 
-        yield page
-        await context.close()
+            yield page
+            await context.close()
 
     @pytest.mark.asyncio
     async def test_dashboard_page_loads(self, page):
@@ -190,18 +245,15 @@ class TestFrontendE2E:
         logger.info("Testing dashboard page load")
 
         # Navigate to dashboard
-        await page.goto(f"{TEST_FRONTEND_URL}/", timeout=30000)
-
-        # Wait for page to load
-        await page.wait_for_load_state("networkidle")
+        await page.goto(f"{TEST_FRONTEND_URL}/", wait_until="domcontentloaded", timeout=30000)
 
         # Check page title
         title = await page.title()
-        logger.info(f"Page title: {title}")
+        logger.info("Page title: %s", title)
 
         # Check main content is visible
-        content = await page.content()
-        assert "Dashboard" in content or "Finance" in content
+        heading = page.locator("text=Dashboard").or_(page.locator("text=Finance"))
+        await expect(heading.first).to_be_visible(timeout=5000)
 
         logger.info("Dashboard page loaded successfully")
 
@@ -210,29 +262,27 @@ class TestFrontendE2E:
         """Test navigation between pages."""
         logger.info("Testing navigation")
 
-        await page.goto(f"{TEST_FRONTEND_URL}/", timeout=30000)
-        await page.wait_for_load_state("networkidle")
+        await page.goto(f"{TEST_FRONTEND_URL}/", wait_until="domcontentloaded", timeout=30000)
 
         # Check sidebar navigation
-        nav_items = await page.locator("aside nav a").all()
-        logger.info(f"Found {len(nav_items)} navigation items")
+        nav_links = page.locator(Selectors.nav_links)
+        await nav_links.first.wait_for(state="visible", timeout=5000)
+        nav_items = await nav_links.all()
+        logger.info("Found %s navigation items", len(nav_items))
 
         # Click on Upload
-        upload_link = page.locator("a[href='/upload']")
+        upload_link = page.locator(Selectors.upload_link)
         if await upload_link.is_visible():
             await upload_link.click()
-            await page.wait_for_load_state("networkidle")
-            content = await page.content()
-            assert "Upload" in content or "CSV" in content
+            upload_text = page.locator("text=Upload").or_(page.locator("text=CSV"))
+            await expect(upload_text.first).to_be_visible(timeout=5000)
             logger.info("Upload page loaded")
 
         # Click on Transactions
-        tx_link = page.locator("a[href='/transactions']")
+        tx_link = page.locator(Selectors.tx_link)
         if await tx_link.is_visible():
             await tx_link.click()
-            await page.wait_for_load_state("networkidle")
-            content = await page.content()
-            assert "Transactions" in content
+            await expect(page.locator("text=Transactions").first).to_be_visible(timeout=5000)
             logger.info("Transactions page loaded")
 
     @pytest.mark.asyncio
@@ -240,84 +290,63 @@ class TestFrontendE2E:
         """Test upload page elements are present."""
         logger.info("Testing upload page elements")
 
-        await page.goto(f"{TEST_FRONTEND_URL}/upload", timeout=30000)
-        await page.wait_for_load_state("networkidle")
+        await page.goto(f"{TEST_FRONTEND_URL}/upload", wait_until="domcontentloaded", timeout=30000)
+        file_input = page.locator(Selectors.file_input)
+        await file_input.wait_for(state="attached", timeout=5000)
 
         # Check for drop zone
-        drop_zone = page.locator("text=Drop your CSV file here")
-        logger.info(f"Drop zone visible: {await drop_zone.is_visible()}")
+        drop_zone = page.locator(Selectors.drop_zone)
+        logger.info("Drop zone visible: %s", await drop_zone.is_visible())
 
         # Check for file input
-        file_input = page.locator('input[type="file"]')
-        logger.info(f"File input exists: {await file_input.is_visible()}")
+        logger.info("File input exists: %s", await file_input.is_visible())
 
     @pytest.mark.asyncio
     async def test_transactions_page(self, page):
         """Test transactions page."""
         logger.info("Testing transactions page")
 
-        await page.goto(f"{TEST_FRONTEND_URL}/transactions", timeout=30000)
-        await page.wait_for_load_state("networkidle")
+        await page.goto(f"{TEST_FRONTEND_URL}/transactions", wait_until="domcontentloaded", timeout=30000)
+        search_input = page.locator(Selectors.search)
+        await search_input.wait_for(state="visible", timeout=5000)
 
         # Check for transactions table
-        table = page.locator("table")
-        logger.info(f"Table visible: {await table.is_visible()}")
+        table = page.locator(Selectors.table)
+        logger.info("Table visible: %s", await table.is_visible())
 
         # Check for search input
-        search_input = page.locator('input[placeholder*="Search"]')
-        logger.info(f"Search input visible: {await search_input.is_visible()}")
+        logger.info("Search input visible: %s", await search_input.is_visible())
 
     @pytest.mark.asyncio
     async def test_budgets_page(self, page):
         """Test budgets page."""
         logger.info("Testing budgets page")
 
-        await page.goto(f"{TEST_FRONTEND_URL}/budgets", timeout=30000)
-        await page.wait_for_load_state("networkidle")
+        await page.goto(f"{TEST_FRONTEND_URL}/budgets", wait_until="domcontentloaded", timeout=30000)
+        create_button = page.locator(Selectors.create_budget).first
+        await create_button.wait_for(state="visible", timeout=5000)
 
         # Check for create budget form
-        create_button = page.locator("text=Create Budget")
-        logger.info(f"Create budget button visible: {await create_button.is_visible()}")
+        logger.info("Create budget button visible: %s", await create_button.is_visible())
 
 
 class TestEndToEndFlow:
     """Complete end-to-end flow tests."""
 
-    @pytest_asyncio.fixture
-    async def client(self):
-        """Create async test client."""
-        async with httpx.AsyncClient(base_url=TEST_BASE_URL) as client:
-            yield client
-
     @pytest.mark.asyncio
     async def test_complete_csv_flow(self, client):
         """Test complete CSV upload → categorize → save flow."""
         logger.info("Testing complete CSV flow")
 
         # Step 1: Upload CSV
-        csv_content = """date,description,amount
-2024-01-15,Swiggy order,450.00
-2024-01-15,Uber trip,320.00
-2024-01-16,BigBasket,2100.00
-2024-01-16,Netflix subscription,499.00
-2024-01-17,Electricity bill,2500.00
-2024-01-18,Amazon shopping,3500.00
-2024-01-18,Movie tickets,600.00
-2024-01-19,Pharmacy,450.00
-2024-01-19,Petrol,1800.00
-2024-01-20,Salary,75000.00
-"""
-
-        # Upload
         upload_response = await client.post(
             "/api/upload/csv",
-            files={"file": ("test.csv", csv_content, "text/csv")},
-            headers={"X-User-ID": TEST_USER_ID},
+            files={"file": ("test.csv", _BIG_CSV, "text/csv")},
         )
 
         assert upload_response.status_code == 200
         upload_data = upload_response.json()
-        logger.info(f"Step 1 - Upload: {upload_data['rows_parsed']} rows parsed")
+        logger.info("Step 1 - Upload: %s rows parsed", upload_data["rows_parsed"])
 
         # Step 2: Categorize
         categorize_response = await client.post(
@@ -326,13 +355,12 @@ class TestEndToEndFlow:
                 "transactions": upload_data["transactions"],
                 "user_id": TEST_USER_ID,
             },
-            headers={"X-User-ID": TEST_USER_ID},
         )
 
         assert categorize_response.status_code == 200
         categorize_data = categorize_response.json()
-        logger.info(f"Step 2 - Categorize: {categorize_data['total']} transactions, "
-                   f"avg confidence: {categorize_data['avg_confidence']:.2%}")
+        logger.info("Step 2 - Categorize: %s transactions, avg confidence: %.2f%%",
+                    categorize_data["total"], categorize_data["avg_confidence"] * 100)
 
         # Verify categories
         categories = [r.get("category") for r in categorize_data["results"]]
@@ -353,23 +381,27 @@ class TestEndToEndFlow:
         save_response = await client.post(
             "/api/transactions",
             json=categorized_transactions,
-            headers={"X-User-ID": TEST_USER_ID},
         )
 
         assert save_response.status_code == 200
         save_data = save_response.json()
-        logger.info(f"Step 3 - Saved: {save_data['inserted']} transactions")
+        logger.info("Step 3 - Saved: %s transactions", save_data["inserted"])
 
-        # Step 4: Verify dashboard shows data
-        dashboard_response = await client.get(
-            "/api/dashboard",
-            headers={"X-User-ID": TEST_USER_ID},
+        # Step 4: Verify dashboard and transactions (independent reads, run together)
+        dashboard_response, transactions_response = await asyncio.gather(
+            client.get("/api/dashboard"),
+            client.get("/api/transactions"),
         )
 
+        assert transactions_response.status_code == 200
+        saved = transactions_response.json()
+        assert isinstance(saved, list)
+        logger.info("Step 4 - Transactions: %s stored", len(saved))
+
         assert dashboard_response.status_code == 200
         dashboard_data = dashboard_response.json()
-        logger.info(f"Step 4 - Dashboard: income={dashboard_data['total_income']}, "
-                   f"expense={dashboard_data['total_expense']}")
+        logger.info("Step 4 - Dashboard: income=%s, expense=%s",
+                    dashboard_data["total_income"], dashboard_data["total_expense"])
 
         # Verify category breakdown
         breakdown = dashboard_data.get("category_breakdown", {})
@@ -390,18 +422,17 @@ class TestEndToEndFlow:
                 "months_ahead": 1,
                 "category": None,
             },
-            headers={"X-User-ID": TEST_USER_ID},
         )
 
         # Should fail without enough transactions
         if forecast_response.status_code == 400:
-            logger.info(f"Forecast requires more transactions: {forecast_response.json()}")
+            logger.info("Forecast requires more transactions: %s", forecast_response.json())
             pytest.skip("Not enough transactions for forecast")
         else:
             assert forecast_response.status_code == 200
             forecast_data = forecast_response.json()
-            logger.info(f"Forecast generated: {forecast_data['predicted_amount']} "
-                       f"for {forecast_data['forecast_date']}")
+            logger.info("Forecast generated: %s for %s",
+                        forecast_data["predicted_amount"], forecast_data["forecast_date"])
 
             # Verify forecast structure
             assert "predicted_amount" in forecast_data
@@ -415,40 +446,35 @@ class TestEndToEndFlow:
 class TestErrorHandling:
     """Error handling tests."""
 
-    @pytest_asyncio.fixture
-    async def client(self):
-        """Create async test client."""
-        async with httpx.AsyncClient(base_url=TEST_BASE_URL) as client:
-            yield client
-
     @pytest.mark.asyncio
-    async def test_invalid_csv(self, client):
+    async def test_invalid_csv(self, api_client):
         """Test handling invalid CSV."""
         logger.info("Testing invalid CSV handling")
 
-        response = await client.post(
+        response = await api_client.post(
             "/api/upload/csv",
             files={"file": ("test.csv", "not,a,valid,csv", "text/csv")},
-            headers={"X-User-ID": TEST_USER_ID},
         )
 
         # Should return 400 with error message
         assert response.status_code == 400
-        logger.info(f"Invalid CSV handled: {response.json()}")
+        logger.info("Invalid CSV handled: %s", response.json())
 
     @pytest.mark.asyncio
-    async def test_missing_user_header(self, client):
+    async def test_missing_user_header(self, api_client):
         """Test missing user ID header."""
         logger.info("Testing missing user header")
 
-        response = await client.get("/api/transactions")
+        request = api_client.build_request("GET", "/api/transactions")
+        del request.headers["X-User-ID"]
+        response = await api_client.send(request)
 
         # Should fail without user ID
         assert response.status_code in [401, 403, 422]
-        logger.info(f"Missing user header handled: status={response.status_code}")
+        logger.info("Missing user header handled: status=%s", response.status_code)
 
     @pytest.mark.asyncio
-    async def test_categorization_timeout(self, client):
+    async def test_categorization_timeout(self, api_client):
         """Test categorization with slow response."""
         logger.info("Testing categorization timeout handling")
 
@@ -462,17 +488,16 @@ class TestErrorHandling:
         ]
 
         # Should complete within reasonable time
-        response = await client.post(
+        response = await api_client.post(
             "/api/categorize",
             json={
                 "transactions": transactions,
                 "user_id": TEST_USER_ID,
             },
-            headers={"X-User-ID": TEST_USER_ID},
         )
 
         # Should either succeed or fail gracefully
-        logger.info(f"Categorization completed: status={response.status_code}")
+        logger.info("Categorization completed: status=%s", response.status_code)
 
 
 if __name__ == "__main__":
@@ -11,14 +11,19 @@ Run with: locust -f locustfile.py --host=http://localhost:8000
 """
 import json
 import logging
+import os
 import random
+import time
 import uuid
 from datetime import datetime, timedelta
 from decimal import Decimal
+from functools import lru_cache
 from typing import Optional
 
+import orjson
+from hdrh.histogram import HdrHistogram
 from locust import (
-    HttpUser,
+    FastHttpUser,
     TaskSet,
     task,
     events,
@@ -27,9 +32,9 @@ from locust import (
 )
 from locust.runners import MasterRunner
 
-# Configure logging
+# Configure logging (quiet by default; set LOG_LEVEL=DEBUG/INFO when debugging)
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.environ.get("LOG_LEVEL", "WARNING"),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -51,6 +56,58 @@ SAMPLE_TRANSACTIONS = [
     {"description": "Salary deposit", "amount": 75000.00, "category": "Income"},
 ]
 
+# Categorization request items without the date, which is stamped per call
+_CATEGORIZE_TEMPLATE = [
+    {"description": tx["description"], "amount": str(tx["amount"])}
+    for tx in SAMPLE_TRANSACTIONS
+]
+
+# Last (time.time(), ISO string) pair handed out by _iso_now
+_last_iso = [0.0, ""]
+
+
+def _iso_now() -> str:
+    """Current local time as ISO 8601, recomputed at most once per second."""
+    now = time.time()
+    if now - _last_iso[0] >= 1.0:
+        _last_iso[0] = now
+        _last_iso[1] = datetime.fromtimestamp(now).isoformat()
+    return _last_iso[1]
+
+
+# Highest latency tracked by LoadTestMetrics (60 s, in microseconds)
+LATENCY_MAX_US = 60_000_000
+
+# Distinct CSV upload payloads, built once each and reused
+CSV_PAYLOAD_VARIANTS = 64
+
+
+@lru_cache(maxsize=CSV_PAYLOAD_VARIANTS)
+def _build_csv(seed: int) -> bytes:
+    """Build a 10-row CSV upload from sample transactions (deterministic per seed)."""
+    rng = random.Random(seed)
+    lines = ["date,description,amount"]
+    for i in range(10):
+        tx = rng.choice(SAMPLE_TRANSACTIONS)
+        lines.append(f"2024-01-{15+i:02d},{tx['description']},{tx['amount']}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+# FastHttpUser has no files= support, so uploads send a prebuilt multipart body
+_UPLOAD_BOUNDARY = "locust-csv-upload"
+_UPLOAD_CONTENT_TYPE = f"multipart/form-data; boundary={_UPLOAD_BOUNDARY}"
+
+
+@lru_cache(maxsize=CSV_PAYLOAD_VARIANTS)
+def _build_upload_body(seed: int) -> bytes:
+    """Wrap the CSV for a seed in a multipart/form-data body with a single file field."""
+    head = (
+        f"--{_UPLOAD_BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="test.csv"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode()
+    return head + _build_csv(seed) + f"\r\n--{_UPLOAD_BOUNDARY}--\r\n".encode()
+
 
 class LoadTestMetrics:
     """Track load test metrics."""
@@ -59,35 +116,39 @@ class LoadTestMetrics:
         self.total_requests = 0
         self.total_failures = 0
         self.total_successes = 0
-        self.response_times = []
+        # Latencies in microseconds: O(1) record, fixed memory, mergeable
+        self.latency_us = HdrHistogram(1, LATENCY_MAX_US, 3)
         self.throughput = []
 
-    def record(self, response_time: float, success: bool):
+    def record(self, response_time_us: int, success: bool):
         self.total_requests += 1
         if success:
             self.total_successes += 1
         else:
             self.total_failures += 1
-        self.response_times.append(response_time)
+        # Clamp into the histogram's range so outliers still count
+        if response_time_us < 1:
+            response_time_us = 1
+        elif response_time_us > LATENCY_MAX_US:
+            response_time_us = LATENCY_MAX_US
+        self.latency_us.record_value(response_time_us)
 
     def get_stats(self) -> dict:
-        if not self.response_times:
+        if not self.latency_us.get_total_count():
             return {}
 
-        sorted_times = sorted(self.response_times)
-        p50 = sorted_times[len(sorted_times) // 2]
-        p95 = sorted_times[int(len(sorted_times) * 0.95)]
-        p99 = sorted_times[int(len(sorted_times) * 0.99)]
+        # One pass over the histogram's buckets for all three percentiles
+        pct = self.latency_us.get_percentile_to_value_dict([50, 95, 99])
 
         return {
             "total_requests": self.total_requests,
             "successes": self.total_successes,
             "failures": self.total_failures,
             "success_rate": self.total_successes / self.total_requests if self.total_requests > 0 else 0,
-            "p50_latency_ms": p50,
-            "p95_latency_ms": p95,
-            "p99_latency_ms": p99,
-            "avg_latency_ms": sum(self.response_times) / len(self.response_times),
+            "p50_latency_ms": pct[50] / 1000,
+            "p95_latency_ms": pct[95] / 1000,
+            "p99_latency_ms": pct[99] / 1000,
+            "avg_latency_ms": self.latency_us.get_mean_value() / 1000,
         }
 
 
@@ -108,7 +169,8 @@ def on_test_stop(environment, **kwargs):
     """Log final metrics on test stop."""
     logger.info("Load test completed")
     stats = metrics.get_stats()
-    logger.info(f"Final metrics: {json.dumps(stats, indent=2)}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Final metrics: %s", json.dumps(stats, indent=2))
 
     # Save metrics to file
     with open("/tmp/load_test_results.json", "w") as f:
@@ -122,70 +184,35 @@ class APITaskSet(TaskSet):
     def on_start(self):
         """Set up test user."""
         self.user_id = str(uuid.uuid4())
-        logger.info(f"Starting test for user: {self.user_id}")
+        logger.info("Starting test for user: %s", self.user_id)
 
-    @task(10)
-    def health_check(self):
-        """Test health check endpoint (high frequency)."""
-        with self.client.get(
-            "/health",
-            name="health_check",
-            catch_response=True,
-        ) as response:
-            if response.status_code == 200:
+    def _track(self, method: str, path: str, name: str, ok_codes=(200,), **kwargs):
+        """Send a request and mark it passed or failed by status code."""
+        with self.client.request(method, path, name=name, catch_response=True, **kwargs) as response:
+            if response.status_code in ok_codes:
                 response.success()
-                metrics.record(response.elapsed.total_seconds() * 1000, True)
             else:
                 response.failure(f"Status: {response.status_code}")
-                metrics.record(response.elapsed.total_seconds() * 1000, False)
+
+    @task(10)
+    def health_check(self):
+        """Test health check endpoint (high frequency)."""
+        self._track("GET", "/health", "health_check")
 
     @task(5)
     def get_transactions(self):
         """Test get transactions endpoint."""
-        with self.client.get(
-            "/api/transactions",
-            headers={"X-User-ID": self.user_id},
-            name="get_transactions",
-            catch_response=True,
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-                metrics.record(response.elapsed.total_seconds() * 1000, True)
-            else:
-                response.failure(f"Status: {response.status_code}")
-                metrics.record(response.elapsed.total_seconds() * 1000, False)
+        self._track("GET", "/api/transactions", "get_transactions", headers={"X-User-ID": self.user_id})
 
     @task(3)
     def get_dashboard(self):
         """Test dashboard endpoint."""
-        with self.client.get(
-            "/api/dashboard",
-            headers={"X-User-ID": self.user_id},
-            name="get_dashboard",
-            catch_response=True,
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-                metrics.record(response.elapsed.total_seconds() * 1000, True)
-            else:
-                response.failure(f"Status: {response.status_code}")
-                metrics.record(response.elapsed.total_seconds() * 1000, False)
+        self._track("GET", "/api/dashboard", "get_dashboard", headers={"X-User-ID": self.user_id})
 
     @task(2)
     def get_budgets(self):
         """Test get budgets endpoint."""
-        with self.client.get(
-            "/api/budgets",
-            headers={"X-User-ID": self.user_id},
-            name="get_budgets",
-            catch_response=True,
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-                metrics.record(response.elapsed.total_seconds() * 1000, True)
-            else:
-                response.failure(f"Status: {response.status_code}")
-                metrics.record(response.elapsed.total_seconds() * 1000, False)
+        self._track("GET", "/api/budgets", "get_budgets", headers={"X-User-ID": self.user_id})
 
     @task(2)
     def create_budget(self):
@@ -197,73 +224,52 @@ class APITaskSet(TaskSet):
             "month": datetime.now().strftime("%Y-%m-01"),
         }
 
-        with self.client.post(
-            "/api/budgets",
+        self._track(
+            "POST", "/api/budgets", "create_budget",
+            ok_codes=(200, 201),
             json=budget,
             headers={"X-User-ID": self.user_id},
-            name="create_budget",
-            catch_response=True,
-        ) as response:
-            if response.status_code in [200, 201]:
-                response.success()
-                metrics.record(response.elapsed.total_seconds() * 1000, True)
-            else:
-                response.failure(f"Status: {response.status_code}")
-                metrics.record(response.elapsed.total_seconds() * 1000, False)
+        )
 
     @task(1)
     def upload_csv(self):
         """Test CSV upload endpoint (lower frequency due to size)."""
-        csv_content = "date,description,amount\n"
-        for i in range(10):
-            tx = random.choice(SAMPLE_TRANSACTIONS)
-            csv_content += f"2024-01-{15+i:02d},{tx['description']},{tx['amount']}\n"
-
-        with self.client.post(
-            "/api/upload/csv",
-            files={"file": ("test.csv", csv_content, "text/csv")},
-            headers={"X-User-ID": self.user_id},
-            name="upload_csv",
-            catch_response=True,
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-                metrics.record(response.elapsed.total_seconds() * 1000, True)
-            else:
-                response.failure(f"Status: {response.status_code}")
-                metrics.record(response.elapsed.total_seconds() * 1000, False)
+        body = _build_upload_body(random.randrange(CSV_PAYLOAD_VARIANTS))
+
+        self._track(
+            "POST", "/api/upload/csv", "upload_csv",
+            data=body,
+            headers={"X-User-ID": self.user_id, "Content-Type": _UPLOAD_CONTENT_TYPE},
+        )
 
     @task(1)
     def categorize_transactions(self):
         """Test categorization endpoint (lower frequency due to LLM latency)."""
-        transactions = [
-            {
-                "date": datetime.now().isoformat(),
-                "description": tx["description"],
-                "amount": str(tx["amount"]),
-            }
-            for tx in random.sample(SAMPLE_TRANSACTIONS, 5)
-        ]
-
-        with self.client.post(
-            "/api/categorize",
-            json={
-                "transactions": transactions,
-                "user_id": self.user_id,
-            },
-            headers={"X-User-ID": self.user_id},
-            name="categorize",
-            catch_response=True,
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-                metrics.record(response.elapsed.total_seconds() * 1000, True)
-            else:
-                response.failure(f"Status: {response.status_code}")
-                metrics.record(response.elapsed.total_seconds() * 1000, False)
+        now = _iso_now()
+        body = orjson.dumps({
+            "transactions": [
+                {"date": now, **tx} for tx in random.sample(_CATEGORIZE_TEMPLATE, 5)
+            ],
+            "user_id": self.user_id,
+        })
+
+        self._track(
+            "POST", "/api/categorize", "categorize",
+            data=body,
+            headers={"X-User-ID": self.user_id, "Content-Type": "application/json"},
+        )
+
+
+class APIUser(FastHttpUser):
+    """Base user: keep-alive geventhttpclient session tuned for a local backend."""
+
+    abstract = True
+    network_timeout = 10.0
+    connection_timeout = 5.0
+    insecure = True  # Accept self-signed certs on local TLS endpoints
 
 
-class CategorizationLoadTest(HttpUser):
+class CategorizationLoadTest(APIUser):
     """Focused load test for categorization endpoint."""
 
     tasks = [APITaskSet]
@@ -273,7 +279,7 @@ class CategorizationLoadTest(HttpUser):
     weight = 3
 
 
-class DashboardLoadTest(HttpUser):
+class DashboardLoadTest(APIUser):
     """Focused load test for dashboard endpoints."""
 
     tasks = {
@@ -287,7 +293,7 @@ class DashboardLoadTest(HttpUser):
     weight = 2
 
 
-class BurstLoadTest(HttpUser):
+class BurstLoadTest(APIUser):
     """Burst load test - simulates sudden spike in traffic."""
 
     tasks = [APITaskSet]
@@ -299,8 +305,9 @@ class BurstLoadTest(HttpUser):
 # Custom statistics reporting
 @events.request.add_listener
 def on_request(request_type, name, response_time, response_length, exception, **kwargs):
-    """Track individual request metrics."""
-    pass  # Metrics are tracked in the task methods for more control
+    """Track individual request metrics (fires once per request, where it is made)."""
+    # Locust times requests with perf_counter and reports milliseconds
+    metrics.record(int(response_time * 1000), exception is None)
 
 
 class LoadTestConfig:
@@ -308,7 +315,7 @@ class LoadTestConfig:
 
     # Spawn rates
     HATCH_RATE = 1  # Users per second
-    MAX_USERS = 50  # Maximum concurrent users
+    MAX_USERS = 200  # Maximum concurrent users
 
     # Test durations (in seconds)
     WARMUP_TIME = 10
@@ -329,15 +336,14 @@ def run_load_test():
         sys.executable, "-m", "locust",
         "-f", __file__,
         "--host", "http://localhost:8000",
-        "--hatch-rate", str(LoadTestConfig.HATCH_RATE),
+        "--spawn-rate", str(LoadTestConfig.HATCH_RATE),
         "--users", str(LoadTestConfig.MAX_USERS),
-        "--runtime", str(LoadTestConfig.RUN_TIME),
         "--csv", "/tmp/locust_results",
         "--html", "/tmp/locust_report.html",
         "-t", f"{LoadTestConfig.WARMUP_TIME + LoadTestConfig.RUN_TIME + LoadTestConfig.COOLDOWN_TIME}s",
     ]
 
-    logger.info(f"Running load test: {' '.join(cmd)}")
+    logger.info("Running load test: %s", " ".join(cmd))
     subprocess.run(cmd)
 
 
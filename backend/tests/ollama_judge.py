@@ -0,0 +1,61 @@
+"""DeepEval judge model served by a local Ollama.
+
+Kept apart from test_research_agent.py so DeepEval and the OpenAI SDK are
+only imported once an evaluation actually runs.
+"""
+import httpx
+from deepeval.models import DeepEvalBaseLLM
+from openai import AsyncOpenAI, OpenAI
+
+# Ollama's OpenAI-compatible endpoint
+OLLAMA_BASE_URL = 'http://localhost:11434/v1'
+
+# Keep-alive pool shared by every metric's requests to Ollama
+OLLAMA_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=16, max_connections=16)
+OLLAMA_HTTP_TIMEOUT = 30.0
+
+
+class OllamaModel(DeepEvalBaseLLM):
+    """DeepEval judge served by Ollama, on pooled keep-alive HTTP clients.
+
+    GPTModel builds its own OpenAI clients, so connections aren't shared
+    between metrics; this wrapper gives all of them the same pools.
+    """
+
+    def __init__(self, model: str = 'qwen2.5-coder:3b'):
+        self._client = OpenAI(
+            api_key='ollama-fake-key',
+            base_url=OLLAMA_BASE_URL,
+            http_client=httpx.Client(limits=OLLAMA_HTTP_LIMITS, timeout=OLLAMA_HTTP_TIMEOUT),
+        )
+        self._async_client = AsyncOpenAI(
+            api_key='ollama-fake-key',
+            base_url=OLLAMA_BASE_URL,
+            http_client=httpx.AsyncClient(limits=OLLAMA_HTTP_LIMITS, timeout=OLLAMA_HTTP_TIMEOUT),
+        )
+        super().__init__(model)
+
+    def load_model(self):
+        return self._client
+
+    def generate(self, prompt: str) -> str:
+        response = self._client.chat.completions.create(
+            model=self.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+        )
+        return response.choices[0].message.content
+
+    async def a_generate(self, prompt: str) -> str:
+        response = await self._async_client.chat.completions.create(
+            model=self.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+        )
+        return response.choices[0].message.content
+
+    def get_model_name(self) -> str:
+        return self.model_name
+
+    def close(self) -> None:
+        self._client.close()
@@ -16,14 +16,24 @@ Usage:
     python tests/run_tests.py --report        # Generate HTML report
 """
 import argparse
+import hashlib
+import importlib.util
 import json
 import logging
 import os
+import re
+import shutil
 import subprocess
 import sys
+import threading
 import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
+from functools import cache
 from pathlib import Path
+from string import Template
 from typing import Optional
 
 # Configure logging
@@ -39,10 +49,117 @@ BACKEND_DIR = PROJECT_ROOT / "backend"
 FRONTEND_DIR = PROJECT_ROOT / "frontend"
 REPORTS_DIR = PROJECT_ROOT / "test_reports"
 
+# Ollama endpoint probed before the integration tests
+OLLAMA_TAGS_URL = "http://localhost:11434/api/tags"
+
+# Remote debugging port of the Chromium shared by the e2e workers
+CDP_PORT = int(os.getenv("E2E_CDP_PORT", "9222"))
+
+# Pip cache shared by every run (CI can persist this directory)
+PIP_CACHE_DIR = PROJECT_ROOT / ".pip-cache"
+
+# Keys of dependency sets already verified for this interpreter, one per line
+DEPS_SENTINEL = REPORTS_DIR / ".deps_ok"
+
+# Test dependencies per suite, as pip name -> import name
+UNIT_DEPS = {
+    "pytest": "pytest",
+    "pytest-asyncio": "pytest_asyncio",
+    "pytest-cov": "pytest_cov",
+    "pytest-xdist": "xdist",
+    "httpx": "httpx",
+    "litellm": "litellm",
+}
+# Only the tests marked "forecast" fit real Prophet models; prophet pulls in
+# cmdstanpy/Stan, so it's installed only when those tests are selected
+FORECAST_DEPS = {
+    "prophet": "prophet",
+}
+E2E_DEPS = {
+    "playwright": "playwright",
+    "pytest-playwright": "pytest_playwright",
+    "pytest-xdist": "xdist",
+}
+LOAD_DEPS = {
+    "locust": "locust",
+    "hdrhistogram": "hdrh",
+}
+
+# Static HTML skeleton of the report; suite rows are filled in per run
+REPORT_TEMPLATE_PATH = Path(__file__).parent / "report_template.html"
+
+# Seconds to wait for another writer's report lock before writing anyway
+REPORT_LOCK_TIMEOUT = 3.0
+
+# Lines of command output kept (and logged) after each command
+OUTPUT_TAIL_LINES = 20
+
 # Test results
 TEST_RESULTS = {}
 
 
+@cache
+def _report_template() -> Template:
+    """HTML report skeleton (static markup and CSS), read once."""
+    return Template(REPORT_TEMPLATE_PATH.read_text())
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Write text to path via a temp file and os.replace, so readers never see a partial file."""
+    tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}")
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _report_lock(timeout: float = REPORT_LOCK_TIMEOUT):
+    """Serialize report writers with an O_EXCL lock file.
+
+    If the lock can't be taken within the timeout (e.g. a stale lock left by
+    a crashed run), proceed without it; writes are still atomic.
+    """
+    lock_path = REPORTS_DIR / ".report.lock"
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.time() >= deadline:
+                logger.warning(f"Report lock {lock_path} is held; writing without it")
+                yield
+                return
+            time.sleep(0.05)
+
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.unlink(lock_path)
+
+
+@cache
+def _locust_spawn_rate_flag(locust: tuple[str, ...]) -> str:
+    """Return the spawn-rate flag the installed locust accepts.
+
+    Locust 1.0 renamed --hatch-rate to --spawn-rate; the version is read
+    once from `locust --version`.
+    """
+    try:
+        out = subprocess.run(
+            [*locust, "--version"], capture_output=True, text=True, timeout=30
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        out = ""
+    match = re.search(r"(\d+)\.\d+", out)
+    if match and int(match.group(1)) < 1:
+        return "--hatch-rate"
+    return "--spawn-rate"
+
+
 class TestRunner:
     """Test runner with reporting."""
 
@@ -60,6 +177,43 @@ class TestRunner:
                 "duration_seconds": 0,
             },
         }
+        # Pip names already importable or installed during this run
+        self._installed: set[str] = set()
+        # Unit test argv without the marker selection, which varies per call;
+        # xdist spreads tests over workers, keeping each xdist_group (modules
+        # with session-cached fixtures) on a single worker
+        self._unit_pytest_argv_base: tuple[str, ...] = (
+            sys.executable, "-m", "pytest", str(BACKEND_DIR / "tests" / "unit"),
+            "-v", "--tb=short",
+            "-n", "auto", "--dist", "loadgroup",
+            "--junitxml", str(REPORTS_DIR / "unit_tests.xml"),
+            "--cov", str(BACKEND_DIR / "app"),
+            "--cov-report", "term-missing",
+            "--cov-report", "json:" + str(REPORTS_DIR / "coverage.json"),
+        )
+
+    def _record_suite(self, suite: str, results: dict) -> None:
+        """Store a suite's results and append them to results.jsonl right away.
+
+        The JSONL file lets a report be built from a partial run if a later
+        suite hangs or crashes.
+        """
+        self.results["tests"][suite] = results
+        line = json.dumps({"suite": suite, **results}, default=str) + "\n"
+        with _report_lock():
+            with open(REPORTS_DIR / "results.jsonl", "a") as f:
+                f.write(line)
+            # Keep results.json current too, merged with suites from earlier runs
+            merged = {**self.results, "tests": {**self._saved_tests(), **self.results["tests"]}}
+            _write_atomic(REPORTS_DIR / "results.json", json.dumps(merged, indent=2, default=str))
+
+    @staticmethod
+    def _saved_tests() -> dict:
+        """Per-suite results from results.json, or {} if there isn't one."""
+        try:
+            return json.loads((REPORTS_DIR / "results.json").read_text())["tests"]
+        except (OSError, ValueError, KeyError):
+            return {}
 
     def log_section(self, title: str):
         """Log a section header."""
@@ -74,57 +228,168 @@ class TestRunner:
         cwd: Path,
         description: str,
         timeout: int = 300,
+        env: Optional[dict[str, str]] = None,
+        capture: bool = True,
     ) -> tuple[int, str, str]:
-        """Run a command and return exit code, stdout, stderr."""
+        """Run a command and return exit code, output tail, stderr.
+
+        Output is streamed line by line (logged at DEBUG) and only the last
+        OUTPUT_TAIL_LINES lines are kept; stderr is merged into it, so the
+        returned stderr is always empty.
+
+        With capture=False (installers, where only the exit code matters) the
+        output goes straight to a log file in REPORTS_DIR without passing
+        through Python, and the returned output is empty.
+        """
         logger.info(f"Running: {description}")
         logger.info(f"Command: {' '.join(cmd)}")
 
+        if not capture:
+            return self._run_to_log(cmd, cwd, description, timeout, env)
+
         start = time.time()
-        result = subprocess.run(
+        proc = subprocess.Popen(
             cmd,
             cwd=str(cwd),
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=timeout,
+            bufsize=1,
+            env=env,
         )
+        timed_out = threading.Event()
+
+        def kill() -> None:
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        tail: deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+        try:
+            for line in proc.stdout:
+                line = line.rstrip("\n")
+                logger.debug(f"  {line}")
+                tail.append(line)
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
         elapsed = time.time() - start
 
-        logger.info(f"Completed in {elapsed:.2f}s with exit code {result.returncode}")
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout, output="\n".join(tail))
 
-        if result.stdout:
-            for line in result.stdout.strip().split('\n')[-20:]:  # Last 20 lines
-                logger.info(f"  {line}")
+        logger.info(f"Completed in {elapsed:.2f}s with exit code {returncode}")
 
-        return result.returncode, result.stdout, result.stderr
+        for line in tail:
+            logger.info(f"  {line}")
 
-    def run_unit_tests(self, integration: bool = False) -> dict:
-        """Run unit tests."""
-        self.log_section("UNIT TESTS")
+        return returncode, "\n".join(tail), ""
 
-        results = {"passed": 0, "failed": 0, "skipped": 0, "tests": []}
+    def _run_to_log(
+        self,
+        cmd: list[str],
+        cwd: Path,
+        description: str,
+        timeout: int,
+        env: Optional[dict[str, str]],
+    ) -> tuple[int, str, str]:
+        """Run a command with its output written to REPORTS_DIR/<description>.log."""
+        log_path = REPORTS_DIR / (re.sub(r"[^\w.-]+", "_", description.lower()).strip("_") + ".log")
+        start = time.time()
+        with open(log_path, "wb") as log:
+            result = subprocess.run(
+                cmd, cwd=str(cwd), stdout=log, stderr=subprocess.STDOUT, timeout=timeout, env=env,
+            )
+        elapsed = time.time() - start
+
+        logger.info(f"Completed in {elapsed:.2f}s with exit code {result.returncode}")
+        if result.returncode != 0:
+            logger.warning(f"{description} failed; output in {log_path}")
+
+        return result.returncode, "", ""
+
+    def _ensure_deps(self, packages: dict[str, str]) -> None:
+        """Install whichever of the packages are missing, in a single pip call.
+
+        A set verified once is recorded in DEPS_SENTINEL; later runs skip the
+        check until the interpreter changes (sentinel older than it).
+        """
+        if not packages:
+            return
+
+        key = hashlib.sha1(",".join(sorted(packages)).encode()).hexdigest()[:16]
+        if self._deps_verified(key):
+            self._installed.update(packages)
+            return
+
+        missing = []
+        for package, module in packages.items():
+            if package in self._installed:
+                continue
+            if importlib.util.find_spec(module) is not None:
+                self._installed.add(package)
+            else:
+                missing.append(package)
+
+        if not missing:
+            self._mark_deps_verified(key)
+            return
 
-        # Install test dependencies
         cmd = [
             sys.executable, "-m", "pip", "install",
-            "pytest", "pytest-asyncio", "pytest-cov",
-            "httpx", "prophet", "litellm",
+            "--prefer-binary", "--cache-dir", str(PIP_CACHE_DIR),
+            *missing,
         ]
-        self.run_command(cmd, BACKEND_DIR, "Installing test dependencies")
+        exit_code, _, _ = self.run_command(
+            cmd, BACKEND_DIR, f"Installing {', '.join(missing)}", timeout=900, capture=False
+        )
+        if exit_code == 0:
+            self._installed.update(missing)
+            self._mark_deps_verified(key)
+
+    @staticmethod
+    def _deps_verified(key: str) -> bool:
+        try:
+            if DEPS_SENTINEL.stat().st_mtime < Path(sys.executable).resolve().stat().st_mtime:
+                return False
+            return key in DEPS_SENTINEL.read_text().split()
+        except OSError:
+            return False
+
+    @staticmethod
+    def _mark_deps_verified(key: str) -> None:
+        with open(DEPS_SENTINEL, "a") as f:
+            f.write(key + "\n")
+
+    @staticmethod
+    def _reachable(url: str, timeout: float = 1.0) -> bool:
+        """Return True if a GET to url succeeds within timeout."""
+        try:
+            with urllib.request.urlopen(url, timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def run_unit_tests(self, integration: bool = False, forecast: bool = True) -> dict:
+        """Run unit tests (the Prophet-fitting "forecast" tests only if forecast)."""
+        self.log_section("UNIT TESTS")
 
-        # Run pytest
-        pytest_args = [
-            "-m", "not ollama" if not integration else "",
-            "-v", "--tb=short",
-            "--junitxml", str(REPORTS_DIR / "unit_tests.xml"),
-            "--cov", str(BACKEND_DIR / "app"),
-            "--cov-report", "term-missing",
-            "--cov-report", "json:" + str(REPORTS_DIR / "coverage.json"),
-        ]
+        results = {"passed": 0, "failed": 0, "skipped": 0, "tests": []}
+
+        self._ensure_deps(UNIT_DEPS)
+        if forecast:
+            self._ensure_deps(FORECAST_DEPS)
 
-        # Remove empty strings from args
-        pytest_args = [a for a in pytest_args if a]
+        excluded = []
+        if not integration:
+            excluded.append("not ollama")
+        if not forecast:
+            excluded.append("not forecast")
 
-        cmd = [sys.executable, "-m", "pytest", str(BACKEND_DIR / "tests" / "unit")] + pytest_args
+        cmd = [*self._unit_pytest_argv_base]
+        if excluded:
+            cmd += ["-m", " and ".join(excluded)]
         exit_code, stdout, stderr = self.run_command(
             cmd, BACKEND_DIR, "Running unit tests"
         )
@@ -139,7 +404,7 @@ class TestRunner:
                 if "passed" in line or "failed" in line or "error" in line:
                     logger.info(f"  {line}")
 
-        self.results["tests"]["unit"] = results
+        self._record_suite("unit", results)
         return results
 
     def run_integration_tests(self) -> dict:
@@ -148,16 +413,11 @@ class TestRunner:
 
         results = {"passed": 0, "failed": 0, "skipped": 0, "tests": []}
 
-        # Check Ollama availability
-        cmd = ["curl", "-s", "http://localhost:11434/api/tags"]
-        exit_code, stdout, stderr = self.run_command(
-            cmd, PROJECT_ROOT, "Checking Ollama availability"
-        )
-
-        if exit_code != 0:
+        # Check Ollama availability (in-process, no curl subprocess)
+        if not self._reachable(OLLAMA_TAGS_URL):
             logger.warning("Ollama not available, skipping integration tests")
             results["skipped"] = 5
-            self.results["tests"]["integration"] = results
+            self._record_suite("integration", results)
             return results
 
         # Run Ollama tests
@@ -177,7 +437,7 @@ class TestRunner:
         )
 
         results["exit_code"] = exit_code
-        self.results["tests"]["integration"] = results
+        self._record_suite("integration", results)
         return results
 
     def run_e2e_tests(self) -> dict:
@@ -186,20 +446,23 @@ class TestRunner:
 
         results = {"passed": 0, "failed": 0, "skipped": 0, "tests": []}
 
-        # Install Playwright
-        cmd = [
-            sys.executable, "-m", "pip", "install",
-            "playwright", "pytest-playwright",
-        ]
-        self.run_command(cmd, BACKEND_DIR, "Installing Playwright")
+        self._ensure_deps(E2E_DEPS)
 
         # Install browser
         cmd = ["python", "-m", "playwright", "install", "chromium"]
-        self.run_command(cmd, BACKEND_DIR, "Installing Chromium")
+        self.run_command(cmd, BACKEND_DIR, "Installing Chromium", capture=False)
 
-        # Run E2E tests
+        # One Chromium for all xdist workers; each attaches over CDP
+        chromium = self.start_shared_chromium()
+        env = None
+        if chromium is not None:
+            env = {**os.environ, "E2E_CDP_ENDPOINT": chromium[1]}
+
+        # Run E2E tests, one test class per xdist worker (tests within a
+        # class share state, e.g. upload -> categorize -> save)
         pytest_args = [
             "-v", "--tb=short",
+            "-n", "auto", "--dist", "loadscope",
             "--junitxml", str(REPORTS_DIR / "e2e_tests.xml"),
         ]
 
@@ -208,32 +471,82 @@ class TestRunner:
             str(BACKEND_DIR / "tests" / "e2e"),
         ] + pytest_args
 
-        exit_code, stdout, stderr = self.run_command(
-            cmd, BACKEND_DIR, "Running E2E tests", timeout=600
-        )
+        try:
+            exit_code, stdout, stderr = self.run_command(
+                cmd, BACKEND_DIR, "Running E2E tests", timeout=600, env=env
+            )
+        finally:
+            if chromium is not None:
+                chromium[0].terminate()
+                chromium[0].wait(timeout=10)
 
         results["exit_code"] = exit_code
-        self.results["tests"]["e2e"] = results
+        self._record_suite("e2e", results)
         return results
 
+    def start_shared_chromium(self) -> Optional[tuple[subprocess.Popen, str]]:
+        """Start a headless Chromium with remote debugging enabled.
+
+        Returns the process and its CDP WebSocket endpoint, or None if it
+        couldn't be started (tests then launch their own browsers).
+        """
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            executable = p.chromium.executable_path
+
+        try:
+            proc = subprocess.Popen(
+                [
+                    executable,
+                    "--headless=new",
+                    f"--remote-debugging-port={CDP_PORT}",
+                    "--no-first-run",
+                    "about:blank",
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            logger.warning(f"Could not start shared Chromium: {e}")
+            return None
+
+        version_url = f"http://127.0.0.1:{CDP_PORT}/json/version"
+        deadline = time.time() + 15
+        while time.time() < deadline:
+            try:
+                with urllib.request.urlopen(version_url, timeout=1) as resp:
+                    endpoint = json.load(resp)["webSocketDebuggerUrl"]
+                logger.info(f"Shared Chromium listening on {endpoint}")
+                return proc, endpoint
+            except OSError:
+                time.sleep(0.2)
+
+        logger.warning("Shared Chromium did not start; workers will launch their own")
+        proc.terminate()
+        return None
+
     def run_load_tests(self) -> dict:
         """Run load tests."""
         self.log_section("LOAD TESTS")
 
         results = {"passed": 0, "failed": 0, "skipped": 0, "tests": []}
 
-        # Install locust
-        cmd = [sys.executable, "-m", "pip", "install", "locust"]
-        self.run_command(cmd, BACKEND_DIR, "Installing Locust")
+        # A locust already on PATH (e.g. a pipx install) needs no pip call
+        locust_bin = shutil.which("locust")
+        if locust_bin is None:
+            self._ensure_deps(LOAD_DEPS)
+            locust = (sys.executable, "-m", "locust")
+        else:
+            locust = (locust_bin,)
 
         # Run quick load test (30 seconds, 5 users)
         cmd = [
-            sys.executable, "-m", "locust",
+            *locust,
             "-f", str(BACKEND_DIR / "tests" / "load" / "locustfile.py"),
             "--host", "http://localhost:8000",
             "--users", "5",
-            "--hatch-rate", "1",
-            "--runtime", "30",
+            _locust_spawn_rate_flag(locust), "1",
             "--csv", str(REPORTS_DIR / "load_test"),
             "--html", str(REPORTS_DIR / "load_test_report.html"),
             "-t", "30s",
@@ -245,123 +558,77 @@ class TestRunner:
         )
 
         results["exit_code"] = exit_code
-        self.results["tests"]["load"] = results
+        self._record_suite("load", results)
         return results
 
-    def generate_report(self) -> str:
-        """Generate HTML test report."""
+    def generate_report(self) -> Path:
+        """Generate HTML test report.
+
+        Suites from earlier runs (saved in results.json) are merged in, so
+        `--type unit` followed by `--type e2e` gives one combined report.
+        """
         self.log_section("GENERATING REPORT")
 
-        report = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>Personal Finance AI - Test Report</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }}
-        .container {{ max-width: 1000px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-        h1 {{ color: #333; border-bottom: 2px solid #007bff; padding-bottom: 10px; }}
-        h2 {{ color: #555; margin-top: 30px; }}
-        .summary {{ display: flex; gap: 20px; margin: 20px 0; }}
-        .stat {{ background: #007bff; color: white; padding: 15px 25px; border-radius: 5px; text-align: center; }}
-        .stat.fail {{ background: #dc3545; }}
-        .stat.skip {{ background: #6c757d; }}
-        .stat h3 {{ margin: 0; font-size: 24px; }}
-        .stat p {{ margin: 5px 0 0 0; font-size: 12px; text-transform: uppercase; }}
-        table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-        th {{ background: #f8f9fa; }}
-        .pass {{ color: #28a745; }}
-        .fail {{ color: #dc3545; }}
-        .skip {{ color: #6c757d; }}
-        .timestamp {{ color: #6c757d; font-size: 12px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Personal Finance AI - Test Report</h1>
-        <p class="timestamp">Generated: {self.results['timestamp']}</p>
-
-        <div class="summary">
-            <div class="stat">
-                <h3>{self.results['summary']['total']}</h3>
-                <p>Total Tests</p>
-            </div>
-            <div class="stat">
-                <h3>{self.results['summary']['passed']}</h3>
-                <p>Passed</p>
-            </div>
-            <div class="stat fail">
-                <h3>{self.results['summary']['failed']}</h3>
-                <p>Failed</p>
-            </div>
-            <div class="stat skip">
-                <h3>{self.results['summary']['skipped']}</h3>
-                <p>Skipped</p>
-            </div>
-        </div>
-
-        <h2>Test Results by Suite</h2>
-        <table>
-            <tr>
-                <th>Suite</th>
-                <th>Status</th>
-                <th>Details</th>
-            </tr>
-"""
+        tests = {**self._saved_tests(), **self.results["tests"]}
 
-        for suite, data in self.results["tests"].items():
+        rows = []
+        for suite, data in tests.items():
             status = "pass" if data.get("exit_code", 0) == 0 else "fail"
             status_text = "PASS" if status == "pass" else "FAIL"
             details = f"Duration: {data.get('duration', 'N/A')}s" if "duration" in data else ""
 
-            report += f"""
+            rows.append(f"""
             <tr>
                 <td>{suite.upper()}</td>
                 <td class="{status}">{status_text}</td>
                 <td>{details}</td>
             </tr>
-"""
-
-        report += """
-        </table>
-
-        <h2>Configuration</h2>
-        <ul>
-            <li>LLM Provider: Ollama (qwen2.5-coder:3b, granite3.1-moe:3b)</li>
-            <li>Embeddings: nomic-embed-text:v1.5</li>
-            <li>Database: PostgreSQL (localhost)</li>
-            <li>Cache: Redis (localhost)</li>
-        </ul>
-
-        <h2>Notes</h2>
-        <ul>
-            <li>Integration tests require Ollama to be running on localhost:11434</li>
-            <li>E2E tests require the backend to be running on localhost:8000</li>
-            <li>Load tests use Locust for performance testing</li>
-        </ul>
-    </div>
-</body>
-</html>
-"""
+""")
+
+        summary = self.results["summary"]
+        report = _report_template().substitute(
+            timestamp=self.results["timestamp"],
+            total=summary["total"],
+            passed=summary["passed"],
+            failed=summary["failed"],
+            skipped=summary["skipped"],
+            rows="".join(rows),
+        )
 
         report_path = REPORTS_DIR / "test_report.html"
-        report_path.write_text(report)
+        with _report_lock():
+            _write_atomic(report_path, report)
+            _write_atomic(REPORTS_DIR / "results.json", json.dumps({**self.results, "tests": tests}, indent=2, default=str))
         logger.info(f"Report saved to: {report_path}")
 
         return report_path
 
-    def run(self, test_type: str = "all"):
+    def run(self, test_type: str = "all", forecast: bool = True):
         """Run tests based on type."""
         self.start_time = time.time()
 
         # Create reports directory
         REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+        # Fresh per-suite log for this run
+        (REPORTS_DIR / "results.jsonl").unlink(missing_ok=True)
 
         logger.info(f"Starting test run: {test_type}")
         logger.info(f"Reports will be saved to: {REPORTS_DIR}")
 
+        # Install everything the selected suites need up front, in one pip call
+        deps: dict[str, str] = {}
         if test_type in ["unit", "all"]:
-            self.run_unit_tests(integration=(test_type == "all"))
+            deps.update(UNIT_DEPS)
+            if forecast:
+                deps.update(FORECAST_DEPS)
+        if test_type in ["e2e", "all"]:
+            deps.update(E2E_DEPS)
+        if test_type == "load":
+            deps.update(LOAD_DEPS)
+        self._ensure_deps(deps)
+
+        if test_type in ["unit", "all"]:
+            self.run_unit_tests(integration=(test_type == "all"), forecast=forecast)
 
         if test_type in ["integration", "all"]:
             self.run_integration_tests()
@@ -375,8 +642,8 @@ class TestRunner:
         self.end_time = time.time()
         self.results["summary"]["duration_seconds"] = self.end_time - self.start_time
 
-        # Generate report
-        if test_type == "all":
+        # Generate report ("report" just re-renders it from saved results)
+        if test_type in ["all", "report"]:
             self.generate_report()
 
         # Print summary
@@ -401,11 +668,16 @@ def main():
         default=str(REPORTS_DIR),
         help="Output directory for reports",
     )
+    parser.add_argument(
+        "--no-forecast",
+        action="store_true",
+        help="Skip the Prophet-fitting forecast tests (and installing prophet)",
+    )
 
     args = parser.parse_args()
 
     runner = TestRunner()
-    results = runner.run(args.type)
+    results = runner.run(args.type, forecast=not args.no_forecast)
 
     # Exit with appropriate code
     if args.type == "all":
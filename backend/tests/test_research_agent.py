@@ -1,37 +1,43 @@
 """DeepEval tests for Research Agent hallucination detection.
 
 Run with: pytest tests/test_research_agent.py -v
+In parallel: pytest tests/test_research_agent.py -n auto --dist loadgroup
+    (all cases share the "ollama" group, so one worker talks to Ollama)
 Or with Ollama: python tests/test_research_agent.py
 
 Uses local Ollama qwen2.5-coder:3b for zero-cost evaluation.
 """
+import atexit
 import os
+from functools import cache
+
 import pytest
-from deepeval import assert_test
-from deepeval.metrics import HallucinationMetric, ContextualRecallMetric, AnswerRelevancyMetric
-from deepeval.test_case import LLMTestCase
-from deepeval.models import GPTModel
+
+# DeepEval (and the OpenAI SDK under it) is imported inside the tests, so
+# collection stays fast and environments without it skip instead of erroring
 
 # Configure Ollama as OpenAI-compatible endpoint
 os.environ['OPENAI_API_KEY'] = 'ollama-fake-key'
 os.environ['OPENAI_BASE_URL'] = 'http://localhost:11434/v1'
 
-# Create reusable model for Ollama
+# Create reusable model for Ollama (under pytest-xdist each worker is its
+# own process, so this is created once per worker)
 _OLLAMA_MODEL = None
 
 def get_ollama_model():
     """Get or create the Ollama model for DeepEval metrics."""
     global _OLLAMA_MODEL
     if _OLLAMA_MODEL is None:
-        _OLLAMA_MODEL = GPTModel(
-            model='qwen2.5-coder:3b',
-            api_key='ollama-fake-key',
-            base_url='http://localhost:11434/v1'
-        )
+        from ollama_judge import OllamaModel
+
+        _OLLAMA_MODEL = OllamaModel()
+        # The async pool is tied to the event loop that used it and is
+        # released with the process
+        atexit.register(_OLLAMA_MODEL.close)
     return _OLLAMA_MODEL
 
 
-@pytest.mark.parametrize("scenario", [
+FIDELITY_SCENARIOS = [
     {
         "name": "Q3 Revenue Extraction",
         "input": "What is Company X's Q3 revenue?",
@@ -56,8 +62,70 @@ def get_ollama_model():
         "actual_output": "CEO Jane Smith said AI is transforming the business.",
         "expected_output": "CEO Jane Smith said AI is transforming our business."
     }
-])
-def test_research_fidelity(scenario):
+]
+
+
+@cache
+def _fidelity_cases() -> tuple:
+    """One LLMTestCase per FIDELITY_SCENARIOS entry, built (and validated) once."""
+    from deepeval.test_case import LLMTestCase
+
+    return tuple(
+        LLMTestCase(
+            input=s["input"],
+            actual_output=s["actual_output"],
+            context=s["context"],
+            retrieval_context=s["retrieval_context"],
+            expected_output=s["expected_output"],
+            name=s["name"],
+        )
+        for s in FIDELITY_SCENARIOS
+    )
+
+
+def _fidelity_metrics(model):
+    """Faithfulness and recall metrics used by the fidelity tests."""
+    from deepeval.metrics import ContextualRecallMetric, HallucinationMetric
+
+    return [
+        # Faithfulness: 0.99 threshold - no tolerance for financial hallucinations
+        HallucinationMetric(threshold=0.99, model=model, include_reason=True),
+        # Recall: 0.8 threshold - allow missing some details
+        ContextualRecallMetric(threshold=0.8, model=model, include_reason=True),
+    ]
+
+
+@pytest.mark.xdist_group("ollama")
+def test_research_fidelity_batch():
+    """Evaluate all fidelity scenarios in one DeepEval run.
+
+    DeepEval schedules the LLM calls for the whole batch together instead
+    of one scenario at a time; failures are still reported per scenario.
+    """
+    pytest.importorskip("deepeval")
+    from deepeval import evaluate
+
+    result = evaluate(list(_fidelity_cases()), _fidelity_metrics(get_ollama_model()))
+
+    failed = [
+        f"{r.name}: " + ", ".join(
+            f"{m.name}={m.score:.2f}" for m in r.metrics_data if not m.success
+        )
+        for r in result.test_results
+        if not r.success
+    ]
+    assert not failed, "Scenarios failed: " + "; ".join(failed)
+
+
+@pytest.mark.parametrize(
+    "index", range(len(FIDELITY_SCENARIOS)), ids=[s["name"] for s in FIDELITY_SCENARIOS]
+)
+@pytest.mark.skipif(
+    not os.getenv("DEEPEVAL_PER_CASE"),
+    reason="Per-scenario form of test_research_fidelity_batch; set DEEPEVAL_PER_CASE=1 to debug one case",
+)
+@pytest.mark.xdist_group("ollama")
+def test_research_fidelity(index):
     """Test that agent outputs are faithful to source context.
 
     HallucinationMetric: Measures if output claims are supported by context.
@@ -66,31 +134,10 @@ def test_research_fidelity(scenario):
     Portfolio Claim: "Achieved 100% Faithfulness score on financial extraction
     via DeepEval with local Ollama qwen2.5-coder:3b"
     """
-    test_case = LLMTestCase(
-        input=scenario["input"],
-        actual_output=scenario["actual_output"],
-        context=scenario["context"],
-        retrieval_context=scenario["retrieval_context"],
-        expected_output=scenario["expected_output"]
-    )
+    pytest.importorskip("deepeval")
+    from deepeval import assert_test
 
-    model = get_ollama_model()
-
-    # Faithfulness: 0.99 threshold - no tolerance for financial hallucinations
-    faith_metric = HallucinationMetric(
-        threshold=0.99,
-        model=model,
-        include_reason=True
-    )
-
-    # Recall: 0.8 threshold - allow missing some details
-    recall_metric = ContextualRecallMetric(
-        threshold=0.8,
-        model=model,
-        include_reason=True
-    )
-
-    assert_test(test_case, [faith_metric, recall_metric])
+    assert_test(_fidelity_cases()[index], _fidelity_metrics(get_ollama_model()))
 
 
 @pytest.mark.parametrize("scenario", [
@@ -103,8 +150,14 @@ def test_research_fidelity(scenario):
         "expected_output": "Apple Q4 revenue was $89.5B."
     }
 ])
+@pytest.mark.xdist_group("ollama")
 def test_answer_relevancy(scenario):
     """Test that answers are relevant to the asked question."""
+    pytest.importorskip("deepeval")
+    from deepeval import assert_test
+    from deepeval.metrics import AnswerRelevancyMetric
+    from deepeval.test_case import LLMTestCase
+
     test_case = LLMTestCase(
         input=scenario["input"],
         actual_output=scenario["actual_output"],
@@ -133,60 +186,40 @@ if __name__ == "__main__":
     """
     import asyncio
 
+    from deepeval.metrics import AnswerRelevancyMetric, ContextualRecallMetric, HallucinationMetric
+
     print("=" * 60)
     print("DeepEval Hallucination Tests with Ollama qwen2.5-coder:3b")
     print("=" * 60)
 
-    scenarios = [
-        {
-            "name": "Q3 Revenue Extraction",
-            "input": "What is Company X's Q3 revenue?",
-            "context": ["Company X reported Q3 revenue of $5.2B, up 10% YoY."],
-            "retrieval_context": ["Company X reported Q3 revenue of $5.2B, up 10% YoY."],
-            "actual_output": "Company X reported $5.2B in Q3 revenue.",
-            "expected_output": "Company X reported $5.2B revenue."
-        },
-        {
-            "name": "Profit Margin Calculation",
-            "input": "What was the profit margin?",
-            "context": ["Net profit margin increased to 15.4% from 12.1% in the prior year."],
-            "retrieval_context": ["Net profit margin increased to 15.4% from 12.1% in the prior year."],
-            "actual_output": "Profit margin was 15.4%.",
-            "expected_output": "Net profit margin was 15.4%."
-        },
-        {
-            "name": "CEO Statement Citation",
-            "input": "What did the CEO say about AI?",
-            "context": ["CEO Jane Smith said: 'AI is transforming our business' - Press Release, Oct 15, 2025"],
-            "retrieval_context": ["CEO Jane Smith said: 'AI is transforming our business' - Press Release, Oct 15, 2025"],
-            "actual_output": "CEO Jane Smith said AI is transforming the business.",
-            "expected_output": "CEO Jane Smith said AI is transforming our business."
-        }
-    ]
+    scenarios = FIDELITY_SCENARIOS
 
     model = get_ollama_model()
-    all_passed = True
+    # Concurrent metric evaluations in flight (match Ollama's OLLAMA_NUM_PARALLEL)
+    limit = asyncio.Semaphore(int(os.getenv("OLLAMA_NUM_PARALLEL", "4")))
 
-    for scenario in scenarios:
-        print(f"\nTest: {scenario['name']}")
-        print('-' * 40)
+    async def evaluate_scenario(test_case):
+        """Measure all three metrics for one scenario concurrently."""
+        faith = HallucinationMetric(threshold=0.99, model=model, include_reason=True)
+        recall = ContextualRecallMetric(threshold=0.8, model=model, include_reason=True)
+        relevancy = AnswerRelevancyMetric(threshold=0.8, model=model, include_reason=True)
 
-        test_case = LLMTestCase(
-            input=scenario["input"],
-            actual_output=scenario["actual_output"],
-            context=scenario["context"],
-            retrieval_context=scenario["retrieval_context"],
-            expected_output=scenario["expected_output"]
-        )
+        async def measure(metric):
+            async with limit:
+                await metric.a_measure(test_case)
 
-        faith = HallucinationMetric(threshold=0.99, model=model, include_reason=True)
-        asyncio.run(faith.a_measure(test_case))
+        await asyncio.gather(measure(faith), measure(recall), measure(relevancy))
+        return faith, recall, relevancy
 
-        recall = ContextualRecallMetric(threshold=0.8, model=model, include_reason=True)
-        asyncio.run(recall.a_measure(test_case))
+    async def evaluate_all():
+        return await asyncio.gather(*(evaluate_scenario(c) for c in _fidelity_cases()))
 
-        relevancy = AnswerRelevancyMetric(threshold=0.8, model=model, include_reason=True)
-        asyncio.run(relevancy.a_measure(test_case))
+    all_passed = True
+
+    # One event loop for every scenario and metric
+    for scenario, (faith, recall, relevancy) in zip(scenarios, asyncio.run(evaluate_all())):
+        print(f"\nTest: {scenario['name']}")
+        print('-' * 40)
 
         passed = faith.is_successful() and recall.is_successful() and relevancy.is_successful()
         all_passed = all_passed and passed
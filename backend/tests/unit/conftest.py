@@ -0,0 +1,197 @@
+"""Unit test fixtures."""
+import socket
+from collections import OrderedDict
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pandas as pd
+import pytest
+
+from app import forecaster
+from app.alerter import AlertConfig, SpendingAlert
+from app.categorizer import Categorizer
+from app.forecaster import forecast_with_prophet, prepare_prophet_data
+from app.parser import DEFAULT_PARSER
+
+
+# Successful send results. AlertService tags each result with its channel,
+# so the send mocks hand out a fresh copy per call.
+SMS_OK = {"success": True, "message_sid": "SM123"}
+EMAIL_OK = {"success": True, "id": "email-123"}
+
+
+def _reset_send(send: AsyncMock, result: dict) -> AsyncMock:
+    """Clear a shared send mock's calls and make it return a copy of result."""
+    send.reset_mock(return_value=True)
+    send.side_effect = lambda *args, **kwargs: dict(result)
+    return send
+
+
+@pytest.fixture(scope="session")
+def _send_sms():
+    """send_sms mock, built once per session."""
+    return AsyncMock()
+
+
+@pytest.fixture(scope="session")
+def _send_email():
+    """send_email mock, built once per session."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_twilio(_send_sms):
+    """Twilio client stand-in whose send_sms succeeds."""
+    return SimpleNamespace(send_sms=_reset_send(_send_sms, SMS_OK))
+
+
+@pytest.fixture
+def mock_resend(_send_email):
+    """Resend client stand-in whose send_email succeeds."""
+    return SimpleNamespace(send_email=_reset_send(_send_email, EMAIL_OK))
+
+
+@pytest.fixture(scope="session")
+def groceries_alert():
+    """Over-budget Groceries alert (read-only; shared per session)."""
+    return SpendingAlert(
+        user_id="user-123",
+        category="Groceries",
+        current_spending=Decimal("6000"),
+        budget_limit=Decimal("5000"),
+        budget_pct_used=120.0,
+        is_over_budget=True,
+        is_over_threshold=True,
+    )
+
+
+@pytest.fixture(scope="session")
+def config_email_only():
+    """Alert config with only email enabled (read-only; shared per session)."""
+    return AlertConfig(user_id="user-123", email_enabled=True, email="user@example.com")
+
+
+@pytest.fixture(scope="session")
+def config_sms_only():
+    """Alert config with SMS enabled and no email address (read-only; shared per session)."""
+    return AlertConfig(user_id="user-123", sms_enabled=True, phone="+919876543210")
+
+
+@pytest.fixture(scope="session")
+def config_both():
+    """Alert config with SMS and email enabled (read-only; shared per session)."""
+    return AlertConfig(
+        user_id="user-123",
+        sms_enabled=True,
+        email_enabled=True,
+        phone="+919876543210",
+        email="user@example.com",
+    )
+
+
+@pytest.fixture(scope="session")
+def config_sms_disabled():
+    """Alert config with SMS disabled (read-only; shared per session)."""
+    return AlertConfig(user_id="user-123", sms_enabled=False)
+
+
+@pytest.fixture(scope="session")
+def _categorizer():
+    """Default categorizer, constructed once per session."""
+    categorizer = Categorizer()
+    # Materialize the client's lazy chat.completions resources up front
+    categorizer.client.chat.completions
+    return categorizer
+
+
+@pytest.fixture(scope="session")
+def _categorizer_ollama():
+    """Ollama-model categorizer, constructed once per session."""
+    return Categorizer(model="qwen2.5-coder:3b")
+
+
+@pytest.fixture
+def categorizer(_categorizer):
+    """Shared default categorizer with an empty in-memory result cache."""
+    _categorizer._result_cache.clear()
+    return _categorizer
+
+
+@pytest.fixture
+def llm_create(categorizer):
+    """AsyncMock installed as categorizer's chat.completions.create for one test."""
+    completions = categorizer.client.chat.completions
+    completions.create = mock = AsyncMock()
+    yield mock
+    # Drop the instance attribute to expose the SDK method again
+    del completions.create
+
+
+@pytest.fixture
+def categorizer_ollama(_categorizer_ollama):
+    """Shared Ollama-model categorizer with an empty in-memory result cache."""
+    _categorizer_ollama._result_cache.clear()
+    return _categorizer_ollama
+
+
+@pytest.fixture(scope="session")
+def ollama_available() -> bool:
+    """Whether an Ollama server is listening locally, probed once per session."""
+    try:
+        with socket.create_connection(("localhost", 11434), timeout=0.2):
+            return True
+    except OSError:
+        return False
+
+
+@pytest.fixture
+def parser():
+    """The shared module-level CSVParser."""
+    return DEFAULT_PARSER
+
+
+@pytest.fixture(scope="session")
+def parsed_sample_csv(sample_csv_content):
+    """sample_csv_content parsed once per session (read-only)."""
+    return tuple(DEFAULT_PARSER.parse(sample_csv_content))
+
+
+@pytest.fixture(scope="session")
+def groceries_prophet_df(forecast_tx_objects):
+    """Prophet input frame for the Groceries sample data (read-only; shared per session)."""
+    return prepare_prophet_data(forecast_tx_objects, category="Groceries")
+
+
+@pytest.fixture(scope="session")
+def prophet_groceries_forecast(groceries_prophet_df):
+    """30-day Groceries forecast and its input, fitted once per session."""
+    return {
+        "df": groceries_prophet_df,
+        "result": forecast_with_prophet(groceries_prophet_df, periods=30, category="Groceries"),
+    }
+
+
+@pytest.fixture
+def mock_prophet(monkeypatch):
+    """
+    Prophet class stand-in whose models predict a canned 30-day forecast.
+
+    The forecaster's result, model and warm-start caches are swapped for
+    empty ones, so canned fits never reach tests using real Prophet.
+    """
+    model = MagicMock()
+    model.predict.return_value = pd.DataFrame({
+        "ds": pd.date_range("2024-01-01", periods=30),
+        "yhat": [100.0] * 30,
+        "yhat_lower": [80.0] * 30,
+        "yhat_upper": [120.0] * 30,
+        "trend": [100.0] * 30,
+        "weekly": [0.0] * 30,
+    })
+    prophet_cls = MagicMock(return_value=model)
+    monkeypatch.setattr(forecaster, "Prophet", prophet_cls)
+    monkeypatch.setattr(forecaster, "_forecast_cache", OrderedDict())
+    monkeypatch.setattr(forecaster, "_model_cache", OrderedDict())
+    monkeypatch.setattr(forecaster, "_warm_start", OrderedDict())
+    return prophet_cls
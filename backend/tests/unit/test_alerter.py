@@ -1,7 +1,8 @@
 """Unit tests for alert service."""
 import pytest
 from decimal import Decimal
-from unittest.mock import Mock, patch, AsyncMock
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
 
 from app.alerter import (
     AlertService,
@@ -10,9 +11,25 @@ from app.alerter import (
     TwilioClient,
     ResendClient,
     check_spending_alert,
+    check_spending_alert_bulk,
     format_currency,
 )
 
+# Amounts shared across tests, parsed once at import
+D0 = Decimal("0")
+D100 = Decimal("100")
+D3000 = Decimal("3000")
+D5000 = Decimal("5000")
+D5500 = Decimal("5500")
+D5600 = Decimal("5600")
+D6000 = Decimal("6000")
+D7000 = Decimal("7000")
+D9000 = Decimal("9000")
+D10000 = Decimal("10000")
+
+# Keep this module on one xdist worker so its session fixtures are built once
+pytestmark = pytest.mark.xdist_group("alerter_unit")
+
 
 class TestFormatCurrency:
     """Test currency formatting."""
@@ -25,7 +42,7 @@ class TestFormatCurrency:
 
     def test_format_currency_zero(self):
         """Test formatting zero amount."""
-        result = format_currency(Decimal("0"))
+        result = format_currency(D0)
         assert "0" in result
 
     def test_format_currency_large(self):
@@ -33,102 +50,81 @@ class TestFormatCurrency:
         result = format_currency(Decimal("100000"))
         assert "1" in result or "100,000" in result or "100000" in result
 
+    def test_format_currency_exact_paise(self):
+        """Test formatting keeps exact paise and the sign."""
+        assert format_currency(Decimal("1234.56")) == "₹1,234.56"
+        assert format_currency(Decimal("-1234.5")) == "₹-1,234.50"
+
 
 class TestCheckSpendingAlert:
     """Test spending alert checking."""
 
-    def test_no_alert_under_threshold(self):
-        """Test no alert when under threshold."""
-        result = check_spending_alert(
-            spending=Decimal("3000"),
-            budget_limit=Decimal("5000"),
-            budget_pct=110.0,
-            threshold=Decimal("5000"),
-        )
-
-        assert result["should_alert"] is False
-
-    def test_alert_over_budget_pct(self):
-        """Test alert when over budget percentage."""
+    # spending, budget_limit, should_alert, priority, over_budget, over_threshold
+    CASES = [
+        pytest.param(D3000, D5000, False, None, None, None, id="under_threshold"),
+        pytest.param(D6000, D5000, True, "medium", True, True, id="over_budget_pct"),
+        pytest.param(D6000, D10000, True, "low", False, True, id="over_absolute_threshold"),
+        pytest.param(D9000, D5000, True, "critical", True, True, id="priority_critical"),
+        pytest.param(D7000, D5000, True, "high", True, True, id="priority_high"),
+        pytest.param(D5600, D5000, True, "medium", True, True, id="priority_medium"),
+        pytest.param(D5500, D10000, True, "low", False, True, id="priority_low"),
+        # Zero budget must not crash
+        pytest.param(D100, D0, False, None, None, None, id="zero_budget"),
+    ]
+
+    @pytest.mark.parametrize(
+        "spending,budget_limit,should_alert,priority,over_budget,over_threshold", CASES
+    )
+    def test_check_spending_alert(
+        self, spending, budget_limit, should_alert, priority, over_budget, over_threshold
+    ):
+        """Test alert decision and priority across the threshold matrix."""
         result = check_spending_alert(
-            spending=Decimal("6000"),
-            budget_limit=Decimal("5000"),
+            spending=spending,
+            budget_limit=budget_limit,
             budget_pct=110.0,
-            threshold=Decimal("5000"),
+            threshold=D5000,
         )
 
-        assert result["should_alert"] is True
-        assert result["pct_used"] >= 110.0
-        assert result["over_budget"] is True
-
-    def test_alert_over_absolute_threshold(self):
-        """Test alert when over absolute threshold."""
-        result = check_spending_alert(
-            spending=Decimal("6000"),
-            budget_limit=Decimal("10000"),
-            budget_pct=110.0,
-            threshold=Decimal("5000"),
-        )
-
-        assert result["should_alert"] is True
-        assert result["over_threshold"] is True
-
-    def test_priority_critical(self):
-        """Test critical priority for very high spending."""
-        result = check_spending_alert(
-            spending=Decimal("9000"),
-            budget_limit=Decimal("5000"),
-            budget_pct=110.0,
-            threshold=Decimal("5000"),
-        )
+        assert result["should_alert"] is should_alert
+        assert result.get("priority") == priority
+        assert result.get("over_budget") is over_budget
+        assert result.get("over_threshold") is over_threshold
+        if over_budget:
+            assert result["pct_used"] >= 110.0
 
-        assert result["should_alert"] is True
-        assert result["priority"] == "critical"
 
-    def test_priority_high(self):
-        """Test high priority."""
-        result = check_spending_alert(
-            spending=Decimal("7000"),
-            budget_limit=Decimal("5000"),
-            budget_pct=110.0,
-            threshold=Decimal("5000"),
-        )
+class TestCheckSpendingAlertBulk:
+    """Test vectorized spending alert checking."""
 
-        assert result["priority"] == "high"
+    def test_bulk_matches_scalar(self):
+        """Test bulk results agree with the scalar check."""
+        pairs = [
+            (3000, 5000), (6000, 5000), (6000, 10000), (9000, 5000),
+            (7000, 5000), (5600, 5000), (5500, 10000), (100, 0),
+        ]
 
-    def test_priority_medium(self):
-        """Test medium priority for over budget but not extreme."""
-        result = check_spending_alert(
-            spending=Decimal("5600"),
-            budget_limit=Decimal("5000"),
-            budget_pct=110.0,
-            threshold=Decimal("5000"),
+        result = check_spending_alert_bulk(
+            [s for s, _ in pairs], [b for _, b in pairs],
+            budget_pct=110.0, threshold=5000.0,
         )
 
-        assert result["priority"] == "medium"
+        expected = [
+            (i, check_spending_alert(Decimal(s), Decimal(b)))
+            for i, (s, b) in enumerate(pairs)
+        ]
+        expected = [(i, r) for i, r in expected if r["should_alert"]]
 
-    def test_priority_low(self):
-        """Test low priority for high spending but under budget."""
-        result = check_spending_alert(
-            spending=Decimal("5500"),
-            budget_limit=Decimal("10000"),
-            budget_pct=110.0,
-            threshold=Decimal("5000"),
-        )
+        assert result["index"].tolist() == [i for i, _ in expected]
+        assert result["priority"].tolist() == [r["priority"] for _, r in expected]
+        assert result["pct_used"].tolist() == [r["pct_used"] for _, r in expected]
+        assert result["over_budget"].tolist() == [r["over_budget"] for _, r in expected]
 
-        assert result["priority"] == "low"
+    def test_bulk_no_alerts(self):
+        """Test bulk check with nothing to alert on."""
+        result = check_spending_alert_bulk([100, 200], [5000, 5000])
 
-    def test_zero_budget(self):
-        """Test handling zero budget."""
-        result = check_spending_alert(
-            spending=Decimal("100"),
-            budget_limit=Decimal("0"),
-            budget_pct=110.0,
-            threshold=Decimal("5000"),
-        )
-
-        # Should not crash
-        assert "should_alert" in result
+        assert len(result["index"]) == 0
 
 
 class TestSpendingAlert:
@@ -139,8 +135,8 @@ class TestSpendingAlert:
         alert = SpendingAlert(
             user_id="user-123",
             category="Groceries",
-            current_spending=Decimal("6000"),
-            budget_limit=Decimal("5000"),
+            current_spending=D6000,
+            budget_limit=D5000,
             budget_pct_used=120.0,
             is_over_budget=True,
             is_over_threshold=True,
@@ -155,8 +151,8 @@ class TestSpendingAlert:
         alert = SpendingAlert(
             user_id="user-123",
             category="Groceries",
-            current_spending=Decimal("6000"),
-            budget_limit=Decimal("5000"),
+            current_spending=D6000,
+            budget_limit=D5000,
             budget_pct_used=120.0,
             is_over_budget=True,
             is_over_threshold=True,
@@ -174,7 +170,7 @@ class TestAlertConfig:
         config = AlertConfig(user_id="user-123")
 
         assert config.budget_pct == 110.0
-        assert config.alert_threshold == Decimal("5000")
+        assert config.alert_threshold == D5000
         assert config.sms_enabled is False
         assert config.email_enabled is True
 
@@ -183,53 +179,35 @@ class TestAlertConfig:
         config = AlertConfig(
             user_id="user-123",
             budget_pct=120.0,
-            alert_threshold=Decimal("10000"),
+            alert_threshold=D10000,
             sms_enabled=True,
             phone="+919876543210",
         )
 
         assert config.budget_pct == 120.0
-        assert config.alert_threshold == Decimal("10000")
+        assert config.alert_threshold == D10000
         assert config.sms_enabled is True
 
 
 class TestAlertService:
     """Test AlertService."""
 
-    def test_build_sms_message(self):
+    def test_build_sms_message(self, groceries_alert):
         """Test SMS message building."""
         service = AlertService()
-        alert = SpendingAlert(
-            user_id="user-123",
-            category="Groceries",
-            current_spending=Decimal("6000"),
-            budget_limit=Decimal("5000"),
-            budget_pct_used=120.0,
-            is_over_budget=True,
-            is_over_threshold=True,
-        )
 
-        message = service.build_sms_message(alert)
+        message = service.build_sms_message(groceries_alert)
 
         assert "OVER BUDGET" in message or "High Spending" in message
         assert "Groceries" in message
         assert "₹" in message
         assert "120" in message or "120%" in message
 
-    def test_build_email_content(self):
+    def test_build_email_content(self, groceries_alert):
         """Test email content building."""
         service = AlertService()
-        alert = SpendingAlert(
-            user_id="user-123",
-            category="Groceries",
-            current_spending=Decimal("6000"),
-            budget_limit=Decimal("5000"),
-            budget_pct_used=120.0,
-            is_over_budget=True,
-            is_over_threshold=True,
-        )
 
-        subject, html, text = service.build_email_content(alert)
+        subject, html, text = service.build_email_content(groceries_alert)
 
         assert "Groceries" in subject
         assert "120" in subject
@@ -237,146 +215,114 @@ class TestAlertService:
         assert "Groceries" in html
 
     @pytest.mark.asyncio
-    async def test_send_spending_alert_email_only(self):
+    async def test_send_spending_alert_email_only(
+        self, mock_resend, groceries_alert, config_email_only
+    ):
         """Test sending alert via email only."""
-        # Mock Resend client
-        mock_resend = Mock(spec=ResendClient)
-        mock_resend.send_email = AsyncMock(return_value={"success": True, "id": "email-123"})
-
         service = AlertService(resend=mock_resend)
-        alert = SpendingAlert(
-            user_id="user-123",
-            category="Groceries",
-            current_spending=Decimal("6000"),
-            budget_limit=Decimal("5000"),
-            budget_pct_used=120.0,
-            is_over_budget=True,
-            is_over_threshold=True,
-        )
-
-        config = AlertConfig(
-            user_id="user-123",
-            email_enabled=True,
-            email="user@example.com",
-        )
 
-        results = await service.send_spending_alert(config, alert)
+        results = await service.send_spending_alert(config_email_only, groceries_alert)
 
         assert len(results) == 1
         assert results[0]["success"] is True
         assert results[0]["channel"] == "email"
 
     @pytest.mark.asyncio
-    async def test_send_spending_alert_sms_only(self):
+    async def test_send_spending_alert_sms_only(
+        self, mock_twilio, groceries_alert, config_sms_only
+    ):
         """Test sending alert via SMS only."""
-        # Mock Twilio client
-        mock_twilio = Mock(spec=TwilioClient)
-        mock_twilio.send_sms = AsyncMock(return_value={"success": True, "message_sid": "SM123"})
-
         service = AlertService(twilio=mock_twilio)
-        alert = SpendingAlert(
-            user_id="user-123",
-            category="Groceries",
-            current_spending=Decimal("6000"),
-            budget_limit=Decimal("5000"),
-            budget_pct_used=120.0,
-            is_over_budget=True,
-            is_over_threshold=True,
-        )
 
-        config = AlertConfig(
-            user_id="user-123",
-            sms_enabled=True,
-            phone="+919876543210",
-        )
-
-        results = await service.send_spending_alert(config, alert)
+        results = await service.send_spending_alert(config_sms_only, groceries_alert)
 
         assert len(results) == 1
         assert results[0]["success"] is True
         assert results[0]["channel"] == "sms"
 
     @pytest.mark.asyncio
-    async def test_send_spending_alert_both_channels(self):
+    async def test_send_spending_alert_both_channels(
+        self, mock_twilio, mock_resend, groceries_alert, config_both
+    ):
         """Test sending alert via both SMS and email."""
-        mock_twilio = Mock(spec=TwilioClient)
-        mock_twilio.send_sms = AsyncMock(return_value={"success": True})
-
-        mock_resend = Mock(spec=ResendClient)
-        mock_resend.send_email = AsyncMock(return_value={"success": True})
-
         service = AlertService(twilio=mock_twilio, resend=mock_resend)
-        alert = SpendingAlert(
-            user_id="user-123",
-            category="Groceries",
-            current_spending=Decimal("6000"),
-            budget_limit=Decimal("5000"),
-            budget_pct_used=120.0,
-            is_over_budget=True,
-            is_over_threshold=True,
-        )
 
-        config = AlertConfig(
-            user_id="user-123",
-            sms_enabled=True,
-            email_enabled=True,
-            phone="+919876543210",
-            email="user@example.com",
-        )
-
-        results = await service.send_spending_alert(config, alert)
+        results = await service.send_spending_alert(config_both, groceries_alert)
 
         assert len(results) == 2
         assert all(r["success"] for r in results)
 
     @pytest.mark.asyncio
-    async def test_send_spending_alert_disabled_channel(self):
+    async def test_send_spending_alert_disabled_channel(
+        self, mock_twilio, groceries_alert, config_sms_disabled
+    ):
         """Test not sending when channel is disabled."""
-        mock_twilio = Mock(spec=TwilioClient)
-        mock_twilio.send_sms = AsyncMock(return_value={"success": True})
-
         service = AlertService(twilio=mock_twilio)
-        alert = SpendingAlert(
-            user_id="user-123",
-            category="Groceries",
-            current_spending=Decimal("6000"),
-            budget_limit=Decimal("5000"),
-            budget_pct_used=120.0,
-            is_over_budget=True,
-            is_over_threshold=True,
-        )
-
-        # SMS disabled
-        config = AlertConfig(
-            user_id="user-123",
-            sms_enabled=False,
-        )
 
-        results = await service.send_spending_alert(config, alert)
+        results = await service.send_spending_alert(config_sms_disabled, groceries_alert)
 
         assert len(results) == 0
         mock_twilio.send_sms.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_send_spending_alert_channel_raises(
+        self, mock_resend, groceries_alert, config_both
+    ):
+        """Test a channel that raises becomes a failed result without losing the other."""
+        twilio = SimpleNamespace(send_sms=AsyncMock(side_effect=RuntimeError("boom")))
+        service = AlertService(twilio=twilio, resend=mock_resend)
+
+        results = await service.send_spending_alert(config_both, groceries_alert)
+
+        assert results[0] == {"success": False, "error": "boom", "channel": "sms"}
+        assert results[1]["success"] is True
+        assert results[1]["channel"] == "email"
+
 
 class TestTwilioClient:
     """Test Twilio client."""
 
-    def test_twilio_not_configured(self):
+    def test_twilio_not_configured(self, monkeypatch):
         """Test Twilio when not installed."""
-        with patch.dict("sys.modules", {"twilio": None}):
-            # Re-import to get fresh module state
-            import importlib
-            import app.alerter
-            importlib.reload(app.alerter)
+        import app.alerter
 
-            client = app.alerter.TwilioClient(
-                account_sid="test",
-                auth_token="test",
-                from_number="+1234567890",
-            )
+        monkeypatch.setattr(app.alerter, "_TWILIO_AVAILABLE", False)
 
-            # Should not crash but be disabled
-            assert client._enabled is False
+        client = TwilioClient(
+            account_sid="test",
+            auth_token="test",
+            from_number="+1234567890",
+        )
+
+        # Should not crash but be disabled
+        assert client._enabled is False
+
+    @pytest.mark.asyncio
+    async def test_send_sms_runs_sdk_off_loop(self):
+        """Test the blocking Twilio SDK call is run in a worker thread."""
+        import threading
+
+        client = TwilioClient(
+            account_sid="test",
+            auth_token="test",
+            from_number="+1234567890",
+        )
+        loop_thread = threading.get_ident()
+        call_threads = []
+
+        def create(**kwargs):
+            call_threads.append(threading.get_ident())
+            return Mock(sid="SM123", status="queued")
+
+        client._enabled = True
+        client.client = Mock()
+        client.client.messages.create = create
+
+        result = await client.send_sms("+919876543210", "hello")
+
+        assert result["success"] is True
+        assert result["message_sid"] == "SM123"
+        assert call_threads and call_threads[0] != loop_thread
 
 
 class TestResendClient:
@@ -391,3 +337,23 @@ class TestResendClient:
         """Test Resend when configured."""
         client = ResendClient(api_key="re_test_key")
         assert client._enabled is True
+
+    @pytest.mark.asyncio
+    async def test_send_email_runs_sdk_off_loop(self):
+        """Test the blocking Resend SDK call is run in a worker thread."""
+        import threading
+
+        client = ResendClient(api_key="re_test_key")
+        loop_thread = threading.get_ident()
+        call_threads = []
+
+        def send(params):
+            call_threads.append(threading.get_ident())
+            return {"id": "email-123"}
+
+        client._resend = SimpleNamespace(Emails=SimpleNamespace(send=send))
+
+        result = await client.send_email("user@example.com", "Subject", "<p>hi</p>")
+
+        assert result == {"success": True, "id": "email-123"}
+        assert call_threads and call_threads[0] != loop_thread
@@ -4,13 +4,26 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from unittest.mock import Mock, patch, AsyncMock
 
+import numpy as np
+
 from app.models import TransactionCreate
+from app.forecaster_fast import linear_seasonal_forecast
 from app.forecaster import (
     prepare_prophet_data,
     forecast_with_prophet,
     calculate_history_summary,
+    generate_forecasts_multi,
+    sanity_check_forecast,
 )
 
+# Fixed timestamp for test data; nothing here depends on the wall clock
+_NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+# Tests that fit Prophet on the Groceries sample share one xdist worker, so
+# the session forecast fixture and the fitted-model cache are built once
+# while the cheap tests spread over the other workers
+prophet_group = pytest.mark.xdist_group("prophet")
+
 
 class TestPrepareProphetData:
     """Test Prophet data preparation."""
@@ -24,7 +37,7 @@ class TestPrepareProphetData:
         """Test that income transactions are filtered."""
         transactions = [
             TransactionCreate(
-                date=datetime.now(),
+                date=_NOW,
                 description="Salary",
                 amount=Decimal("50000"),
                 is_income=True,
@@ -38,13 +51,13 @@ class TestPrepareProphetData:
         """Test category filtering."""
         transactions = [
             TransactionCreate(
-                date=datetime.now(),
+                date=_NOW,
                 description="Food",
                 amount=Decimal("500"),
                 category="Dining",
             ),
             TransactionCreate(
-                date=datetime.now(),
+                date=_NOW,
                 description="Grocery",
                 amount=Decimal("1000"),
                 category="Groceries",
@@ -57,21 +70,24 @@ class TestPrepareProphetData:
         assert "ds" in df.columns
         assert "y" in df.columns
 
-    def test_prepare_prophet_data_structure(self, sample_forecast_transactions):
-        """Test Prophet data structure."""
-        # Convert to Transaction objects
-        txs = [
-            TransactionCreate(
-                date=t["date"],
-                description=t["description"],
-                amount=Decimal(str(t["amount"])),
-                category=t.get("category"),
-                is_income=t.get("is_income", False),
-            )
-            for t in sample_forecast_transactions
+    def test_prepare_prophet_data_daily_totals(self):
+        """Test same-day amounts are summed and missing days filled with 0."""
+        transactions = [
+            TransactionCreate(date="2024-01-01", description="A", amount=Decimal("100")),
+            TransactionCreate(date="2024-01-01", description="B", amount=Decimal("50.5")),
+            TransactionCreate(date="2024-01-03", description="C", amount=Decimal("20")),
+        ]
+
+        df = prepare_prophet_data(transactions)
+
+        assert df["ds"].dt.strftime("%Y-%m-%d").tolist() == [
+            "2024-01-01", "2024-01-02", "2024-01-03",
         ]
+        assert df["y"].tolist() == [150.5, 0.0, 20.0]
 
-        df = prepare_prophet_data(txs, category="Groceries")
+    def test_prepare_prophet_data_structure(self, forecast_tx_objects):
+        """Test Prophet data structure."""
+        df = prepare_prophet_data(forecast_tx_objects, category="Groceries")
 
         # Check structure
         assert "ds" in df.columns
@@ -83,27 +99,12 @@ class TestPrepareProphetData:
         assert df["y"].dtype is not None
 
 
-class TestForecastWithProphet:
-    """Test Prophet forecasting."""
+class TestForecastSchema:
+    """Test forecast output shape against a mocked Prophet (no Stan fit)."""
 
-    def test_forecast_structure(self, sample_forecast_transactions):
+    def test_forecast_structure(self, groceries_prophet_df, mock_prophet):
         """Test forecast output structure."""
-        # Prepare data
-        txs = [
-            TransactionCreate(
-                date=t["date"],
-                description=t["description"],
-                amount=Decimal(str(t["amount"])),
-                category=t.get("category"),
-                is_income=t.get("is_income", False),
-            )
-            for t in sample_forecast_transactions
-        ]
-
-        df = prepare_prophet_data(txs, category="Groceries")
-
-        # Generate forecast
-        result = forecast_with_prophet(df, periods=30, category="Groceries")
+        result = forecast_with_prophet(groceries_prophet_df, periods=30, category="Groceries")
 
         # Check structure
         assert "category" in result
@@ -113,21 +114,27 @@ class TestForecastWithProphet:
         assert "confidence_upper" in result
         assert "trend" in result
 
-    def test_forecast_has_values(self, sample_forecast_transactions):
-        """Test forecast produces reasonable values."""
-        txs = [
-            TransactionCreate(
-                date=t["date"],
-                description=t["description"],
-                amount=Decimal(str(t["amount"])),
-                category=t.get("category"),
-                is_income=t.get("is_income", False),
-            )
-            for t in sample_forecast_transactions
-        ]
+        # forecast_df is columnar, one entry per forecast day
+        assert len(result["forecast_df"]["ds"]) == 30
+        assert len(result["forecast_df"]["yhat"]) == 30
+
+    def test_forecast_date_format(self, groceries_prophet_df, mock_prophet):
+        """Test forecast date is ISO format."""
+        result = forecast_with_prophet(groceries_prophet_df, periods=30, category="Groceries")
+
+        # Check date is valid ISO format
+        import datetime as dt
+        dt.datetime.fromisoformat(result["forecast_date"])
+
+
+@pytest.mark.forecast
+@prophet_group
+class TestForecastWithProphet:
+    """Test Prophet forecasting."""
 
-        df = prepare_prophet_data(txs, category="Groceries")
-        result = forecast_with_prophet(df, periods=30, category="Groceries")
+    def test_forecast_has_values(self, prophet_groceries_forecast):
+        """Test forecast produces reasonable values."""
+        result = prophet_groceries_forecast["result"]
 
         # Predicted amount should be reasonable (absolute value)
         assert abs(result["predicted_amount"]) < 10000  # Reasonable upper bound
@@ -136,25 +143,184 @@ class TestForecastWithProphet:
         assert result["confidence_lower"] <= result["predicted_amount"]
         assert result["predicted_amount"] <= result["confidence_upper"]
 
-    def test_forecast_date_format(self, sample_forecast_transactions):
-        """Test forecast date is ISO format."""
-        txs = [
-            TransactionCreate(
-                date=t["date"],
-                description=t["description"],
-                amount=Decimal(str(t["amount"])),
-                category=t.get("category"),
-                is_income=t.get("is_income", False),
+    def test_forecast_without_uncertainty(self, groceries_prophet_df):
+        """Test skipping posterior sampling drops the confidence bounds."""
+        df = groceries_prophet_df
+        result = forecast_with_prophet(
+            df, periods=30, category="Groceries", uncertainty_samples=0
+        )
+
+        assert result["confidence_lower"] is None
+        assert result["confidence_upper"] is None
+        # 90 days of history is too short for a yearly component
+        assert result["yearly_seasonality"] == 0.0
+
+    def test_forecast_warm_starts_from_previous_fit(
+        self, groceries_prophet_df
+    ):
+        """Test a user's refit for the same category starts from their last parameters."""
+        from prophet import Prophet
+
+        # Scaled copies of the sample, so neither call is served from the
+        # result or model caches
+        df = groceries_prophet_df.assign(y=groceries_prophet_df["y"] * 1.05)
+        forecast_with_prophet(df, periods=30, category="Groceries", user_id="user-a")
+
+        df2 = df.assign(y=df["y"] * 1.1)
+        with patch.object(Prophet, "fit", autospec=True, side_effect=Prophet.fit) as spy:
+            forecast_with_prophet(df2, periods=30, category="Groceries", user_id="user-a")
+
+        assert "init" in spy.call_args.kwargs
+
+    def test_forecast_never_warm_starts_from_another_user(
+        self, groceries_prophet_df
+    ):
+        """Test one user's fitted parameters never seed another user's (or an anonymous) fit."""
+        from prophet import Prophet
+
+        df = groceries_prophet_df.assign(y=groceries_prophet_df["y"] * 0.95)
+        forecast_with_prophet(df, periods=30, category="Groceries", user_id="user-a")
+
+        with patch.object(Prophet, "fit", autospec=True, side_effect=Prophet.fit) as spy:
+            forecast_with_prophet(
+                df.assign(y=df["y"] * 1.2), periods=30, category="Groceries", user_id="user-b"
             )
-            for t in sample_forecast_transactions
-        ]
+            forecast_with_prophet(df.assign(y=df["y"] * 1.3), periods=30, category="Groceries")
 
-        df = prepare_prophet_data(txs, category="Groceries")
-        result = forecast_with_prophet(df, periods=30, category="Groceries")
+        assert spy.call_count == 2
+        assert all("init" not in call.kwargs for call in spy.call_args_list)
 
-        # Check date is valid ISO format
-        import datetime as dt
-        dt.datetime.fromisoformat(result["forecast_date"])
+    def test_forecast_cached_for_same_input(self, groceries_prophet_df):
+        """Test repeated forecasts on the same data skip the Prophet fit."""
+        df = groceries_prophet_df
+        first = forecast_with_prophet(df, periods=30, category="Groceries")
+
+        with patch("app.forecaster.Prophet") as mock_prophet:
+            second = forecast_with_prophet(df, periods=30, category="Groceries")
+
+        mock_prophet.assert_not_called()
+        assert second == first
+        assert second is not first
+
+    def test_fitted_model_reused_across_horizons(self, groceries_prophet_df):
+        """Test a new horizon on the same data predicts without refitting."""
+        from prophet import Prophet
+
+        df = groceries_prophet_df
+        forecast_with_prophet(df, periods=30, category="Groceries")
+
+        with patch.object(Prophet, "fit", autospec=True) as spy:
+            result = forecast_with_prophet(df, periods=60, category="Groceries")
+
+        spy.assert_not_called()
+        assert len(result["forecast_df"]["ds"]) == 60
+
+
+class TestForecastFast:
+    """Test the closed-form forecaster behind FORECAST_FAST."""
+
+    def test_fast_forecast_matches_prophet_shape(self, groceries_prophet_df, monkeypatch):
+        """Test the fast path returns the Prophet result keys without fitting."""
+        monkeypatch.setattr("app.forecaster.FORECAST_FAST", True)
+
+        with patch("app.forecaster.Prophet") as mock_prophet:
+            result = forecast_with_prophet(
+                groceries_prophet_df, periods=30, category="Groceries"
+            )
+
+        mock_prophet.assert_not_called()
+        assert len(result["forecast_df"]["ds"]) == 30
+        assert result["confidence_lower"] <= result["predicted_amount"]
+        assert result["predicted_amount"] <= result["confidence_upper"]
+        assert abs(result["predicted_amount"]) < 10000
+        assert result["yearly_seasonality"] == 0.0
+
+    def test_linear_seasonal_forecast_recovers_trend_and_week(self):
+        """Test an exact linear + weekly series is extrapolated exactly."""
+        days = np.arange(19_000, 19_070)
+        weekly = np.array([10.0, -5.0, 0.0, 5.0, -10.0, 3.0, -3.0])
+        y = 100.0 + 2.0 * (days - days[0]) + weekly[(days + 3) % 7]
+
+        out = linear_seasonal_forecast(days, y, periods=7)
+
+        future = days[-1] + np.arange(1, 8)
+        expected = 100.0 + 2.0 * (future - days[0]) + weekly[(future + 3) % 7]
+        np.testing.assert_allclose(out["yhat"], expected, atol=0.5)
+        np.testing.assert_array_equal(out["days"], future)
+
+
+class TestSanityCheckForecast:
+    """Test the LLM sanity check."""
+
+    async def test_sanity_check_requests_json_with_decimal_summary(self):
+        """Test Decimal summaries serialize and JSON mode is requested."""
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = (
+            '{"is_plausible": false, "reason": "too high", "suggested_adjustment": null}'
+        )
+
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(return_value=response)
+
+        forecast = {
+            "category": "Dining",
+            "predicted_amount": 900.0,
+            "forecast_date": "2024-02-01T00:00:00",
+        }
+
+        with patch("app.forecaster.AsyncOpenAI", return_value=mock_client):
+            result = await sanity_check_forecast(
+                forecast, {"count": 3, "total": Decimal("1500.50")}
+            )
+
+        kwargs = mock_client.chat.completions.create.call_args.kwargs
+        assert kwargs["response_format"] == {"type": "json_object"}
+        assert "1500.50" in kwargs["messages"][0]["content"]
+        assert result["llm_sanity_check"] == {
+            "is_plausible": False,
+            "reason": "too high",
+        }
+
+
+    async def test_sanity_check_skips_llm_within_band(self):
+        """Test forecasts near the historical mean skip the LLM call."""
+        forecast = {
+            "category": "Dining",
+            "predicted_amount": 520.0,
+            "forecast_date": "2024-02-01T00:00:00",
+        }
+        summary = {"count": 30, "avg_daily": 500.0, "std_daily": 50.0}
+
+        with patch("app.forecaster.AsyncOpenAI") as mock_openai:
+            result = await sanity_check_forecast(forecast, summary)
+
+        mock_openai.assert_not_called()
+        assert result["llm_sanity_check"]["is_plausible"] is True
+
+
+@prophet_group
+class TestGenerateForecastsMulti:
+    """Test concurrent multi-category forecasting."""
+
+    async def test_forecasts_each_category(self, sample_forecast_transactions):
+        """Test one forecast per category, skipping categories without data."""
+        async def passthrough(forecast, history_summary):
+            forecast["llm_sanity_check"] = {"is_plausible": True, "reason": "ok"}
+            return forecast
+
+        with patch(
+            "app.forecaster.sanity_check_forecast", side_effect=passthrough
+        ) as mock_check:
+            results = await generate_forecasts_multi(
+                sample_forecast_transactions,
+                categories=["Groceries", "Nonexistent"],
+            )
+
+        assert [r["category"] for r in results] == ["Groceries"]
+        assert results[0]["category_filter"] == "Groceries"
+        assert "generated_at" in results[0]
+        assert mock_check.call_count == 1
 
 
 class TestHistorySummary:
@@ -171,7 +337,7 @@ class TestHistorySummary:
         """Test with single transaction."""
         transactions = [
             TransactionCreate(
-                date=datetime.now(),
+                date=_NOW,
                 description="Test",
                 amount=Decimal("500"),
                 category="Dining",
@@ -185,15 +351,16 @@ class TestHistorySummary:
 
     def test_history_summary_multiple(self):
         """Test with multiple transactions."""
-        base_date = datetime.now() - timedelta(days=30)
+        # 30 consecutive days from _NOW - 30 days, amounts 500, 510, ..., 790
+        dates = (
+            np.datetime64(_NOW - timedelta(days=30)) + np.arange(30).astype("timedelta64[D]")
+        ).astype("datetime64[us]").tolist()
+        amounts = [Decimal(v) for v in range(500, 800, 10)]
         transactions = [
             TransactionCreate(
-                date=base_date + timedelta(days=i),
-                description=f"Test {i}",
-                amount=Decimal(str(500 + i * 10)),
-                category="Groceries",
+                date=d, description=f"Test {i}", amount=a, category="Groceries"
             )
-            for i in range(30)
+            for i, (d, a) in enumerate(zip(dates, amounts))
         ]
 
         result = calculate_history_summary(transactions)
@@ -203,10 +370,11 @@ class TestHistorySummary:
         assert result["avg_daily"] > 0
         assert result["avg_monthly"] > 0
         assert result["max_single"] >= result["min_single"]
+        assert result["std_daily"] > 0
 
     def test_history_summary_with_category_filter(self):
         """Test category filtering in summary."""
-        base_date = datetime.now()
+        base_date = _NOW
         transactions = [
             TransactionCreate(
                 date=base_date,
@@ -246,7 +414,7 @@ class TestForecasterEdgeCases:
         """Test with insufficient data for forecasting."""
         transactions = [
             TransactionCreate(
-                date=datetime.now(),
+                date=_NOW,
                 description="Test",
                 amount=Decimal("100"),
                 is_income=True,  # Income is filtered out
@@ -260,7 +428,7 @@ class TestForecasterEdgeCases:
         """Test when all transactions are filtered by category."""
         transactions = [
             TransactionCreate(
-                date=datetime.now(),
+                date=_NOW,
                 description="Test",
                 amount=Decimal("100"),
                 category="Income",  # Will be filtered out
@@ -271,21 +439,11 @@ class TestForecasterEdgeCases:
         with pytest.raises(ValueError, match="No transactions found"):
             prepare_prophet_data(transactions, category="Groceries")
 
-    def test_forecast_trend_direction(self, sample_forecast_transactions):
+    @pytest.mark.forecast
+    @prophet_group
+    def test_forecast_trend_direction(self, prophet_groceries_forecast):
         """Test that trend is calculated."""
-        txs = [
-            TransactionCreate(
-                date=t["date"],
-                description=t["description"],
-                amount=Decimal(str(t["amount"])),
-                category=t.get("category"),
-                is_income=t.get("is_income", False),
-            )
-            for t in sample_forecast_transactions
-        ]
-
-        df = prepare_prophet_data(txs, category="Groceries")
-        result = forecast_with_prophet(df, periods=30, category="Groceries")
+        result = prophet_groceries_forecast["result"]
 
         assert "trend" in result
         # Trend should be a reasonable number
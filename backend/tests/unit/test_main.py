@@ -0,0 +1,61 @@
+"""Unit tests for API endpoints."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.main import get_budgets, get_transactions
+
+
+def _async_supabase(rows: list[dict]) -> tuple[MagicMock, AsyncMock]:
+    """
+    Supabase client stand-in whose query builders chain and whose execute()
+    is a coroutine, as with the real AsyncClient.
+
+    Returns the client and its execute mock.
+    """
+    query = MagicMock()
+    for method in ("select", "eq", "gte", "lte", "order", "limit"):
+        getattr(query, method).return_value = query
+    query.execute = AsyncMock(return_value=SimpleNamespace(data=rows))
+    supabase = MagicMock()
+    supabase.table.return_value = query
+    return supabase, query.execute
+
+
+class TestBudgetsEndpoint:
+    """Test GET /api/budgets."""
+
+    @pytest.mark.asyncio
+    async def test_get_budgets_awaits_query(self):
+        """Test the query is awaited and its rows returned."""
+        rows = [{"category": "Groceries", "monthly_limit": "5000.00", "month": "03"}]
+        supabase, execute = _async_supabase(rows)
+
+        result = await get_budgets(user_id=uuid4(), month=3, supabase=supabase)
+
+        assert result == rows
+        execute.assert_awaited_once()
+
+
+class TestTransactionsEndpoint:
+    """Test GET /api/transactions."""
+
+    @pytest.mark.asyncio
+    async def test_get_transactions_awaits_query(self):
+        """Test the query is awaited and its rows returned."""
+        rows = [{"description": "Swiggy order", "amount": "450.00"}]
+        supabase, execute = _async_supabase(rows)
+
+        result = await get_transactions(
+            user_id=uuid4(),
+            start_date=None,
+            end_date=None,
+            category="Dining",
+            limit=10,
+            supabase=supabase,
+        )
+
+        assert result == rows
+        execute.assert_awaited_once()
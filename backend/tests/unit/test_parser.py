@@ -1,16 +1,17 @@
 """Unit tests for CSV parser."""
+import io
 import pytest
 from datetime import datetime
+from decimal import Decimal
 
-from app.parser import CSVParser, parse_csv
+from app.parser import parse_csv
 
 
 class TestCSVParser:
     """Test cases for CSVParser class."""
 
-    def test_detect_columns_standard(self):
+    def test_detect_columns_standard(self, parser):
         """Test column detection with standard column names."""
-        parser = CSVParser()
         import pandas as pd
 
         df = pd.DataFrame({
@@ -25,9 +26,8 @@ class TestCSVParser:
         assert column_map["description"] == "description"
         assert column_map["amount"] == "amount"
 
-    def test_detect_columns_alternate(self):
+    def test_detect_columns_alternate(self, parser):
         """Test column detection with alternate column names."""
-        parser = CSVParser()
         import pandas as pd
 
         df = pd.DataFrame({
@@ -41,91 +41,144 @@ class TestCSVParser:
         assert "date" in column_map
         assert "amount" in column_map
 
-    def test_parse_amount_decimal(self):
+    def test_detect_columns_claims_each_column_once(self, parser):
+        """Test a column matching several patterns maps to one field only."""
+        import pandas as pd
+
+        df = pd.DataFrame({
+            "Value Date": ["2024-01-15"],
+            "Details": ["Test"],
+            "Amount": [100.0],
+        })
+
+        column_map = parser.detect_columns(df)
+
+        assert column_map["date"] == "Value Date"
+        assert column_map["amount"] == "Amount"
+
+    def test_parse_amount_decimal(self, parser):
         """Test amount parsing with decimal values."""
         from decimal import Decimal
-        parser = CSVParser()
-
         result = parser.parse_amount(1234.56)
         assert result == Decimal("1234.56")
 
-    def test_parse_amount_with_currency_symbol(self):
+    def test_parse_amount_with_currency_symbol(self, parser):
         """Test amount parsing with currency symbols."""
         from decimal import Decimal
-        parser = CSVParser()
-
         result = parser.parse_amount("₹1,234.56")
         assert result == Decimal("1234.56")
 
-    def test_parse_amount_accounting_format(self):
+    def test_parse_amount_accounting_format(self, parser):
         """Test amount parsing with accounting format (parentheses)."""
-        parser = CSVParser()
-
         result = parser.parse_amount("(500.00)")
         assert result == 500.0
 
-    def test_parse_amount_integer(self):
+    def test_parse_amount_integer(self, parser):
         """Test amount parsing with integer."""
-        parser = CSVParser()
-
         result = parser.parse_amount("100")
         assert result == 100.0
 
-    def test_parse_date_standard_format(self):
-        """Test date parsing with standard format."""
-        parser = CSVParser()
+    def test_parse_amount_exact(self, parser):
+        """Test string amounts are parsed without a float round-trip."""
+        assert str(parser.parse_amount("12345678901234567.89")) == "12345678901234567.89"
+        assert str(parser.parse_amount("100.500")) == "100.50"
+        assert str(parser.parse_amount("1e3")) == "1000"
+
+    def test_parse_amount_numpy_scalars(self, parser):
+        """Test NumPy scalars from DataFrame cells parse like Python numbers."""
+        import numpy as np
+
+        assert parser.parse_amount(np.float64(-2.5)) == Decimal("2.5")
+        assert parser.parse_amount(np.float32(1.1)) == Decimal("1.1")
+        assert parser.parse_amount(np.int64(-7)) == Decimal("7")
 
+    def test_parse_date_standard_format(self, parser):
+        """Test date parsing with standard format."""
         result = parser.parse_date("2024-01-15")
         assert result.year == 2024
         assert result.month == 1
         assert result.day == 15
 
-    def test_parse_date_indian_format(self):
+    def test_parse_date_indian_format(self, parser):
         """Test date parsing with Indian format."""
-        parser = CSVParser()
-
         result = parser.parse_date("15-01-2024")
         assert result.day == 15
         assert result.month == 1
         assert result.year == 2024
 
-    def test_parse_date_slash_format(self):
+    def test_parse_date_slash_format(self, parser):
         """Test date parsing with slash format."""
-        parser = CSVParser()
-
         result = parser.parse_date("01/15/2024")
         assert result.month == 1
         assert result.day == 15
 
-    def test_clean_description(self):
+    def test_clean_description(self, parser):
         """Test description cleaning."""
-        parser = CSVParser()
-
         result = parser.clean_description("  Uber   trip  ")
         assert result == "Uber trip"
 
-    def test_clean_description_truncates_long(self):
+    def test_clean_description_truncates_long(self, parser):
         """Test description truncation."""
-        parser = CSVParser()
-
         long_desc = "A" * 600
         result = parser.clean_description(long_desc)
         assert len(result) == 500
 
-    def test_parse_valid_csv(self, sample_csv_content):
+    def test_parse_valid_csv(self, parsed_sample_csv):
         """Test parsing valid CSV content."""
-        parser = CSVParser()
-
-        transactions = parser.parse(sample_csv_content)
+        transactions = parsed_sample_csv
 
         assert len(transactions) == 5
         assert transactions[0].description == "Swiggy order"
         assert float(transactions[0].amount) == 450.0
 
-    def test_parse_csv_with_mapping(self, sample_csv_alternate):
-        """Test parsing CSV with explicit column mapping."""
-        parser = CSVParser()
+    def test_parse_binary_stream(self, parser, sample_csv_content, parsed_sample_csv):
+        """Test parsing a decoded binary upload stream."""
+        stream = io.TextIOWrapper(
+            io.BytesIO(sample_csv_content.encode("utf-8")),
+            encoding="utf-8",
+            newline="",
+        )
+
+        transactions = parser.parse(stream)
+
+        assert transactions == list(parsed_sample_csv)
 
+    def test_parse_columnar(self, parser, sample_csv_content, parsed_sample_csv):
+        """Test columnar parsing matches the row-based parse."""
+        import pandas as pd
+
+        df = parser.parse_columnar(sample_csv_content)
+        transactions = parsed_sample_csv
+
+        assert len(df) == len(transactions)
+        assert pd.api.types.is_datetime64_dtype(df["date"])
+        assert df["amount"].tolist() == [t.amount for t in transactions]
+        assert df["description"].tolist() == [t.description for t in transactions]
+        assert not df["is_income"].any()
+
+    def test_iter_batches(self, parser):
+        """Test rows are yielded in batches with global row numbers."""
+        csv_content = (
+            "date,description,amount\n"
+            "2024-01-15,One,10\n"
+            "2024-01-16,Two,20\n"
+            "bad,Three,30\n"
+            "2024-01-18,Four,40\n"
+            "2024-01-19,Five,50\n"
+        )
+        errors: list[str] = []
+
+        batches = list(
+            parser.iter_batches(io.StringIO(csv_content), errors, chunksize=2)
+        )
+
+        assert [[t.description for t in b] for b in batches] == [
+            ["One", "Two"], ["Four"], ["Five"]
+        ]
+        assert errors == ["Row 3: Cannot parse date: bad"]
+
+    def test_parse_csv_with_mapping(self, parser, sample_csv_alternate):
+        """Test parsing CSV with explicit column mapping."""
         mapping = {
             "date": "Txn Date",
             "description": "Payee",
@@ -137,9 +190,8 @@ class TestCSVParser:
         assert len(transactions) == 3
         assert transactions[0].description == "Swiggy"
 
-    def test_parse_csv_missing_required_columns(self):
+    def test_parse_csv_missing_required_columns(self, parser):
         """Test parsing CSV with missing required columns."""
-        parser = CSVParser()
         import pandas as pd
 
         df = pd.DataFrame({
@@ -153,14 +205,12 @@ class TestCSVParser:
         with pytest.raises(ValueError, match="Could not detect required columns"):
             parser.parse(csv_content)
 
-    def test_parse_empty_csv(self):
+    def test_parse_empty_csv(self, parser):
         """Test parsing empty CSV."""
-        parser = CSVParser()
-
         with pytest.raises(ValueError, match="No valid transactions found"):
             parser.parse("date,description,amount")
 
-    def test_parse_function(self, sample_csv_content):
+    def test_parse_function(self, sample_csv_content, parsed_sample_csv):
         """Test parse_csv convenience function."""
         transactions = parse_csv(sample_csv_content)
 
@@ -169,44 +219,35 @@ class TestCSVParser:
         assert "date" in transactions[0]
         assert "description" in transactions[0]
         assert "amount" in transactions[0]
+        assert transactions == [t.model_dump() for t in parsed_sample_csv]
 
 
 class TestCSVParserEdgeCases:
     """Edge case tests for CSVParser."""
 
-    def test_parse_negative_amounts(self):
+    def test_parse_negative_amounts(self, parser):
         """Test parsing negative amounts."""
-        parser = CSVParser()
-
         result = parser.parse_amount("-500.00")
         assert result == 500.0  # Should take absolute value
 
-    def test_parse_whitespace_only(self):
+    def test_parse_whitespace_only(self, parser):
         """Test parsing whitespace-only values."""
-        parser = CSVParser()
-
         with pytest.raises(ValueError):
             parser.parse_amount("   ")
 
-    def test_parse_empty_string(self):
+    def test_parse_empty_string(self, parser):
         """Test parsing empty string."""
-        parser = CSVParser()
-
         with pytest.raises(ValueError):
             parser.parse_amount("")
 
-    def test_parse_invalid_number(self):
+    def test_parse_invalid_number(self, parser):
         """Test parsing invalid number."""
-        parser = CSVParser()
-
         with pytest.raises(ValueError):
             parser.parse_amount("not-a-number")
 
-    def test_parse_pandas_timestamp(self):
+    def test_parse_pandas_timestamp(self, parser):
         """Test parsing pandas timestamp."""
         import pandas as pd
-        parser = CSVParser()
-
         ts = pd.Timestamp("2024-01-15")
         result = parser.parse_date(ts)
 
@@ -214,13 +255,97 @@ class TestCSVParserEdgeCases:
         assert result.month == 1
         assert result.day == 15
 
-    def test_parse_python_datetime(self):
+    def test_parse_python_datetime(self, parser):
         """Test parsing Python datetime."""
-        parser = CSVParser()
-
         dt = datetime(2024, 1, 15, 10, 30, 0)
         result = parser.parse_date(dt)
 
         assert result.year == 2024
         assert result.month == 1
         assert result.day == 15
+
+    def test_parse_skips_rows_violating_model_constraints(self, parser):
+        """Test rows that TransactionCreate would reject are skipped."""
+        csv_content = (
+            "date,description,amount\n"
+            "2024-01-15,Valid,100.50\n"
+            "2024-01-16,Too precise,12.345\n"
+            "2024-01-17,   ,50\n"
+        )
+
+        transactions = parser.parse(csv_content)
+
+        assert [t.description for t in transactions] == ["Valid"]
+        assert transactions[0].category is None
+
+    def test_parse_mixed_formats_in_one_column(self, parser):
+        """Test each row's date and amount format is detected independently."""
+        csv_content = (
+            "date,description,amount\n"
+            "2024-01-15,ISO,100\n"
+            "16-01-2024,Day first,(250.50)\n"
+            "\"Jan 17, 2024\",Month name,\"₹1,234.50\"\n"
+            "not a date,Bad date,10\n"
+        )
+
+        transactions = parser.parse(csv_content)
+
+        assert [t.date.day for t in transactions] == [15, 16, 17]
+        assert [t.amount for t in transactions] == [
+            Decimal("100"), Decimal("250.50"), Decimal("1234.50")
+        ]
+
+    def test_parse_repeated_dates(self, parser):
+        """Test rows sharing a date string each get that date."""
+        csv_content = "date,description,amount\n" + "".join(
+            f"{d},Row {i},{i + 1}\n"
+            for i, d in enumerate(["16-01-2024", "2024-01-15", "16-01-2024", "bad", "2024-01-15"])
+        )
+
+        transactions = parser.parse(csv_content)
+
+        assert [(t.date.month, t.date.day) for t in transactions] == [
+            (1, 16), (1, 15), (1, 16), (1, 15)
+        ]
+        assert [t.description for t in transactions] == ["Row 0", "Row 1", "Row 2", "Row 4"]
+
+    def test_parse_rejects_rows_with_extra_fields(self, parser):
+        """Test an unquoted thousands separator is a row error, not a truncated amount."""
+        csv_content = (
+            "date,description,amount\n"
+            "2024-01-15,Dinner,₹ 1,000\n"
+            "2024-01-16,Lunch,\"₹ 1,000\"\n"
+            "2024-01-17,Snack,50\n"
+        )
+        errors: list[str] = []
+
+        transactions = list(parser.iter_parse(io.StringIO(csv_content), errors))
+
+        assert [(t.description, t.amount) for t in transactions] == [
+            ("Lunch", Decimal("1000")), ("Snack", Decimal("50"))
+        ]
+        assert errors == ["Row 1: Expected 3 fields, saw 4"]
+
+    def test_parse_blank_date_is_row_error(self, parser):
+        """Test a blank date cell is an error, not another row's date."""
+        csv_content = (
+            "date,description,amount\n"
+            "2024-01-15,Coffee,100\n"
+            ",Lunch,200\n"
+            "2024-02-01,Taxi,300\n"
+        )
+        errors: list[str] = []
+
+        transactions = list(parser.iter_parse(io.StringIO(csv_content), errors))
+
+        assert [(t.description, t.date.month, t.date.day) for t in transactions] == [
+            ("Coffee", 1, 15), ("Taxi", 2, 1)
+        ]
+        assert len(errors) == 1 and errors[0].startswith("Row 2:")
+
+    def test_parse_all_dates_blank(self, parser):
+        """Test a file with no dates at all reports no valid transactions."""
+        csv_content = "date,description,amount\n,Coffee,100\n,Lunch,200\n"
+
+        with pytest.raises(ValueError, match="No valid transactions found"):
+            parser.parse(csv_content)
@@ -0,0 +1,48 @@
+"""Unit tests for research agent sources."""
+import hashlib
+
+import pytest
+
+from app.research_agent import HASH_PARALLEL_MIN_BYTES, Source
+
+
+class TestSourceHashBatch:
+    """Test batch hashing of raw document bytes."""
+
+    @pytest.mark.parametrize(
+        "contents",
+        [
+            [b"short page", b"another page", b""],
+            # Over the threshold in total, so hashed on the thread pool
+            [b"a" * (HASH_PARALLEL_MIN_BYTES // 2 + 1), b"b" * (HASH_PARALLEL_MIN_BYTES // 2)],
+        ],
+        ids=["inline", "thread_pool"],
+    )
+    def test_hash_batch_matches_per_item(self, contents):
+        """Test each digest equals hashing that item on its own."""
+        assert Source.hash_batch(contents) == [
+            hashlib.blake2b(c, digest_size=4).hexdigest() for c in contents
+        ]
+
+
+class TestSourceFromMany:
+    """Test building sources in bulk."""
+
+    def test_from_many_matches_individual_sources(self):
+        """Test bulk-built sources equal ones built one by one."""
+        pairs = [
+            ("https://example.com/a", "Revenue grew 12% in Q3."),
+            ("https://example.com/b", "Costs were flat ₹ year on year."),
+        ]
+
+        sources = Source.from_many(pairs)
+
+        scraped_at = sources[0].scraped_at
+        assert all(s.scraped_at == scraped_at for s in sources)
+        assert sources == [
+            Source(url, content, scraped_at=scraped_at) for url, content in pairs
+        ]
+        assert [s.content_hash for s in sources] == [
+            hashlib.blake2b(content.encode("utf-8"), digest_size=4).hexdigest()
+            for _, content in pairs
+        ]
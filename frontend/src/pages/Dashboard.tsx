@@ -182,13 +182,14 @@ export default function Dashboard() {
             {forecast?.forecast_df ? (
               <ResponsiveContainer width="100%" height={300}>
                 <LineChart
-                  data={forecast.forecast_df.slice(-14).map((d: any) => ({
-                    date: d.ds.split("T")[0],
-                    actual: d.y,
-                    forecast: d.yhat,
-                    lower: d.yhat_lower,
-                    upper: d.yhat_upper,
-                  }))}
+                  data={forecast.forecast_df.ds
+                    .map((ds: string, i: number) => ({
+                      date: ds,
+                      forecast: forecast.forecast_df.yhat[i],
+                      lower: forecast.forecast_df.yhat_lower?.[i],
+                      upper: forecast.forecast_df.yhat_upper?.[i],
+                    }))
+                    .slice(-14)}
                 >
                   <CartesianGrid strokeDasharray="3 3" />
                   <XAxis
@@ -154,6 +154,35 @@ RETURNS VECTOR(1536) AS $$
     FROM openai_embeddings('text-embedding-3-small', text_input);
 $$ LANGUAGE sql SECURITY DEFINER;
 
+-- Dashboard totals aggregated in the database (one row instead of every transaction)
+CREATE OR REPLACE FUNCTION public.dashboard_summary(user_id UUID)
+RETURNS TABLE (
+    tx_count BIGINT,
+    total_income NUMERIC,
+    total_expense NUMERIC,
+    category_totals JSONB
+) AS $$
+    WITH per_category AS (
+        SELECT
+            COALESCE(t.category, 'Other') AS category,
+            COUNT(*) AS n,
+            SUM(t.amount) FILTER (WHERE COALESCE(t.is_income, FALSE)) AS income,
+            SUM(t.amount) FILTER (WHERE NOT COALESCE(t.is_income, FALSE)) AS expense
+        FROM public.transactions t
+        WHERE t.user_id = dashboard_summary.user_id
+        GROUP BY 1
+    )
+    SELECT
+        COALESCE(SUM(n), 0)::BIGINT,
+        COALESCE(SUM(income), 0),
+        COALESCE(SUM(expense), 0),
+        COALESCE(
+            jsonb_object_agg(category, expense) FILTER (WHERE expense IS NOT NULL),
+            '{}'::jsonb
+        )
+    FROM per_category;
+$$ LANGUAGE sql STABLE;
+
 -- Function to classify transaction using LLM
 CREATE OR REPLACE FUNCTION public.classify_transaction(description TEXT)
 RETURNS TEXT AS $$